@@ -9,6 +9,7 @@ from models import Transaction, Customer, User, Product
 from database import DatabaseConnection
 from product_manager import ProductManager
 from customer_manager import CustomerManager
+from report_manager import ReportCache
 
 class TransactionManager:
     """Manages transaction processing"""
@@ -17,6 +18,7 @@ class TransactionManager:
         self.db = DatabaseConnection()
         self.product_manager = ProductManager()
         self.customer_manager = CustomerManager()
+        self.report_cache = ReportCache()
         self._current_transaction: Optional[Transaction] = None
     
     def start_new_transaction(self, user: User, customer: Optional[Customer] = None,
@@ -154,6 +156,9 @@ class TransactionManager:
                     loyalty_points
                 )
             
+            # Today's report figures are now out of date
+            self.report_cache.invalidate_date()
+            
             return True, "Transaction completed successfully!", transaction_id
             
         except Exception as e:
@@ -247,6 +252,9 @@ class TransactionManager:
             success = self.db.execute_query(query, (transaction_id,))
             
             if success:
+                # The refunded sale's day and today's stock figures changed
+                self.report_cache.invalidate_date(transaction['date'][:10])
+                self.report_cache.invalidate_date()
                 return True, "Refund processed successfully!"
             else:
                 return False, "Failed to process refund"
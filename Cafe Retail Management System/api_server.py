@@ -0,0 +1,466 @@
+"""
+Local API Server for Café Retail Management System
+Exposes the manager layer over HTTP/JSON so several thin tills can share
+one connection pool and one warm catalogue cache
+Run this file on the back-office PC: python api_server.py
+
+Logging in on a till returns a session token; send it in the X-Till-Token
+header for that till's other routes. Catalogue edits and refunds need the
+token of a till logged in as an admin or manager
+"""
+
+import hmac
+import json
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+from database import DatabaseConnection
+from auth_manager import AuthenticationManager
+from customer_manager import CustomerManager
+from product_manager import ProductManager
+from transaction_manager import TransactionManager
+from report_manager import ReportManager
+
+
+class ResponseCache:
+    """Time-limited cache of encoded JSON responses for catalogue reads"""
+
+    def __init__(self, ttl: float = 30.0):
+        self._ttl = ttl
+        self._entries: Dict[str, Tuple[float, bytes]] = {}
+        self._lock = threading.Lock()
+        # Bumped by invalidate(), so a read that overlapped a write can tell
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get cached body, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[0] < self._ttl:
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+    @property
+    def generation(self) -> int:
+        """Take before reading; pass to set() so stale reads are not stored"""
+        with self._lock:
+            return self._generation
+
+    def set(self, key: str, body: bytes, generation: int = None):
+        """
+        Store an encoded response body, unless the cache was invalidated
+        since the given generation (the body may predate that write)
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic(), body)
+
+    def invalidate(self):
+        """Drop all cached responses (catalogue or stock changed)"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits,
+                    'misses': self.misses, 'ttl': self._ttl}
+
+
+class Till:
+    """Per-till session: logged in staff member and current cart"""
+
+    def __init__(self, till_id: str):
+        self.till_id = till_id
+        self.auth_manager = AuthenticationManager()
+        self.transaction_manager = TransactionManager()
+        self.lock = threading.Lock()
+        # Issued at login; the till id alone is easy to guess
+        self.token: Optional[str] = None
+
+    def has_token(self, token: Optional[str]) -> bool:
+        return bool(self.token and token) and hmac.compare_digest(self.token, token)
+
+
+class CafeAPI:
+    """Routes API requests to the manager layer"""
+
+    # Paths whose GET responses are served from the cache
+    CACHEABLE_PREFIXES = ('/products', '/categories')
+
+    # Roles allowed to change the catalogue and refund transactions
+    BACKOFFICE_ROLES = ('admin', 'manager')
+
+    def __init__(self, cache_ttl: float = 30.0, pool_size: int = 8):
+        self.product_manager = ProductManager()
+        self.customer_manager = CustomerManager()
+        self.report_manager = ReportManager()
+        self.cache = ResponseCache(cache_ttl)
+        self._tills: Dict[str, Till] = {}
+        self._sessions: Dict[str, Till] = {}  # token -> till
+        self._tills_lock = threading.Lock()
+        # One slot per pooled connection: requests wait here for a free
+        # connection instead of failing to check one out
+        self.db_slots = threading.BoundedSemaphore(pool_size)
+
+    def get_till(self, till_id: str) -> Till:
+        """Get or create the session for a till"""
+        with self._tills_lock:
+            till = self._tills.get(till_id)
+            if till is None:
+                till = Till(till_id)
+                self._tills[till_id] = till
+            return till
+
+    def _start_session(self, till: Till) -> str:
+        """Issue a new token for a till that just logged in"""
+        with self._tills_lock:
+            self._sessions.pop(till.token, None)
+            till.token = secrets.token_urlsafe(32)
+            self._sessions[till.token] = till
+            return till.token
+
+    def _end_session(self, till: Till):
+        with self._tills_lock:
+            self._sessions.pop(till.token, None)
+            till.token = None
+
+    def find_session(self, token: Optional[str]) -> Optional[Till]:
+        """Get the till a session token was issued to, or None"""
+        if not token:
+            return None
+        with self._tills_lock:
+            till = self._sessions.get(token)
+        return till if till is not None and till.has_token(token) else None
+
+    def authorise(self, token: Optional[str]) -> Tuple[Optional[Till], Optional[Tuple[int, Any]]]:
+        """
+        Check the caller's session belongs to a till logged in with a back-office role
+        Returns: (till, None) if allowed, otherwise (None, (http_status, json_payload))
+        """
+        till = self.find_session(token)
+        if till is None or not till.auth_manager.is_logged_in():
+            return None, (401, {'error': "Log in on a till and send its X-Till-Token"})
+        role = (till.auth_manager.current_user.role or '').lower()
+        if role not in self.BACKOFFICE_ROLES:
+            return None, (403, {'error': "Admin or manager role required"})
+        return till, None
+
+    def is_cacheable(self, method: str, path: str) -> bool:
+        return method == "GET" and path.startswith(self.CACHEABLE_PREFIXES)
+
+    def dispatch(self, method: str, path: str, query: Dict[str, str],
+                 body: Dict[str, Any], token: Optional[str] = None) -> Tuple[int, Any]:
+        """
+        Handle one request
+        token is the caller's till session (X-Till-Token header)
+        Returns: (http_status, json_payload)
+        """
+        parts = [p for p in path.split('/') if p]
+        if not parts:
+            return 200, {'service': 'cafe-retail-api', 'cache': self.cache.stats()}
+
+        resource = parts[0]
+        try:
+            if resource == 'products':
+                return self._products(method, parts[1:], query, body, token)
+            if resource == 'categories' and method == "GET":
+                return 200, self.product_manager.get_all_categories()
+            if resource == 'customers':
+                return self._customers(method, parts[1:], query, body)
+            if resource == 'tills' and len(parts) >= 3:
+                return self._tills_route(method, parts[1], parts[2:], body, token)
+            if resource == 'transactions' and len(parts) >= 2:
+                return self._transactions(method, parts[1:], token)
+            if resource == 'reports' and len(parts) == 2 and method == "GET":
+                return self._reports(parts[1], query)
+        except (ValueError, KeyError) as e:
+            return 400, {'error': f"Bad request: {e}"}
+
+        return 404, {'error': f"No route for {method} {path}"}
+
+    def _products(self, method, parts, query, body, token):
+        if method == "GET" and not parts:
+            products = self.product_manager.search_products(
+                query.get('search', ''), query.get('category', ''))
+            return 200, [p.to_dict() for p in products]
+
+        if method == "GET" and parts == ['low-stock']:
+            return 200, [p.to_dict() for p in self.product_manager.get_low_stock_products()]
+
+        if method == "GET" and len(parts) == 1:
+            product = self.product_manager.get_product(int(parts[0]))
+            if not product:
+                return 404, {'error': "Product not found"}
+            return 200, product.to_dict()
+
+        if method in ("POST", "PUT"):
+            _, denied = self.authorise(token)
+            if denied:
+                return denied
+
+        if method == "POST" and not parts:
+            success, message = self.product_manager.add_product(
+                body['name'], body.get('description', ''), float(body['price']),
+                int(body['stock_quantity']), int(body.get('low_stock_threshold', 10)),
+                body.get('category', ''), bool(body.get('is_service', False)),
+                int(body.get('service_duration', 0)))
+            self.cache.invalidate()
+            return (201 if success else 400), {'success': success, 'message': message}
+
+        if method == "PUT" and len(parts) == 1:
+            success, message = self.product_manager.update_product(
+                int(parts[0]), body['name'], body.get('description', ''),
+                float(body['price']), int(body['stock_quantity']),
+                int(body.get('low_stock_threshold', 10)), body.get('category', ''))
+            self.cache.invalidate()
+            return (200 if success else 400), {'success': success, 'message': message}
+
+        return 404, {'error': "Unknown products route"}
+
+    def _customers(self, method, parts, query, body):
+        if method == "GET" and not parts:
+            customers = self.customer_manager.search_customers(query.get('search', ''))
+            return 200, [c.to_dict() for c in customers]
+
+        if method == "GET" and len(parts) == 1:
+            customer = self.customer_manager.get_customer(int(parts[0]))
+            if not customer:
+                return 404, {'error': "Customer not found"}
+            return 200, customer.to_dict()
+
+        if method == "GET" and len(parts) == 2 and parts[1] == 'history':
+            return 200, self.customer_manager.get_customer_transaction_history(int(parts[0]))
+
+        if method == "POST" and not parts:
+            success, message, customer = self.customer_manager.add_customer(
+                body['name'], body.get('email', ''), body.get('phone', ''),
+                body.get('address', ''), body.get('customer_type', 'Regular'))
+            return (201 if success else 400), {
+                'success': success, 'message': message,
+                'customer': customer.to_dict() if customer else None
+            }
+
+        return 404, {'error': "Unknown customers route"}
+
+    def _tills_route(self, method, till_id, parts, body, token):
+        till = self.get_till(till_id)
+        action = parts[0]
+
+        with till.lock:
+            if action == 'login' and method == "POST":
+                success, message = till.auth_manager.login(
+                    body.get('username', ''), body.get('password', ''))
+                if not success:
+                    return 401, {'success': success, 'message': message}
+                return 200, {'success': success, 'message': message,
+                             'token': self._start_session(till)}
+
+            if not till.has_token(token) or not till.auth_manager.is_logged_in():
+                return 401, {'error': "Till is not logged in, or X-Till-Token is wrong"}
+
+            if action == 'logout' and method == "POST":
+                till.auth_manager.logout()
+                till.transaction_manager.cancel_transaction()
+                self._end_session(till)
+                return 200, {'success': True, 'message': "Logged out"}
+
+            manager = till.transaction_manager
+
+            if action == 'transaction' and method == "POST":
+                customer = None
+                if body.get('customer_id'):
+                    customer = self.customer_manager.get_customer(int(body['customer_id']))
+                    if not customer:
+                        return 404, {'error': "Customer not found"}
+                transaction = manager.start_new_transaction(
+                    till.auth_manager.current_user, customer,
+                    body.get('payment_method', 'Cash'))
+                return 201, transaction.to_dict()
+
+            if action == 'transaction' and method == "DELETE":
+                manager.cancel_transaction()
+                return 200, {'success': True, 'message': "Transaction cancelled"}
+
+            if action == 'cart' and method == "GET":
+                if not manager.current_transaction:
+                    return 404, {'error': "No active transaction"}
+                return 200, manager.current_transaction.to_dict()
+
+            if action == 'cart' and method == "POST":
+                success, message = manager.add_item_to_cart(
+                    int(body['product_id']), int(body.get('quantity', 1)))
+                return (200 if success else 400), {'success': success, 'message': message}
+
+            if action == 'cart' and method == "DELETE" and len(parts) == 2:
+                success, message = manager.remove_item_from_cart(int(parts[1]))
+                return (200 if success else 400), {'success': success, 'message': message}
+
+            if action == 'checkout' and method == "POST":
+                success, message, transaction_id = manager.process_transaction(
+                    float(body.get('cash_received', 0.0)))
+                if success:
+                    # Stock levels changed, so catalogue reads are stale
+                    self.cache.invalidate()
+                    manager.cancel_transaction()
+                return (200 if success else 400), {
+                    'success': success, 'message': message,
+                    'transaction_id': transaction_id
+                }
+
+        return 404, {'error': "Unknown till route"}
+
+    def _transactions(self, method, parts, token):
+        transaction_id = int(parts[0])
+
+        if method == "GET" and len(parts) == 1:
+            transaction = self.get_till('_backoffice').transaction_manager.get_transaction(transaction_id)
+            if not transaction:
+                return 404, {'error': "Transaction not found"}
+            return 200, transaction
+
+        if method == "POST" and parts[1:] == ['refund']:
+            till, denied = self.authorise(token)
+            if denied:
+                return denied
+            with till.lock:
+                success, message = till.transaction_manager.process_refund(transaction_id)
+            if success:
+                self.cache.invalidate()
+            return (200 if success else 400), {'success': success, 'message': message}
+
+        return 404, {'error': "Unknown transactions route"}
+
+    def _reports(self, name, query):
+        if name == 'daily':
+            return 200, self.report_manager.get_daily_sales_report(query.get('date'))
+        if name == 'customer-type':
+            return 200, self.report_manager.get_revenue_by_customer_type_report(
+                query.get('start'), query.get('end'))
+        if name == 'inventory':
+            return 200, self.report_manager.get_inventory_status_report()
+        if name == 'trend':
+            return 200, self.report_manager.get_sales_trend_report(int(query.get('days', 7)))
+        if name == 'top-customers':
+            return 200, self.report_manager.get_top_customers_report(int(query.get('limit', 10)))
+        return 404, {'error': f"Unknown report: {name}"}
+
+
+class APIRequestHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 handler - tills keep their connection open between requests"""
+
+    protocol_version = "HTTP/1.1"
+    api: CafeAPI = None
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def _handle(self, method: str):
+        parsed = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+
+        try:
+            body = self._read_body()
+        except ValueError:
+            self._send(400, json.dumps({'error': "Invalid JSON body"}).encode('utf-8'))
+            return
+
+        cacheable = self.api.is_cacheable(method, parsed.path)
+        if cacheable:
+            cached = self.api.cache.get(self.path)
+            if cached is not None:
+                self._send(200, cached, cache_status="HIT")
+                return
+
+        db = DatabaseConnection()
+        with self.api.db_slots:
+            errors, connect_failures = db.error_count, db.connect_failures
+            generation = self.api.cache.generation
+            try:
+                status, payload = self.api.dispatch(method, parsed.path, query, body,
+                                                  self.headers.get('X-Till-Token'))
+            except Exception as e:
+                print(f"API error on {method} {self.path}: {e}")
+                status, payload = 500, {'error': str(e)}
+            finally:
+                # Hand the pooled connection back between requests
+                db.release()
+
+        if db.connect_failures != connect_failures:
+            status, payload = 503, {'error': "Database unavailable, please retry"}
+
+        encoded = json.dumps(payload, default=str).encode('utf-8')
+        # A read that hit a database error may look like an empty result
+        if cacheable and status == 200 and db.error_count == errors:
+            self.api.cache.set(self.path, encoded, generation)
+        self._send(status, encoded, cache_status="MISS" if cacheable else None)
+
+    def _read_body(self) -> Dict[str, Any]:
+        length = int(self.headers.get('Content-Length') or 0)
+        if length == 0:
+            return {}
+        data = json.loads(self.rfile.read(length).decode('utf-8'))
+        if not isinstance(data, dict):
+            raise ValueError("Body must be a JSON object")
+        return data
+
+    def _send(self, status: int, body: bytes, cache_status: str = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if cache_status:
+            self.send_header("X-Cache", cache_status)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep the console readable on busy tills
+        pass
+
+
+def run_server(host: str = "127.0.0.1", port: int = 8765,
+               pool_size: int = 8, cache_ttl: float = 30.0):
+    """Start the API server with a shared connection pool"""
+    print("=" * 50)
+    print("  Café Retail API Server")
+    print("=" * 50)
+
+    db = DatabaseConnection()
+    if not db.enable_pooling(pool_size=pool_size):
+        print("\n⚠️  Could not create connection pool - check database.py settings")
+        return
+
+    APIRequestHandler.api = CafeAPI(cache_ttl=cache_ttl, pool_size=pool_size)
+    server = ThreadingHTTPServer((host, port), APIRequestHandler)
+    server.daemon_threads = True
+    print(f"✓ Listening on http://{host}:{port} (Ctrl+C to stop)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    run_server()
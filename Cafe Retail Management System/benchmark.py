@@ -0,0 +1,469 @@
+"""
+Benchmark and Load Test Harness for Café Retail Management System
+Generates deterministic synthetic data, drives several simulated tills
+through the checkout path concurrently and reports latency percentiles,
+throughput and database round trips per sale.
+
+Run against a throwaway SQLite stand-in (default):
+    python benchmark.py --tills 4 --sales 100
+Run against the local MySQL database (adds synthetic rows to cafe_retail_db):
+    python benchmark.py --backend mysql --allow-mysql-writes
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from database import DatabaseConnection, initialize_database
+from models import User, Transaction
+from transaction_manager import TransactionManager
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT UNIQUE NOT NULL,
+    password TEXT NOT NULL,
+    role TEXT NOT NULL,
+    name TEXT NOT NULL,
+    email TEXT,
+    phone TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS customers (
+    customer_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    email TEXT,
+    phone TEXT,
+    address TEXT,
+    customer_type TEXT DEFAULT 'Regular',
+    loyalty_points INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS products (
+    product_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    description TEXT,
+    price REAL NOT NULL,
+    stock_quantity INTEGER NOT NULL DEFAULT 0,
+    low_stock_threshold INTEGER DEFAULT 10,
+    category TEXT,
+    is_service INTEGER DEFAULT 0,
+    service_duration INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    transaction_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer_id INTEGER REFERENCES customers(customer_id),
+    user_id INTEGER NOT NULL REFERENCES users(user_id),
+    transaction_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    subtotal REAL NOT NULL,
+    discount_amount REAL DEFAULT 0,
+    tax_amount REAL NOT NULL,
+    total_amount REAL NOT NULL,
+    payment_method TEXT NOT NULL,
+    cash_received REAL,
+    change_given REAL,
+    status TEXT DEFAULT 'Completed'
+);
+CREATE TABLE IF NOT EXISTS transaction_items (
+    item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    transaction_id INTEGER NOT NULL REFERENCES transactions(transaction_id),
+    product_id INTEGER NOT NULL REFERENCES products(product_id),
+    quantity INTEGER NOT NULL,
+    unit_price REAL NOT NULL,
+    subtotal REAL NOT NULL
+);
+INSERT OR IGNORE INTO users (username, password, role, name, email, phone)
+VALUES ('admin', 'admin123', 'admin', 'Administrator', 'admin@cafe.com', '1234567890'),
+       ('staff', 'staff123', 'staff', 'Staff Member', 'staff@cafe.com', '0987654321');
+"""
+
+
+class SQLiteDatabase(DatabaseConnection):
+    """
+    SQLite stand-in exposing the DatabaseConnection interface.
+    Installed as the DatabaseConnection singleton so the managers run
+    unchanged; each thread gets its own connection to the same file.
+    """
+
+    def __new__(cls, path: str = None):
+        return super(SQLiteDatabase, cls).__new__(cls)
+
+    def __init__(self, path: str = None):
+        # DatabaseConnection() re-runs __init__ on the singleton without arguments
+        if path is None:
+            return
+        self._path = path
+        self._sqlite_local = threading.local()
+        conn = self.get_connection()
+        conn.executescript(SQLITE_SCHEMA)
+        conn.commit()
+
+    def install(self):
+        """Make DatabaseConnection() return this stand-in everywhere"""
+        DatabaseConnection._instance = self
+
+    @staticmethod
+    def _sql(query: str) -> str:
+        return query.replace('%s', '?')
+
+    def connect(self, with_database=True):
+        return self.get_connection() is not None
+
+    def get_connection(self):
+        conn = getattr(self._sqlite_local, 'connection', None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=30,
+                                   detect_types=sqlite3.PARSE_DECLTYPES)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._sqlite_local.connection = conn
+        return conn
+
+    def release(self):
+        pass
+
+    def execute_query(self, query: str, params: Tuple = None) -> bool:
+        conn = self.get_connection()
+        try:
+            cursor = conn.execute(self._sql(query), params or ())
+            self._sqlite_local.last_id = cursor.lastrowid
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            print(f"Error executing query: {e}")
+            conn.rollback()
+            return False
+
+    def fetch_one(self, query: str, params: Tuple = None) -> Optional[Tuple]:
+        try:
+            return self.get_connection().execute(self._sql(query), params or ()).fetchone()
+        except sqlite3.Error as e:
+            print(f"Error fetching data: {e}")
+            return None
+
+    def fetch_all(self, query: str, params: Tuple = None) -> List[Tuple]:
+        try:
+            return self.get_connection().execute(self._sql(query), params or ()).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error fetching data: {e}")
+            return []
+
+    def iter_query(self, query: str, params: Tuple = None,
+                   chunk_size: int = 500) -> Iterator[Tuple]:
+        cursor = self.get_connection().execute(self._sql(query), params or ())
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from rows
+
+    def get_last_insert_id(self) -> int:
+        return getattr(self._sqlite_local, 'last_id', 0) or 0
+
+    def close(self):
+        conn = getattr(self._sqlite_local, 'connection', None)
+        if conn is not None:
+            conn.close()
+            self._sqlite_local.connection = None
+
+
+class RoundTripCounter:
+    """Counts database calls per thread by wrapping the connection's query methods"""
+
+    METHODS = ('execute_query', 'fetch_one', 'fetch_all', 'get_last_insert_id')
+
+    def __init__(self, db: DatabaseConnection):
+        self._local = threading.local()
+        for name in self.METHODS:
+            setattr(db, name, self._wrap(getattr(db, name)))
+
+    def _wrap(self, method):
+        def counted(*args, **kwargs):
+            self._local.count = getattr(self._local, 'count', 0) + 1
+            return method(*args, **kwargs)
+        return counted
+
+    def reset(self):
+        self._local.count = 0
+
+    @property
+    def count(self) -> int:
+        return getattr(self._local, 'count', 0)
+
+
+class DataGenerator:
+    """Deterministic synthetic data - the same seed always yields the same rows"""
+
+    CATEGORIES = ['Coffee', 'Tea', 'Pastry', 'Food', 'Beverage']
+    CUSTOMER_TYPES = ['Regular', 'Regular', 'Regular', 'Student', 'VIP']
+    PAYMENT_METHODS = ['Cash', 'Credit', 'Debit']
+
+    def __init__(self, seed: int = 42):
+        self.rng = random.Random(seed)
+
+    def products(self, count: int) -> List[Tuple]:
+        rows = []
+        for i in range(1, count + 1):
+            category = self.rng.choice(self.CATEGORIES)
+            rows.append((
+                f"{category} Item {i:05d}", f"Synthetic {category.lower()} product",
+                round(self.rng.uniform(1.5, 12.0), 2),
+                self.rng.randint(5000, 20000),  # deep stock so the load test never runs dry
+                10, category, 0, 0
+            ))
+        return rows
+
+    def customers(self, count: int) -> List[Tuple]:
+        return [
+            (f"Customer {i:06d}", f"customer{i}@example.com", f"555{i:07d}",
+             f"{i} Synthetic Street", self.rng.choice(self.CUSTOMER_TYPES),
+             self.rng.randint(0, 99))
+            for i in range(1, count + 1)
+        ]
+
+    def transactions(self, count: int, first_id: int, customer_ids: List[int],
+                     products: List[Tuple[int, float]], user_ids: List[int],
+                     days: int = 365) -> Iterator[Tuple[Tuple, List[Tuple]]]:
+        """Yield (transaction_row, item_rows) spread over the last `days` days"""
+        now = datetime.now()
+        for transaction_id in range(first_id, first_id + count):
+            when = now - timedelta(seconds=self.rng.randint(0, days * 86400))
+            lines = self.rng.sample(products, min(len(products), self.rng.randint(1, 4)))
+            items = []
+            subtotal = 0.0
+            for product_id, price in lines:
+                quantity = self.rng.randint(1, 3)
+                items.append((transaction_id, product_id, quantity, price, price * quantity))
+                subtotal += price * quantity
+            customer_id = self.rng.choice(customer_ids) if self.rng.random() < 0.6 else None
+            discount = subtotal * 0.1 if customer_id and self.rng.random() < 0.3 else 0.0
+            tax = (subtotal - discount) * Transaction.TAX_RATE
+            total = subtotal - discount + tax
+            method = self.rng.choice(self.PAYMENT_METHODS)
+            yield ((transaction_id, customer_id, self.rng.choice(user_ids),
+                    when.strftime('%Y-%m-%d %H:%M:%S'), round(subtotal, 2),
+                    round(discount, 2), round(tax, 2), round(total, 2), method,
+                    round(total, 2) if method == 'Cash' else None,
+                    0.0 if method == 'Cash' else None, 'Completed'), items)
+
+
+def load_dataset(db: DatabaseConnection, customers: int, products: int,
+                 history: int, seed: int, batch_size: int = 1000) -> Dict:
+    """Bulk-insert a synthetic dataset and return the ids the load driver needs"""
+    placeholder = '?' if isinstance(db, SQLiteDatabase) else '%s'
+
+    def sql(query: str) -> str:
+        return query.replace('%s', placeholder)
+
+    generator = DataGenerator(seed)
+    conn = db.get_connection()
+    cursor = conn.cursor()
+
+    cursor.executemany(sql("""
+        INSERT INTO products (name, description, price, stock_quantity,
+                              low_stock_threshold, category, is_service, service_duration)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """), generator.products(products))
+    cursor.executemany(sql("""
+        INSERT INTO customers (name, email, phone, address, customer_type, loyalty_points)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """), generator.customers(customers))
+    conn.commit()
+
+    cursor.execute("SELECT product_id, price FROM products")
+    product_rows = [(row[0], float(row[1])) for row in cursor.fetchall()]
+    cursor.execute("SELECT customer_id FROM customers")
+    customer_ids = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT user_id FROM users")
+    user_ids = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT COALESCE(MAX(transaction_id), 0) FROM transactions")
+    first_id = cursor.fetchone()[0] + 1
+
+    transaction_sql = sql("""
+        INSERT INTO transactions (transaction_id, customer_id, user_id, transaction_date,
+                                  subtotal, discount_amount, tax_amount, total_amount,
+                                  payment_method, cash_received, change_given, status)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """)
+    item_sql = sql("""
+        INSERT INTO transaction_items (transaction_id, product_id, quantity, unit_price, subtotal)
+        VALUES (%s, %s, %s, %s, %s)
+    """)
+    transaction_batch, item_batch = [], []
+    for transaction_row, items in generator.transactions(
+            history, first_id, customer_ids, product_rows, user_ids):
+        transaction_batch.append(transaction_row)
+        item_batch.extend(items)
+        if len(transaction_batch) >= batch_size:
+            cursor.executemany(transaction_sql, transaction_batch)
+            cursor.executemany(item_sql, item_batch)
+            transaction_batch, item_batch = [], []
+    if transaction_batch:
+        cursor.executemany(transaction_sql, transaction_batch)
+        cursor.executemany(item_sql, item_batch)
+    conn.commit()
+    cursor.close()
+
+    return {
+        'product_ids': [p[0] for p in product_rows],
+        'customer_ids': customer_ids,
+    }
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def run_load(db: DatabaseConnection, counter: RoundTripCounter, user: User,
+             product_ids: List[int], customer_ids: List[int], tills: int,
+             sales_per_till: int, items_per_sale: int, seed: int) -> Dict:
+    """Drive `tills` threads through start -> add items -> process concurrently"""
+    latencies: List[float] = []
+    round_trips: List[int] = []
+    failures: List[str] = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(tills + 1)
+
+    def till(index: int):
+        rng = random.Random(seed * 1000 + index)
+        manager = TransactionManager()
+        local_latencies, local_trips, local_failures = [], [], []
+        barrier.wait()
+        for _ in range(sales_per_till):
+            customer = None
+            if customer_ids and rng.random() < 0.5:
+                customer = manager.customer_manager.get_customer(rng.choice(customer_ids))
+            lines = rng.sample(product_ids, min(items_per_sale, len(product_ids)))
+
+            counter.reset()
+            started = time.perf_counter()
+            manager.start_new_transaction(user, customer, rng.choice(['Cash', 'Credit']))
+            for product_id in lines:
+                manager.add_item_to_cart(product_id, rng.randint(1, 2))
+            success, message, _ = manager.process_transaction(cash_received=10000.0)
+            elapsed = time.perf_counter() - started
+
+            if success:
+                local_latencies.append(elapsed)
+                local_trips.append(counter.count)
+            else:
+                local_failures.append(message)
+            manager.cancel_transaction()
+        db.release()
+        with lock:
+            latencies.extend(local_latencies)
+            round_trips.extend(local_trips)
+            failures.extend(local_failures)
+
+    threads = [threading.Thread(target=till, args=(i,)) for i in range(tills)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'tills': tills,
+        'completed': len(latencies),
+        'failed': len(failures),
+        'first_failure': failures[0] if failures else None,
+        'wall_seconds': wall,
+        'throughput': len(latencies) / wall if wall else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'mean_ms': statistics.mean(latencies) * 1000 if latencies else 0.0,
+        'round_trips_per_sale': statistics.mean(round_trips) if round_trips else 0.0,
+    }
+
+
+def print_results(results: Dict):
+    print("\n" + "=" * 50)
+    print("  Checkout Load Test Results")
+    print("=" * 50)
+    print(f"Tills:               {results['tills']}")
+    print(f"Completed sales:     {results['completed']}")
+    print(f"Failed sales:        {results['failed']}")
+    if results['first_failure']:
+        print(f"  first failure:     {results['first_failure']}")
+    print(f"Wall time:           {results['wall_seconds']:.2f} s")
+    print(f"Throughput:          {results['throughput']:.1f} sales/s")
+    print(f"Latency p50:         {results['p50_ms']:.2f} ms")
+    print(f"Latency p95:         {results['p95_ms']:.2f} ms")
+    print(f"Latency p99:         {results['p99_ms']:.2f} ms")
+    print(f"Latency mean:        {results['mean_ms']:.2f} ms")
+    print(f"DB round trips/sale: {results['round_trips_per_sale']:.1f}")
+    print("=" * 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkout benchmark for Café Retail")
+    parser.add_argument('--backend', choices=['sqlite', 'mysql'], default='sqlite')
+    parser.add_argument('--db-path', help="SQLite file (default: fresh temp file)")
+    parser.add_argument('--allow-mysql-writes', action='store_true',
+                        help="Confirm synthetic rows may be added to cafe_retail_db")
+    parser.add_argument('--customers', type=int, default=500)
+    parser.add_argument('--products', type=int, default=200)
+    parser.add_argument('--history', type=int, default=5000,
+                        help="Historical transactions to generate")
+    parser.add_argument('--tills', type=int, default=4)
+    parser.add_argument('--sales', type=int, default=100, help="Sales per till")
+    parser.add_argument('--items', type=int, default=3, help="Lines per sale")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("  Café Retail Checkout Benchmark")
+    print("=" * 50)
+
+    if args.backend == 'mysql':
+        if not args.allow_mysql_writes:
+            print("Refusing to add synthetic data to cafe_retail_db without --allow-mysql-writes")
+            return
+        if not initialize_database():
+            return
+        db = DatabaseConnection()
+        if not db.enable_pooling(pool_size=args.tills + 2):
+            return
+    else:
+        path = args.db_path or os.path.join(tempfile.mkdtemp(prefix="cafe_bench_"), "cafe.db")
+        db = SQLiteDatabase(path)
+        db.install()
+        print(f"✓ SQLite stand-in at {path}")
+
+    started = time.perf_counter()
+    dataset = load_dataset(db, args.customers, args.products, args.history, args.seed)
+    print(f"✓ Generated {args.customers} customers, {args.products} products, "
+          f"{args.history} historical transactions in {time.perf_counter() - started:.2f} s")
+
+    row = db.fetch_one("""
+        SELECT user_id, username, password, role, name, email, phone
+        FROM users WHERE username = %s
+    """, ('staff',))
+    user = User(row[0], row[1], row[2], row[3], row[4], row[5] or "", row[6] or "")
+    db.release()
+
+    counter = RoundTripCounter(db)
+    results = run_load(db, counter, user, dataset['product_ids'], dataset['customer_ids'],
+                       args.tills, args.sales, args.items, args.seed)
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,24 @@ Database Connection Manager for Café Retail Management System
 Handles MySQL connection and basic operations
 """
 
+import threading
 import mysql.connector
-from mysql.connector import Error
-from typing import Optional, List, Tuple, Any
+from mysql.connector import Error, pooling
+from typing import Optional, List, Tuple, Any, Iterator
 
 class DatabaseConnection:
     """Singleton pattern for database connection"""
     _instance = None
-    _connection = None
+    _shared_connection = None
+    _pool = None
+    _local = threading.local()
+    # Connection settings shared by the plain, pooled and streaming connections
+    _settings = {
+        'host': 'localhost',
+        'user': 'root',
+        'password': '12345',  # Change this to your MySQL password
+        'database': 'cafe_retail_db',
+    }
     
     def __new__(cls):
         if cls._instance is None:
@@ -18,33 +28,101 @@ class DatabaseConnection:
         return cls._instance
     
     def __init__(self):
-        if self._connection is None:
+        if self._pool is None and self._connection is None:
             self.connect()
     
+    @property
+    def _connection(self):
+        """Current connection: per-thread when pooling, shared otherwise"""
+        if self._pool is not None:
+            return getattr(self._local, 'connection', None)
+        return self._shared_connection
+    
+    @_connection.setter
+    def _connection(self, value):
+        if self._pool is not None:
+            self._local.connection = value
+        else:
+            DatabaseConnection._shared_connection = value
+    
+    def enable_pooling(self, pool_size: int = 8, pool_name: str = "cafe_pool") -> bool:
+        """
+        Switch to a connection pool so several threads can share the database.
+        Each thread checks out its own connection; call release() when done.
+        """
+        try:
+            DatabaseConnection._pool = pooling.MySQLConnectionPool(
+                pool_name=pool_name,
+                pool_size=pool_size,
+                pool_reset_session=True,
+                autocommit=False,
+                **self._settings
+            )
+            # The shared connection is no longer used
+            if self._shared_connection and self._shared_connection.is_connected():
+                self._shared_connection.close()
+            DatabaseConnection._shared_connection = None
+            print(f"Connection pool '{pool_name}' ready ({pool_size} connections)")
+            return True
+        except Error as e:
+            print(f"Error creating connection pool: {e}")
+            DatabaseConnection._pool = None
+            return False
+    
+    @property
+    def error_count(self) -> int:
+        """
+        Database errors seen by this thread so far. Queries report errors
+        as None/[]/False, so compare the count before and after a call to
+        tell a failed read from an empty one.
+        """
+        return getattr(self._local, 'errors', 0)
+    
+    @property
+    def connect_failures(self) -> int:
+        """Times this thread could not get a connection (server down or pool exhausted)"""
+        return getattr(self._local, 'connect_failures', 0)
+    
+    def _record_error(self, connecting: bool = False):
+        self._local.errors = self.error_count + 1
+        if connecting:
+            self._local.connect_failures = self.connect_failures + 1
+    
+    def release(self):
+        """Return this thread's pooled connection to the pool"""
+        if self._pool is None:
+            return
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            try:
+                connection.close()
+            except Error as e:
+                print(f"Error releasing pooled connection: {e}")
+            self._local.connection = None
+    
     def connect(self, with_database=True):
         """Establish connection to MySQL database"""
         try:
-            if with_database:
+            if self._pool is not None and with_database:
+                # Pooled connections are already open; no need to announce each checkout
+                self._connection = self._pool.get_connection()
+                return True
+            elif with_database:
                 self._connection = mysql.connector.connect(
-                    host='localhost',
-                    user='root',
-                    password='12345',  # Change this to your MySQL password
-                    database='cafe_retail_db',
-                    autocommit=False
+                    autocommit=False, **self._settings
                 )
             else:
                 # Connect without selecting a database (for initial setup)
+                server_settings = {k: v for k, v in self._settings.items() if k != 'database'}
                 self._connection = mysql.connector.connect(
-                    host='localhost',
-                    user='root',
-                    password='12345',  # Change this to your MySQL password
-                    autocommit=False
+                    autocommit=False, **server_settings
                 )
             
             if self._connection.is_connected():
                 print("Successfully connected to MySQL server")
                 return True
         except Error as e:
+            self._record_error(connecting=True)
             print(f"Error connecting to MySQL: {e}")
             print("\nPlease check:")
             print("1. MySQL server is running")
@@ -77,6 +155,7 @@ class DatabaseConnection:
             cursor.close()
             return True
         except Error as e:
+            self._record_error()
             print(f"Error executing query: {e}")
             if self._connection:
                 self._connection.rollback()
@@ -101,6 +180,7 @@ class DatabaseConnection:
             cursor.close()
             return result
         except Error as e:
+            self._record_error()
             print(f"Error fetching data: {e}")
             return None
     
@@ -123,9 +203,47 @@ class DatabaseConnection:
             cursor.close()
             return results
         except Error as e:
+            self._record_error()
             print(f"Error fetching data: {e}")
             return []
     
+    def iter_query(self, query: str, params: Tuple = None,
+                   chunk_size: int = 500) -> Iterator[Tuple]:
+        """
+        Stream records with an unbuffered (server-side) cursor.
+        Rows arrive in fetchmany() chunks, so memory stays bounded by
+        chunk_size no matter how large the result is. A dedicated
+        connection is used so other queries can run while the stream
+        is being consumed.
+        Errors are raised to the caller rather than ending the stream
+        early, so a failed export is never mistaken for an empty one.
+        """
+        connection = None
+        try:
+            if self._pool is not None:
+                connection = self._pool.get_connection()
+            else:
+                connection = mysql.connector.connect(**self._settings)
+            cursor = connection.cursor(buffered=False)
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+        except Error as e:
+            self._record_error()
+            print(f"Error streaming data: {e}")
+            raise
+        finally:
+            # Closing the connection discards any unread rows on the server
+            if connection is not None:
+                connection.close()
+    
     def get_last_insert_id(self) -> int:
         """Get last inserted ID"""
         try:
@@ -135,11 +253,15 @@ class DatabaseConnection:
             cursor.close()
             return result[0] if result else 0
         except Error as e:
+            self._record_error()
             print(f"Error getting last insert ID: {e}")
             return 0
     
     def close(self):
         """Close database connection"""
+        if self._pool is not None:
+            self.release()
+            return
         if self._connection and self._connection.is_connected():
             self._connection.close()
             print("Database connection closed")
@@ -4,7 +4,7 @@ Complete version with all management features working
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, messagebox, scrolledtext, filedialog
 from datetime import datetime
 
 # Managers
@@ -912,11 +912,13 @@ class CafeRetailGUI:
         tk.Label(left, text="Select Report", font=("Arial", 12, "bold"), bg="white").pack(pady=15)
 
         reports = [
+            ("🧮 Dashboard (7 Days)", self.show_dashboard_report),
             ("📅 Daily Sales Report", self.show_daily_sales_report),
             ("👥 Revenue by Customer Type", self.show_customer_type_report),
             ("📦 Inventory Status", self.show_inventory_report),
             ("📈 Sales Trend (7 Days)", self.show_sales_trend_report),
             ("🏆 Top Customers", self.show_top_customers_report),
+            ("💾 Export Transactions (30 Days)", self.export_transactions_report),
         ]
 
         for text, cmd in reports:
@@ -937,6 +939,75 @@ class CafeRetailGUI:
         report_area = scrolledtext.ScrolledText(right, font=("Courier", 10), wrap="word", state="disabled")
         report_area.pack(fill="both", expand=True, padx=10, pady=10)
 
+    def show_dashboard_report(self, text_area):
+        bundle = self.report_manager.get_dashboard_bundle()
+        if 'error' in bundle:
+            self._display_report(text_area, f"Error generating dashboard: {bundle['error']}")
+            return
+
+        summary = bundle['summary']
+        if bundle['cached']:
+            timing = "Served from the report cache"
+        else:
+            timing = f"Computed in {bundle['elapsed_ms']:.1f} ms ({bundle['query_count']} queries)"
+        content = f"""
+{'='*60}
+                 DASHBOARD (LAST 7 DAYS)
+{'='*60}
+
+Period: {bundle['start_date']} to {bundle['end_date']}
+Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+{timing}
+
+{'='*60}
+SUMMARY
+{'='*60}
+
+Total Transactions: {summary['transaction_count']}
+Total Sales:        ${summary['total_sales']:.2f}
+Total Discounts:    ${summary['total_discounts']:.2f}
+Total Tax:          ${summary['total_tax']:.2f}
+
+{'='*60}
+PAYMENT BREAKDOWN
+{'='*60}
+"""
+        for p in bundle['payment_breakdown']:
+            content += f"\n{p['method']}: {p['count']} transactions - ${p['amount']:.2f}"
+
+        content += f"""
+
+{'='*60}
+REVENUE BY CUSTOMER TYPE
+{'='*60}
+"""
+        for c in bundle['customer_types']:
+            content += (f"\n{c['customer_type']}: {c['transaction_count']} transactions - "
+                        f"${c['total_revenue']:.2f} (avg ${c['average_transaction']:.2f})")
+
+        content += f"""
+
+{'='*60}
+TOP 5 SELLING PRODUCTS
+{'='*60}
+"""
+        for i, p in enumerate(bundle['top_products'], 1):
+            content += f"\n{i}. {p['product']} - Qty: {p['quantity']} - ${p['revenue']:.2f}"
+
+        content += f"""
+
+{'='*60}
+DAILY TREND
+{'='*60}
+
+{'Date':<15} {'Trans':<10} {'Sales':<15}
+{'-'*40}
+"""
+        for day in bundle['trend']:
+            content += f"{day['date']:<15} {day['transactions']:<10} ${day['total_sales']:.2f}\n"
+
+        self._display_report(text_area, content)
+
     def show_daily_sales_report(self, text_area):
         report = self.report_manager.get_daily_sales_report()
         
@@ -1092,6 +1163,33 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
         self._display_report(text_area, content)
 
+    def export_transactions_report(self, text_area):
+        file_path = filedialog.asksaveasfilename(
+            title="Export Transactions",
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("JSON Lines", "*.jsonl")]
+        )
+        if not file_path:
+            return
+
+        # Rows are streamed straight to disk rather than rendered here
+        success, message = self.report_manager.export_transactions(file_path)
+        if success:
+            messagebox.showinfo("Export Complete", message)
+        else:
+            messagebox.showerror("Export Failed", message)
+
+        self._display_report(text_area, f"""
+{'='*60}
+                  TRANSACTION EXPORT
+{'='*60}
+
+Period: Last 30 Days
+Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+{message}
+""")
+
     def _display_report(self, text_area, content):
         text_area.config(state="normal")
         text_area.delete("1.0", "end")
@@ -7,12 +7,14 @@ Demonstrates: Encapsulation, Control Structures
 from typing import List, Optional
 from models import Product
 from database import DatabaseConnection
+from report_manager import ReportCache
 
 class ProductManager:
     """Manages product and inventory operations"""
     
     def __init__(self):
         self.db = DatabaseConnection()
+        self.report_cache = ReportCache()
     
     def add_product(self, name: str, description: str, price: float,
                    stock_quantity: int, low_stock_threshold: int,
@@ -45,6 +47,7 @@ class ProductManager:
             ))
             
             if success:
+                self.report_cache.invalidate_report('inventory')
                 return True, "Product added successfully!"
             else:
                 return False, "Failed to add product"
@@ -78,6 +81,7 @@ class ProductManager:
             ))
             
             if success:
+                self.report_cache.invalidate_report('inventory')
                 return True, "Product updated successfully!"
             else:
                 return False, "Failed to update product"
@@ -233,6 +237,7 @@ class ProductManager:
             success = self.db.execute_query(query, (new_quantity, product_id))
             
             if success:
+                self.report_cache.invalidate_report('inventory')
                 return True, "Stock updated successfully!"
             else:
                 return False, "Failed to update stock"
@@ -0,0 +1,10 @@
+"""
+Excellence Coffee shop management system.
+
+The Tk UI lives in excellence.app and excellence.pages; importing the
+package itself only loads the settings and the SQLite layer, so scripts
+such as excellence_benchmark.py can use the database without Tk.
+"""
+
+from .config import GST_RATE, STORAGE_PROFILES
+from .db import DatabaseManager, InsufficientStockError, RecordCache, ReportCache
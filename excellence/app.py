@@ -0,0 +1,225 @@
+"""Main window shell and the root Tk application."""
+
+import tkinter as tk
+from tkinter import ttk
+import os
+import time
+
+from .db import DatabaseManager, ReportCache
+from .receipts import ReceiptRenderer
+from .pages import page_class
+from .pages.login import LoginScreen
+
+
+class MainApp(ttk.Frame):
+    # Pages are built on first show. One hidden for longer than this is
+    # destroyed and rebuilt when next shown; None keeps every page built.
+    PAGE_EVICT_AFTER_MS = 15 * 60 * 1000
+    EVICT_CHECK_MS = 60 * 1000
+
+    def __init__(self, parent, app):
+        super().__init__(parent)
+        self.app = app
+        self.page_names = []   # pages this user may open, in sidebar order
+        self.pages = {}        # the ones built so far
+        # page name -> table_versions() stamp at its last refresh
+        self._page_stamps = {}
+        # page name -> time.monotonic() when it was last covered
+        self._hidden_since = {}
+        self._evict_job = None
+        self.current_page_name = None
+        self._build_ui()
+
+    def _build_ui(self):
+        header = ttk.Frame(self)
+        header.pack(fill="x")
+
+        title = ttk.Label(header,
+                          text="Excellence Coffee - Coffee Shop Management System",
+                          font=("Segoe UI", 14, "bold"))
+        title.pack(side="left", padx=10, pady=5)
+
+        self.user_label = ttk.Label(
+            header,
+            text=f"Logged in as: {self.app.current_user.username} ({self.app.current_user.role})",
+            font=("Segoe UI", 10)
+        )
+        self.user_label.pack(side="right", padx=10)
+
+        ttk.Button(header, text="Logout", command=self.app.logout)\
+            .pack(side="right", padx=10)
+
+        # Floating New Order window button
+        ttk.Button(header, text="Open New Order Window",
+                   command=self._open_new_order_window)\
+            .pack(side="right", padx=10)
+
+        body = ttk.Frame(self)
+        body.pack(fill="both", expand=True)
+
+        sidebar = ttk.Frame(body)
+        sidebar.pack(side="left", fill="y", padx=5, pady=5)
+
+        self.content = ttk.Frame(body)
+        self.content.pack(side="right", fill="both", expand=True, padx=5, pady=5)
+
+        btn_specs = ["Dashboard", "New Order", "Customers", "Customer Profile", "Products"]
+        if self.app.current_user.can_view_reports():
+            btn_specs.append("Reports")
+        if self.app.current_user.can_manage_users():
+            btn_specs.append("Users")
+
+        self.page_names = btn_specs
+        for name in btn_specs:
+            ttk.Button(
+                sidebar,
+                text=name,
+                width=18,
+                command=lambda n=name: self.show_page(n)
+            ).pack(anchor="w", pady=3, padx=2)
+
+        self.show_page("Dashboard")
+        if self.PAGE_EVICT_AFTER_MS is not None:
+            self._evict_job = self.after(self.EVICT_CHECK_MS, self._evict_idle_pages)
+
+    def get_page(self, name):
+        """The page called name, built on first use; None if this user can't open it."""
+        page = self.pages.get(name)
+        if page is None and name in self.page_names:
+            page = page_class(name)(self.content, self.app)
+            page.place(relx=0, rely=0, relwidth=1, relheight=1)
+            self.pages[name] = page
+        return page
+
+    def show_page(self, name):
+        page = self.get_page(name)
+        if not page:
+            return
+        if page.TABLES is None:
+            page.records.clear()
+            page.refresh()
+        else:
+            stamp = self.app.db.table_versions(*page.TABLES)
+            if self._page_stamps.get(name) != stamp:
+                page.records.clear()
+                page.refresh()
+                self._page_stamps[name] = stamp
+        page.lift()
+        if self.current_page_name not in (None, name):
+            self._hidden_since[self.current_page_name] = time.monotonic()
+        self._hidden_since.pop(name, None)
+        self.current_page_name = name
+
+    def _evict_idle_pages(self):
+        cutoff = time.monotonic() - self.PAGE_EVICT_AFTER_MS / 1000
+        for name, since in list(self._hidden_since.items()):
+            page = self.pages[name]
+            if since < cutoff and page.can_evict():
+                page.destroy()
+                del self.pages[name]
+                del self._hidden_since[name]
+                self._page_stamps.pop(name, None)
+        self._evict_job = self.after(self.EVICT_CHECK_MS, self._evict_idle_pages)
+
+    def destroy(self):
+        if self._evict_job is not None:
+            self.after_cancel(self._evict_job)
+            self._evict_job = None
+        super().destroy()
+
+    def _open_new_order_window(self):
+        # Floating POS window for the current user, on its own connection
+        # so its transactions never interleave with the main window's
+        win = tk.Toplevel(self)
+        win.title("Excellence Coffee - New Order")
+        win.geometry("900x600")
+        db = self.app.db.clone()
+        pos_page = page_class("New Order")(win, self.app, db=db)
+        pos_page.pack(fill="both", expand=True)
+        pos_page.refresh()
+
+        def close_db(event):
+            # <Destroy> also fires when logout tears down MainApp with this
+            # window still open; child widgets send it too, so filter them
+            if event.widget is win:
+                db.close()
+
+        win.bind("<Destroy>", close_db, add="+")
+
+
+# ============================================================
+# Root Application
+# ============================================================
+
+class ExcellenceCoffeeApp(tk.Tk):
+    STOCK_SNAPSHOT_CHECK_MS = 60 * 60 * 1000
+
+    def __init__(self, login_screen=LoginScreen):
+        super().__init__()
+        self.login_screen = login_screen
+
+        self.configure(bg="#e5e5e5")
+
+        try:
+            self.state("zoomed")
+        except Exception:
+            self.attributes("-zoomed", True)
+
+        style = ttk.Style(self)
+        style.theme_use("default")
+        style.configure("TFrame", background="#e5e5e5")
+        style.configure("TLabel", background="#e5e5e5")
+        style.configure("TLabelframe", background="#e5e5e5")
+        style.configure("TLabelframe.Label", background="#e5e5e5")
+
+        self.db = DatabaseManager()
+        self.db.expire_loyalty_points()
+        self._snapshot_stock()
+        self.receipts = ReceiptRenderer(self, self.db)
+        self.report_cache = ReportCache(self.db)
+        self.current_user = None
+        self.logo_image = None
+        self.main_app = None
+        self._load_logo()
+
+        self.container = ttk.Frame(self)
+        self.container.pack(fill="both", expand=True)
+        self.show_login_screen()
+
+    def _snapshot_stock(self):
+        # Checked hourly so a till left running for days still gets its
+        # daily stock snapshot
+        self.db.snapshot_stock_if_due()
+        self.after(self.STOCK_SNAPSHOT_CHECK_MS, self._snapshot_stock)
+
+    def _load_logo(self):
+        if os.path.exists("logo_excellence.png"):
+            try:
+                self.logo_image = tk.PhotoImage(file="logo_excellence.png")
+            except Exception:
+                self.logo_image = None
+        else:
+            self.logo_image = None
+
+    def clear_container(self):
+        for widget in self.container.winfo_children():
+            widget.destroy()
+
+    def show_login_screen(self):
+        self.clear_container()
+        login = self.login_screen(self.container, self)
+        login.pack(fill="both", expand=True)
+
+    def show_main_app(self):
+        self.clear_container()
+        self.main_app = MainApp(self.container, self)
+        self.main_app.pack(fill="both", expand=True)
+
+    def logout(self):
+        self.current_user = None
+        self.show_login_screen()
+
+
+def main(login_screen=LoginScreen):
+    app = ExcellenceCoffeeApp(login_screen)
+    app.mainloop()
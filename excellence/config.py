@@ -0,0 +1,20 @@
+"""Shop-wide settings shared by the database and the UI."""
+
+
+GST_RATE = 0.15  # 15% GST in NZ (prices are GST-inclusive)
+
+# SQLite connection settings applied every time the database is opened.
+# "tuned" lets the POS window keep writing while reports read (WAL) and
+# only fsyncs at checkpoints instead of on every commit.
+STORAGE_PROFILES = {
+    "default": {},  # plain SQLite: rollback journal, synchronous=FULL
+    "tuned": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 64 * 1024 * 1024,   # 64 MB memory-mapped reads
+        "cache_size": -16000,            # ~16 MB page cache (negative = KiB)
+        "busy_timeout": 5000,            # ms to wait on a locked database
+        "foreign_keys": "ON",
+        "temp_store": "MEMORY",
+    },
+}
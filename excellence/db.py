@@ -0,0 +1,1759 @@
+"""SQLite storage for Excellence Coffee."""
+
+import sqlite3
+from datetime import datetime, timedelta
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from .config import STORAGE_PROFILES
+
+
+class InsufficientStockError(ValueError):
+    """Raised when an order cannot be filled; nothing is written."""
+
+    def __init__(self, lines):
+        # lines: list of dicts with product_id, name, requested, available
+        self.lines = lines
+        details = ", ".join(
+            f"{l['name']} (wanted {l['requested']}, {l['available']} left)" for l in lines
+        )
+        super().__init__(f"Not enough stock: {details}")
+
+
+class WriteCoordinator:
+    """
+    Serialises write transactions on one database file across every
+    DatabaseManager in this process: the main window, each floating POS
+    window and worker threads queue on one lock instead of racing for
+    SQLite's write lock. Reads never take it; under WAL they carry on
+    while a write is in progress.
+
+    Other processes (a second till) are handled by the connection's busy
+    timeout, and if that runs out the write is retried with backoff.
+    """
+    # Seconds to wait before each retry, with jitter so tills don't retry in step
+    RETRY_DELAYS = (0.05, 0.1, 0.2, 0.4, 0.8)
+
+    _coordinators = {}
+    _coordinators_lock = threading.Lock()
+
+    def __init__(self):
+        # Reentrant: start-up setup holds it around steps that write through
+        # _write_transaction themselves
+        self._lock = threading.RLock()
+        self.writes = 0
+        self.retries = 0
+
+    @classmethod
+    def for_database(cls, db_name):
+        """The shared coordinator for db_name."""
+        key = db_name if db_name == ":memory:" else os.path.abspath(db_name)
+        with cls._coordinators_lock:
+            if key not in cls._coordinators:
+                cls._coordinators[key] = cls()
+            return cls._coordinators[key]
+
+    @staticmethod
+    def _is_busy(error):
+        message = str(error).lower()
+        return "locked" in message or "busy" in message
+
+    def _retry(self, conn, work):
+        for delay in self.RETRY_DELAYS + (None,):
+            try:
+                return work()
+            except sqlite3.OperationalError as e:
+                if delay is None or not self._is_busy(e):
+                    raise
+                if conn.in_transaction:
+                    conn.rollback()
+                self.retries += 1
+                time.sleep(delay * random.uniform(0.5, 1.5))
+
+    def run(self, conn, work):
+        """
+        Call work() under the write lock, rolling back and calling it again
+        while another process holds the database. work must be safe to repeat.
+        """
+        with self._lock:
+            return self._retry(conn, work)
+
+    @contextmanager
+    def begin(self, conn):
+        """Hold the write lock and open a BEGIN IMMEDIATE transaction on conn."""
+        with self._lock:
+            self._retry(conn, lambda: conn.execute("BEGIN IMMEDIATE"))
+            self.writes += 1
+            yield
+
+
+class DatabaseManager:
+    def __init__(self, db_name="excellence_coffee.db", storage_profile="tuned"):
+        self._db_name = db_name
+        if isinstance(storage_profile, str):
+            storage_profile = STORAGE_PROFILES[storage_profile]
+        self._storage_profile = dict(storage_profile)
+        self._writes = WriteCoordinator.for_database(db_name)
+        # Per-table change counters, bumped by every write through this manager
+        self._table_versions = {}
+        self._data_version = None
+        self._external_changes = 0
+        self._conn = self._connect()
+        # Every step is idempotent, so a till starting while another one is
+        # writing simply runs the whole setup again
+        self._writes.run(self._conn, self._setup)
+
+    def _setup(self):
+        self._create_tables()
+        self._ensure_columns()
+        self._ensure_indexes()
+        self._ensure_default_admin()
+        self._ensure_default_products()
+        self._ensure_default_customers()
+        self._ensure_loyalty_ledger()
+        self._ensure_customer_stats()
+        self._sync_stock_alerts()
+        self._ensure_stock_movements()
+
+    def clone(self):
+        """
+        Another manager on the same database file with its own connection,
+        for worker threads (an SQLite connection stays on the thread that
+        opened it) and for each floating POS window. Writes still go through
+        the same WriteCoordinator. The schema already exists, so setup is
+        skipped.
+        """
+        other = object.__new__(type(self))
+        other._db_name = self._db_name
+        other._storage_profile = dict(self._storage_profile)
+        other._writes = self._writes
+        other._table_versions = {}
+        other._data_version = None
+        other._external_changes = 0
+        other._conn = other._connect()
+        return other
+
+    def close(self):
+        self._conn.close()
+
+    def _connect(self):
+        """Open the database and apply the storage profile pragmas."""
+        timeout = self._storage_profile.get("busy_timeout", 5000) / 1000.0
+        conn = sqlite3.connect(self._db_name, timeout=timeout)
+        conn.row_factory = sqlite3.Row
+        for pragma, value in self._storage_profile.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        return conn
+
+    def storage_settings(self):
+        """Current values of the pragmas in the storage profile."""
+        settings = {}
+        for pragma in STORAGE_PROFILES["tuned"]:
+            settings[pragma] = self._conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+        return settings
+
+    def _create_tables(self):
+        cursor = self._conn.cursor()
+
+        # Users table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password TEXT NOT NULL,
+                role TEXT NOT NULL
+            )
+        """)
+
+        # Customers table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS customers (
+                customer_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                phone TEXT,
+                address TEXT,
+                customer_type TEXT NOT NULL,
+                loyalty_points INTEGER DEFAULT 0
+            )
+        """)
+
+        # Products table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS products (
+                product_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                category TEXT,
+                price REAL NOT NULL,
+                stock_qty INTEGER NOT NULL DEFAULT 0,
+                description TEXT,
+                is_active INTEGER NOT NULL DEFAULT 1,
+                is_service INTEGER NOT NULL DEFAULT 0,
+                duration_minutes INTEGER DEFAULT 0,
+                low_stock_threshold INTEGER NOT NULL DEFAULT 5
+            )
+        """)
+
+        # Orders table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS orders (
+                order_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                customer_id INTEGER,
+                order_datetime TEXT NOT NULL,
+                total REAL NOT NULL,
+                discount REAL NOT NULL,
+                final_total REAL NOT NULL,
+                payment_method TEXT NOT NULL,
+                processed_by_user_id INTEGER NOT NULL,
+                is_refunded INTEGER NOT NULL DEFAULT 0,
+                refunded_amount REAL NOT NULL DEFAULT 0,
+                FOREIGN KEY (customer_id) REFERENCES customers(customer_id),
+                FOREIGN KEY (processed_by_user_id) REFERENCES users(user_id)
+            )
+        """)
+
+        # Order items table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS order_items (
+                item_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                order_id INTEGER NOT NULL,
+                product_id INTEGER NOT NULL,
+                quantity INTEGER NOT NULL,
+                unit_price REAL NOT NULL,
+                line_total REAL NOT NULL,
+                refunded_qty INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY (order_id) REFERENCES orders(order_id),
+                FOREIGN KEY (product_id) REFERENCES products(product_id)
+            )
+        """)
+
+        # Loyalty ledger: append-only earn / redeem / expire / adjust entries.
+        # customers.loyalty_points is the maintained balance (the sum of a
+        # customer's entries), updated in the same transaction as each entry.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS loyalty_ledger (
+                entry_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                customer_id INTEGER NOT NULL,
+                order_id INTEGER,
+                entry_type TEXT NOT NULL,
+                points INTEGER NOT NULL,
+                created_at TEXT NOT NULL,
+                FOREIGN KEY (customer_id) REFERENCES customers(customer_id),
+                FOREIGN KEY (order_id) REFERENCES orders(order_id)
+            )
+        """)
+
+        # Per-customer stats kept up to date on every order and refund.
+        # Counts and spend exclude fully refunded orders and partial refunds.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS customer_stats (
+                customer_id INTEGER PRIMARY KEY,
+                order_count INTEGER NOT NULL DEFAULT 0,
+                lifetime_spend REAL NOT NULL DEFAULT 0,
+                last_visit TEXT,
+                favourite_product_id INTEGER,
+                FOREIGN KEY (customer_id) REFERENCES customers(customer_id),
+                FOREIGN KEY (favourite_product_id) REFERENCES products(product_id)
+            )
+        """)
+        # Net quantity bought per customer and product, to pick the favourite
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS customer_product_totals (
+                customer_id INTEGER NOT NULL,
+                product_id INTEGER NOT NULL,
+                quantity INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (customer_id, product_id)
+            ) WITHOUT ROWID
+        """)
+
+        # Refunds, one row per refunded order line (whole-order refunds
+        # write a row for every line)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS refunds (
+                refund_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                order_id INTEGER NOT NULL,
+                item_id INTEGER NOT NULL,
+                product_id INTEGER NOT NULL,
+                quantity INTEGER NOT NULL,
+                amount REAL NOT NULL,
+                refunded_at TEXT NOT NULL,
+                processed_by_user_id INTEGER,
+                FOREIGN KEY (order_id) REFERENCES orders(order_id),
+                FOREIGN KEY (item_id) REFERENCES order_items(item_id),
+                FOREIGN KEY (processed_by_user_id) REFERENCES users(user_id)
+            )
+        """)
+
+        # Low-stock alerts, raised when a write takes stock down to the
+        # product's threshold and resolved when it goes back above it
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stock_alerts (
+                alert_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                product_id INTEGER NOT NULL,
+                stock_qty INTEGER NOT NULL,
+                threshold INTEGER NOT NULL,
+                source TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                acknowledged INTEGER NOT NULL DEFAULT 0,
+                resolved_at TEXT,
+                FOREIGN KEY (product_id) REFERENCES products(product_id)
+            )
+        """)
+
+        # Stock movements: append-only sale / refund / adjust / opening
+        # entries with the signed quantity and the price at the time.
+        # products.stock_qty is the current total of a product's movements.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stock_movements (
+                movement_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                product_id INTEGER NOT NULL,
+                movement_type TEXT NOT NULL,
+                quantity INTEGER NOT NULL,
+                order_id INTEGER,
+                price REAL NOT NULL,
+                created_at TEXT NOT NULL,
+                FOREIGN KEY (product_id) REFERENCES products(product_id),
+                FOREIGN KEY (order_id) REFERENCES orders(order_id)
+            )
+        """)
+        # Stock and price of every stocked product at snapshot_at, covering
+        # movements up to and including last_movement_id
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stock_snapshots (
+                snapshot_at TEXT NOT NULL,
+                product_id INTEGER NOT NULL,
+                stock_qty INTEGER NOT NULL,
+                price REAL NOT NULL,
+                last_movement_id INTEGER NOT NULL,
+                PRIMARY KEY (snapshot_at, product_id)
+            ) WITHOUT ROWID
+        """)
+
+        self._conn.commit()
+
+    # Columns added after the first release: table -> {column: definition}
+    COLUMNS = {
+        "products": {"low_stock_threshold": "INTEGER NOT NULL DEFAULT 5"},
+        "orders": {"refunded_amount": "REAL NOT NULL DEFAULT 0"},
+        "order_items": {"refunded_qty": "INTEGER NOT NULL DEFAULT 0"},
+    }
+
+    def _ensure_columns(self):
+        """Idempotent migration: add any missing column to an existing database."""
+        cursor = self._conn.cursor()
+        for table, columns in self.COLUMNS.items():
+            existing = {r["name"] for r in cursor.execute(f"PRAGMA table_info({table})")}
+            for column, definition in columns.items():
+                if column not in existing:
+                    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        self._conn.commit()
+
+    # Secondary indexes, added to new and existing databases alike
+    INDEXES = {
+        # customer_orders: WHERE customer_id = ? ORDER BY order_datetime DESC;
+        # also the join side of loyalty_summary
+        "idx_orders_customer_datetime": "orders(customer_id, order_datetime)",
+        # order history / exports ordered by date
+        "idx_orders_datetime": "orders(order_datetime)",
+        # foreign key checks when deleting users
+        "idx_orders_processed_by": "orders(processed_by_user_id)",
+        # get_order_with_items, refunds
+        "idx_order_items_order": "order_items(order_id)",
+        # foreign key checks and per-product sales lookups
+        "idx_order_items_product": "order_items(product_id)",
+        # open alert per product, checked on every stock write
+        "idx_stock_alerts_product": "stock_alerts(product_id, resolved_at)",
+        # refund history per order
+        "idx_refunds_order": "refunds(order_id)",
+        # balance as of a date, history and expiry per customer
+        "idx_loyalty_ledger_customer": "loyalty_ledger(customer_id, created_at)",
+        # movement history per product
+        "idx_stock_movements_product": "stock_movements(product_id, movement_id)",
+    }
+
+    def _ensure_indexes(self):
+        """Idempotent migration: create any missing secondary index."""
+        cursor = self._conn.cursor()
+        for name, target in self.INDEXES.items():
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+        self._conn.commit()
+
+    @contextmanager
+    def _write_transaction(self, *tables):
+        """
+        BEGIN IMMEDIATE ... COMMIT as one unit, rolled back on any error.
+        Taking the write lock up front means stock read inside the block
+        cannot change underneath us. The transaction is queued through the
+        WriteCoordinator, and the given tables are marked changed once the
+        commit succeeds.
+        """
+        with self._writes.begin(self._conn):
+            try:
+                yield self._conn.cursor()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            else:
+                self._conn.commit()
+        self._mark_changed(*tables)
+
+    # ---------------- Change tracking ----------------
+
+    def _mark_changed(self, *tables):
+        for table in tables:
+            self._table_versions[table] = self._table_versions.get(table, 0) + 1
+
+    def table_versions(self, *tables):
+        """
+        A stamp for the given tables that changes whenever any of them is
+        written. Writes from other connections (e.g. a second till process)
+        are caught through PRAGMA data_version and invalidate every stamp.
+        """
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._data_version is not None and data_version != self._data_version:
+            self._external_changes += 1
+        self._data_version = data_version
+        return (self._external_changes,) + tuple(
+            self._table_versions.get(table, 0) for table in tables
+        )
+
+    def _ensure_default_admin(self):
+        cursor = self._conn.cursor()
+        # Default admin: Excellence / Excellence
+        cursor.execute("SELECT * FROM users WHERE username = ?", ("Excellence",))
+        if cursor.fetchone() is None:
+            cursor.execute(
+                "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
+                ("Excellence", "Excellence", "admin")
+            )
+            self._conn.commit()
+
+    def _ensure_default_customers(self):
+        """Seed named customers with random loyalty points if they do not exist."""
+        cursor = self._conn.cursor()
+        default_names = [
+            "Yuki", "Stella", "Mayu", "Sia", "Selam",
+            "Subin", "Chika", "Vanessa", "Nourhan",
+            "Elizabeth", "Rawan",
+        ]
+        for name in default_names:
+            cursor.execute("SELECT 1 FROM customers WHERE name = ?", (name,))
+            if cursor.fetchone() is None:
+                points = random.randint(0, 300)
+                if points >= 200:
+                    ctype = "VIP"
+                elif points >= 100:
+                    ctype = "Member"
+                elif points >= 50:
+                    ctype = "Student"
+                else:
+                    ctype = "New"
+                cursor.execute(
+                    "INSERT INTO customers (name, phone, address, customer_type, loyalty_points) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (name, "", "", ctype, points),
+                )
+        self._conn.commit()
+
+
+    def _ensure_default_products(self):
+        """
+        Seed initial coffee + pastry menu if products table is empty.
+        Prices approximate NZD café pricing.
+        """
+        cursor = self._conn.cursor()
+        cursor.execute("SELECT COUNT(*) AS cnt FROM products")
+        cnt = cursor.fetchone()["cnt"]
+        if cnt > 0:
+            return
+
+        products = [
+            # Coffee & hot drinks
+            ("Flat White",              "Coffee", 5.50, 40, "Classic NZ flat white with smooth microfoam.", 0, 0),
+            ("Latte",                   "Coffee", 5.50, 40, "Espresso with steamed milk and light foam.", 0, 0),
+            ("Cappuccino",              "Coffee", 5.50, 35, "Balanced espresso with foam and cocoa dusting.", 0, 0),
+            ("Long Black",              "Coffee", 4.50, 30, "Double espresso over hot water.", 0, 0),
+            ("Espresso",                "Coffee", 3.80, 30, "Single shot of rich espresso.", 0, 0),
+            ("Mochaccino",              "Coffee", 6.00, 30, "Chocolate + espresso + steamed milk.", 0, 0),
+            ("Caramel Latte",           "Coffee", 6.20, 30, "Latte with caramel syrup and light foam.", 0, 0),
+            ("Iced Latte",              "Coffee", 6.50, 25, "Chilled espresso with cold milk and ice.", 0, 0),
+            ("Iced Mocha",              "Coffee", 6.80, 25, "Iced chocolate + espresso + milk.", 0, 0),
+            ("Hot Chocolate",           "Drink",  5.80, 25, "Creamy hot chocolate with marshmallows.", 0, 0),
+            ("Vanilla Chai Latte",      "Coffee", 6.20, 25, "Spiced chai with vanilla and steamed milk.", 0, 0),
+
+            # Pastries & sweets
+            ("Hazelnut Croissant",      "Pastry", 6.50, 20, "Buttery croissant filled with hazelnut cream.", 0, 0),
+            ("Almond Croissant",        "Pastry", 6.20, 20, "Flaky croissant with almond filling and flakes.", 0, 0),
+            ("Butter Croissant",        "Pastry", 5.00, 20, "Classic French-style butter croissant.", 0, 0),
+            ("Cinnamon Scroll",         "Pastry", 5.50, 18, "Soft roll with cinnamon sugar swirl.", 0, 0),
+            ("Banana Bread Slice",      "Pastry", 5.00, 18, "Moist banana bread slice, toasted on request.", 0, 0),
+            ("Blueberry Muffin",        "Pastry", 4.80, 18, "Soft muffin with fresh blueberries.", 0, 0),
+            ("Chocolate Brownie",       "Pastry", 5.50, 18, "Rich chocolate brownie, slightly fudgy.", 0, 0),
+            ("Biscoff Cheesecake Slice","Pastry", 7.50, 16, "Creamy cheesecake with Biscoff base and crumble.", 0, 0),
+        ]
+
+        cursor.executemany("""
+            INSERT INTO products
+                (name, category, price, stock_qty, description, is_service, duration_minutes)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, products)
+        self._conn.commit()
+
+    # ---------------- User operations ----------------
+
+    def authenticate_user(self, username, password):
+        cursor = self._conn.cursor()
+        cursor.execute(
+            "SELECT * FROM users WHERE username = ? AND password = ?",
+            (username, password)
+        )
+        return cursor.fetchone()
+
+    def get_all_users(self):
+        cursor = self._conn.cursor()
+        cursor.execute("SELECT * FROM users")
+        return cursor.fetchall()
+
+    def add_user(self, username, password, role):
+        with self._write_transaction("users") as cursor:
+            cursor.execute("""
+                INSERT INTO users (username, password, role)
+                VALUES (?, ?, ?)
+            """, (username, password, role))
+
+    def delete_user(self, user_id):
+        # sqlite3.IntegrityError (user still has orders) is rolled back and raised
+        with self._write_transaction("users") as cursor:
+            cursor.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
+
+    # ---------------- Customer operations ----------------
+
+    def get_all_customers(self):
+        cursor = self._conn.cursor()
+        cursor.execute("SELECT * FROM customers")
+        return cursor.fetchall()
+
+    def add_customer(self, name, phone, customer_type, address):
+        with self._write_transaction("customers") as cursor:
+            cursor.execute("""
+                INSERT INTO customers (name, phone, address, customer_type)
+                VALUES (?, ?, ?, ?)
+            """, (name, phone, address, customer_type))
+
+    def update_customer(self, customer_id, name, phone, address, customer_type):
+        with self._write_transaction("customers") as cursor:
+            cursor.execute("""
+                UPDATE customers
+                SET name=?, phone=?, address=?, customer_type=?
+                WHERE customer_id=?
+            """, (name, phone, address, customer_type, customer_id))
+
+    def update_customer_loyalty(self, customer_id, points_to_add):
+        """Manual points adjustment, recorded in the loyalty ledger."""
+        with self._write_transaction("customers", "loyalty_ledger") as cursor:
+            self._post_loyalty(cursor, [(customer_id, None, "adjust", points_to_add)])
+
+    # ---------------- Loyalty ledger ----------------
+
+    # Earned points not spent within this many days expire (oldest first)
+    LOYALTY_EXPIRY_DAYS = 365
+
+    def _post_loyalty(self, cursor, entries, when=None):
+        """
+        Append (customer_id, order_id, entry_type, points) entries and move
+        each customer's cached balance by the same amount, inside the
+        caller's transaction.
+        """
+        entries = [e for e in entries if e[3]]
+        if not entries:
+            return
+        when = when or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cursor.executemany("""
+            INSERT INTO loyalty_ledger (customer_id, order_id, entry_type, points, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, [(cid, oid, kind, points, when) for cid, oid, kind, points in entries])
+
+        per_customer = {}
+        for cid, _, _, points in entries:
+            per_customer[cid] = per_customer.get(cid, 0) + points
+        cursor.executemany("""
+            UPDATE customers
+            SET loyalty_points = loyalty_points + ?
+            WHERE customer_id = ?
+        """, [(points, cid) for cid, points in per_customer.items()])
+
+    def _ensure_loyalty_ledger(self):
+        """
+        Idempotent migration: customers whose balance predates the ledger
+        get one opening 'adjust' entry so ledger and cache agree.
+        """
+        cursor = self._conn.cursor()
+        cursor.execute("""
+            INSERT INTO loyalty_ledger (customer_id, order_id, entry_type, points, created_at)
+            SELECT c.customer_id, NULL, 'adjust', c.loyalty_points, ?
+            FROM customers c
+            WHERE c.loyalty_points != 0
+              AND NOT EXISTS (
+                  SELECT 1 FROM loyalty_ledger l WHERE l.customer_id = c.customer_id
+              )
+        """, (datetime.now().strftime("%Y-%m-%d %H:%M:%S"),))
+        self._conn.commit()
+
+    def loyalty_balance(self, customer_id, as_of=None):
+        """
+        Points balance now (from the cached balance), or as it stood at
+        as_of ('YYYY-MM-DD HH:MM:SS' or a date) from the ledger.
+        Returns None if the customer does not exist.
+        """
+        cursor = self._conn.cursor()
+        if as_of is None:
+            cursor.execute(
+                "SELECT loyalty_points FROM customers WHERE customer_id = ?", (customer_id,)
+            )
+            row = cursor.fetchone()
+            return row["loyalty_points"] if row else None
+
+        if len(as_of) == 10:  # a whole day: include everything on it
+            as_of += " 23:59:59"
+        cursor.execute("""
+            SELECT COALESCE(SUM(points), 0) AS balance
+            FROM loyalty_ledger
+            WHERE customer_id = ? AND created_at <= ?
+        """, (customer_id, as_of))
+        return cursor.fetchone()["balance"]
+
+    def loyalty_history(self, customer_id, limit=None):
+        cursor = self._conn.cursor()
+        query = """
+            SELECT entry_id, order_id, entry_type, points, created_at
+            FROM loyalty_ledger
+            WHERE customer_id = ?
+            ORDER BY created_at DESC, entry_id DESC
+        """
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        cursor.execute(query, (customer_id,))
+        return cursor.fetchall()
+
+    def expire_loyalty_points(self, as_of=None):
+        """
+        Expire points earned more than LOYALTY_EXPIRY_DAYS ago that have not
+        been spent. Spending uses the oldest points first, so what expires
+        per customer is (points earned before the cutoff) - (all points
+        ever spent or expired), when positive. One INSERT ... SELECT writes
+        every customer's expiry entry and one UPDATE moves the cached
+        balances. Returns the number of customers affected.
+        """
+        now = as_of or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cutoff = (datetime.strptime(now[:10], "%Y-%m-%d")
+                  - timedelta(days=self.LOYALTY_EXPIRY_DAYS)).strftime("%Y-%m-%d")
+
+        with self._write_transaction("customers", "loyalty_ledger") as cursor:
+            cursor.execute("SELECT COALESCE(MAX(entry_id), 0) FROM loyalty_ledger")
+            last_entry = cursor.fetchone()[0]
+            cursor.execute("""
+                INSERT INTO loyalty_ledger (customer_id, order_id, entry_type, points, created_at)
+                SELECT customer_id, NULL, 'expire', -expiring, ?
+                FROM (
+                    SELECT customer_id,
+                           SUM(CASE WHEN points > 0 AND created_at < ? THEN points ELSE 0 END)
+                           + SUM(CASE WHEN points < 0 THEN points ELSE 0 END) AS expiring
+                    FROM loyalty_ledger
+                    GROUP BY customer_id
+                )
+                WHERE expiring > 0
+            """, (now, cutoff))
+            expired = cursor.rowcount
+            if expired:
+                cursor.execute("""
+                    UPDATE customers
+                    SET loyalty_points = loyalty_points + (
+                        SELECT points FROM loyalty_ledger l
+                        WHERE l.customer_id = customers.customer_id AND l.entry_id > ?
+                    )
+                    WHERE customer_id IN (
+                        SELECT customer_id FROM loyalty_ledger WHERE entry_id > ?
+                    )
+                """, (last_entry, last_entry))
+        return expired
+
+    def customer_orders(self, customer_id, limit=None):
+        cursor = self._conn.cursor()
+        query = """
+            SELECT order_id, order_datetime, final_total,
+                   payment_method, is_refunded, refunded_amount
+            FROM orders
+            WHERE customer_id = ?
+            ORDER BY order_datetime DESC
+        """
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        cursor.execute(query, (customer_id,))
+        return cursor.fetchall()
+
+    def get_customer(self, customer_id):
+        cursor = self._conn.cursor()
+        cursor.execute("SELECT * FROM customers WHERE customer_id = ?", (customer_id,))
+        return cursor.fetchone()
+
+    def customer_summary(self, customer_id):
+        """
+        Customer row plus order_count, lifetime_spend, last_visit and
+        favourite_product from customer_stats; None if unknown.
+        """
+        cursor = self._conn.cursor()
+        cursor.execute("""
+            SELECT c.*,
+                   COALESCE(s.order_count, 0) AS order_count,
+                   COALESCE(s.lifetime_spend, 0) AS lifetime_spend,
+                   s.last_visit,
+                   p.name AS favourite_product
+            FROM customers c
+            LEFT JOIN customer_stats s ON s.customer_id = c.customer_id
+            LEFT JOIN products p ON p.product_id = s.favourite_product_id
+            WHERE c.customer_id = ?
+        """, (customer_id,))
+        return cursor.fetchone()
+
+    def customer_order_page(self, customer_id, page_size=20, before=None):
+        """
+        One page of a customer's orders, newest first, as (rows, next_cursor).
+        Pass next_cursor back as before for the next (older) page; it is
+        None when there are no more. Keyset paging on the
+        (customer_id, order_datetime) index keeps deep pages as cheap as
+        the first.
+        """
+        where, params = "customer_id = ?", [customer_id]
+        if before:
+            where += " AND (order_datetime, order_id) < (?, ?)"
+            params += list(before)
+        cursor = self._conn.cursor()
+        cursor.execute(f"""
+            SELECT order_id, order_datetime, final_total,
+                   payment_method, is_refunded, refunded_amount
+            FROM orders
+            WHERE {where}
+            ORDER BY order_datetime DESC, order_id DESC
+            LIMIT ?
+        """, params + [page_size + 1])
+        rows = cursor.fetchall()
+
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = (rows[-1]["order_datetime"], rows[-1]["order_id"])
+        return rows, next_cursor
+
+    # ---------------- Customer stats ----------------
+
+    def _refresh_favourites(self, cursor, customer_ids):
+        cursor.executemany("""
+            UPDATE customer_stats
+            SET favourite_product_id = (
+                SELECT product_id FROM customer_product_totals t
+                WHERE t.customer_id = ? AND t.quantity > 0
+                ORDER BY t.quantity DESC, t.product_id
+                LIMIT 1
+            )
+            WHERE customer_id = ?
+        """, [(cid, cid) for cid in customer_ids])
+
+    def _record_customer_sale(self, cursor, customer_id, items, final_total, dt):
+        """Fold a new order into customer_stats inside the order's transaction."""
+        cursor.execute("""
+            INSERT INTO customer_stats (customer_id, order_count, lifetime_spend, last_visit)
+            VALUES (?, 1, ROUND(?, 2), ?)
+            ON CONFLICT (customer_id) DO UPDATE SET
+                order_count = order_count + 1,
+                lifetime_spend = ROUND(lifetime_spend + excluded.lifetime_spend, 2),
+                last_visit = MAX(COALESCE(last_visit, ''), excluded.last_visit)
+        """, (customer_id, final_total, dt))
+
+        bought = {}
+        for i in items:
+            bought[i["product_id"]] = bought.get(i["product_id"], 0) + i["qty"]
+        cursor.executemany("""
+            INSERT INTO customer_product_totals (customer_id, product_id, quantity)
+            VALUES (?, ?, ?)
+            ON CONFLICT (customer_id, product_id) DO UPDATE SET
+                quantity = quantity + excluded.quantity
+        """, [(customer_id, pid, qty) for pid, qty in bought.items()])
+        self._refresh_favourites(cursor, [customer_id])
+
+    def _record_customer_refund(self, cursor, rows):
+        """Take refunded lines (see _plan_refund) back out of customer_stats."""
+        order_ids = list({r[0] for r in rows})
+        cursor.execute(f"""
+            SELECT order_id, customer_id, is_refunded
+            FROM orders
+            WHERE order_id IN ({",".join("?" * len(order_ids))})
+              AND customer_id IS NOT NULL
+        """, order_ids)
+        orders = {o["order_id"]: o for o in cursor.fetchall()}
+        if not orders:
+            return
+
+        spend, closed, returned = {}, {}, {}
+        for order_id, _, product_id, qty, amount, _ in rows:
+            order = orders.get(order_id)
+            if order is None:
+                continue
+            cid = order["customer_id"]
+            spend[cid] = spend.get(cid, 0.0) + amount
+            returned[(cid, product_id)] = returned.get((cid, product_id), 0) + qty
+        for order in orders.values():
+            # _plan_refund rejects refunded orders, so any flag set now is new
+            if order["is_refunded"]:
+                closed[order["customer_id"]] = closed.get(order["customer_id"], 0) + 1
+
+        cursor.executemany("""
+            UPDATE customer_stats
+            SET lifetime_spend = ROUND(lifetime_spend - ?, 2),
+                order_count = order_count - ?
+            WHERE customer_id = ?
+        """, [(amount, closed.get(cid, 0), cid) for cid, amount in spend.items()])
+        cursor.executemany("""
+            UPDATE customer_product_totals
+            SET quantity = quantity - ?
+            WHERE customer_id = ? AND product_id = ?
+        """, [(qty, cid, pid) for (cid, pid), qty in returned.items()])
+        self._refresh_favourites(cursor, list(spend))
+
+    def rebuild_customer_stats(self):
+        """Recompute customer_stats from the order history (repair / first run)."""
+        with self._write_transaction("customer_stats") as cursor:
+            cursor.execute("DELETE FROM customer_stats")
+            cursor.execute("DELETE FROM customer_product_totals")
+            cursor.execute("""
+                INSERT INTO customer_stats (customer_id, order_count, lifetime_spend, last_visit)
+                SELECT customer_id,
+                       SUM(is_refunded = 0),
+                       ROUND(SUM(ROUND(final_total, 2) - refunded_amount), 2),
+                       MAX(order_datetime)
+                FROM orders
+                WHERE customer_id IS NOT NULL
+                GROUP BY customer_id
+            """)
+            cursor.execute("""
+                INSERT INTO customer_product_totals (customer_id, product_id, quantity)
+                SELECT o.customer_id, oi.product_id, SUM(oi.quantity - oi.refunded_qty)
+                FROM order_items oi
+                JOIN orders o ON o.order_id = oi.order_id
+                WHERE o.customer_id IS NOT NULL
+                GROUP BY o.customer_id, oi.product_id
+            """)
+            cursor.execute("""
+                UPDATE customer_stats
+                SET favourite_product_id = (
+                    SELECT product_id FROM customer_product_totals t
+                    WHERE t.customer_id = customer_stats.customer_id AND t.quantity > 0
+                    ORDER BY t.quantity DESC, t.product_id
+                    LIMIT 1
+                )
+            """)
+
+    def _ensure_customer_stats(self):
+        """Idempotent migration: build the stats once for databases that predate them."""
+        cursor = self._conn.cursor()
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM customer_stats)")
+        has_stats = cursor.fetchone()[0]
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM orders WHERE customer_id IS NOT NULL)")
+        has_orders = cursor.fetchone()[0]
+        if has_orders and not has_stats:
+            self.rebuild_customer_stats()
+
+    # ---------------- Product operations ----------------
+
+    def get_product(self, product_id):
+        cursor = self._conn.cursor()
+        cursor.execute("SELECT * FROM products WHERE product_id = ?", (product_id,))
+        return cursor.fetchone()
+
+    def get_all_products(self):
+        cursor = self._conn.cursor()
+        cursor.execute("SELECT * FROM products WHERE is_active = 1")
+        return cursor.fetchall()
+
+    def add_product_full(self, name, category, price, stock_qty,
+                         description, is_service, duration_minutes,
+                         low_stock_threshold=5):
+        with self._write_transaction("products", "stock_alerts", "stock_movements") as cursor:
+            cursor.execute("""
+                INSERT INTO products
+                    (name, category, price, stock_qty, description,
+                     is_active, is_service, duration_minutes, low_stock_threshold)
+                VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?)
+            """, (name, category, price, stock_qty, description,
+                  is_service, duration_minutes, low_stock_threshold))
+            product_id = cursor.lastrowid
+            self._record_stock_movements(cursor, [(product_id, "adjust", stock_qty, None)])
+            self._check_stock_levels(cursor, [product_id], "adjust")
+
+    def update_product_full(self, product_id, name, category, price,
+                            stock_qty, description, is_service, duration_minutes,
+                            low_stock_threshold=None):
+        """
+        Save the product form. A change of stock count is recorded as an
+        'adjust' movement of the difference; a price change alone is recorded
+        as a zero-quantity one, so valuations at later dates use the new price.
+        """
+        with self._write_transaction("products", "stock_alerts", "stock_movements") as cursor:
+            cursor.execute(
+                "SELECT stock_qty, price FROM products WHERE product_id = ?", (product_id,)
+            )
+            before = cursor.fetchone()
+            cursor.execute("""
+                UPDATE products
+                SET name=?, category=?, price=?, stock_qty=?, description=?,
+                    is_service=?, duration_minutes=?, is_active=1,
+                    low_stock_threshold=COALESCE(?, low_stock_threshold)
+                WHERE product_id=?
+            """, (name, category, price, stock_qty, description,
+                  is_service, duration_minutes, low_stock_threshold, product_id))
+            if before is not None and (stock_qty != before["stock_qty"]
+                                       or price != before["price"]):
+                self._record_stock_movements(
+                    cursor, [(product_id, "adjust", stock_qty - before["stock_qty"], None)]
+                )
+            self._check_stock_levels(cursor, [product_id], "adjust")
+
+    def delete_product(self, product_id):
+        with self._write_transaction("products", "stock_alerts") as cursor:
+            cursor.execute("""
+                UPDATE products
+                SET is_active = 0
+                WHERE product_id = ?
+            """, (product_id,))
+            self._check_stock_levels(cursor, [product_id], "adjust")
+
+    def get_low_stock_products(self, threshold=None):
+        """Stocked items at or below threshold (each product's own threshold if None)."""
+        cursor = self._conn.cursor()
+        cursor.execute("""
+            SELECT name, category, stock_qty
+            FROM products
+            WHERE is_active = 1 AND is_service = 0
+              AND stock_qty <= COALESCE(?, low_stock_threshold)
+            ORDER BY stock_qty ASC
+        """, (threshold,))
+        return cursor.fetchall()
+
+    # ---------------- Low-stock alerts ----------------
+
+    def _check_stock_levels(self, cursor, product_ids=None, source="adjust"):
+        """
+        Open or resolve low-stock alerts for the products a write just
+        touched (every product when product_ids is None). An alert opens
+        when stock is at or below the product's threshold and is resolved
+        once it is back above, so each crossing is recorded exactly once.
+        """
+        query = """
+            SELECT p.product_id, p.stock_qty, p.low_stock_threshold,
+                   p.is_service, p.is_active, a.alert_id
+            FROM products p
+            LEFT JOIN stock_alerts a
+                ON a.product_id = p.product_id AND a.resolved_at IS NULL
+        """
+        params = []
+        if product_ids is not None:
+            if not product_ids:
+                return
+            query += f" WHERE p.product_id IN ({','.join('?' * len(product_ids))})"
+            params = list(product_ids)
+        cursor.execute(query, params)
+
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        raised, resolved = [], []
+        for r in cursor.fetchall():
+            low = (r["is_active"] and not r["is_service"]
+                   and r["stock_qty"] <= r["low_stock_threshold"])
+            if low and r["alert_id"] is None:
+                raised.append((r["product_id"], r["stock_qty"],
+                               r["low_stock_threshold"], source, now))
+            elif not low and r["alert_id"] is not None:
+                resolved.append((now, r["alert_id"]))
+
+        if raised:
+            cursor.executemany("""
+                INSERT INTO stock_alerts (product_id, stock_qty, threshold, source, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, raised)
+        if resolved:
+            cursor.executemany(
+                "UPDATE stock_alerts SET resolved_at = ? WHERE alert_id = ?", resolved
+            )
+
+    def _sync_stock_alerts(self):
+        """One pass at start-up so stock written by older versions is covered."""
+        self._check_stock_levels(self._conn.cursor())
+        self._conn.commit()
+
+    def open_stock_alerts(self):
+        """Unresolved alerts nobody has dismissed yet, newest first."""
+        cursor = self._conn.cursor()
+        cursor.execute("""
+            SELECT a.alert_id, a.created_at, a.source, a.threshold,
+                   p.product_id, p.name, p.category, p.stock_qty
+            FROM stock_alerts a
+            JOIN products p ON p.product_id = a.product_id
+            WHERE a.resolved_at IS NULL AND a.acknowledged = 0
+            ORDER BY a.created_at DESC, a.alert_id DESC
+        """)
+        return cursor.fetchall()
+
+    def acknowledge_stock_alerts(self, alert_ids):
+        with self._write_transaction("stock_alerts") as cursor:
+            cursor.executemany(
+                "UPDATE stock_alerts SET acknowledged = 1 WHERE alert_id = ?",
+                [(alert_id,) for alert_id in alert_ids]
+            )
+
+    # ---------------- Stock history ----------------
+
+    # A snapshot is taken when the latest one is older than this
+    STOCK_SNAPSHOT_EVERY_HOURS = 24
+
+    def _record_stock_movements(self, cursor, movements, when=None):
+        """
+        Append (product_id, movement_type, quantity, order_id) movements
+        inside an open write transaction, after stock_qty has been written.
+        The product's price at the time is stored with each one.
+        """
+        if not movements:
+            return
+        when = when or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cursor.executemany("""
+            INSERT INTO stock_movements
+                (product_id, movement_type, quantity, order_id, price, created_at)
+            SELECT product_id, ?, ?, ?, price, ?
+            FROM products
+            WHERE product_id = ?
+        """, [(kind, qty, order_id, when, pid) for pid, kind, qty, order_id in movements])
+
+    def _ensure_stock_movements(self):
+        """
+        Idempotent migration: products with no movements get one 'opening'
+        movement of their current stock, so movements and stock_qty agree.
+        Stock before that point is not known.
+        """
+        cursor = self._conn.cursor()
+        cursor.execute("""
+            INSERT INTO stock_movements
+                (product_id, movement_type, quantity, order_id, price, created_at)
+            SELECT p.product_id, 'opening', p.stock_qty, NULL, p.price, ?
+            FROM products p
+            WHERE NOT EXISTS (
+                SELECT 1 FROM stock_movements m WHERE m.product_id = p.product_id
+            )
+        """, (datetime.now().strftime("%Y-%m-%d %H:%M:%S"),))
+        self._conn.commit()
+
+    def take_stock_snapshot(self):
+        """Record every stocked product's stock and price now; returns the snapshot time."""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._write_transaction("stock_snapshots") as cursor:
+            cursor.execute("""
+                INSERT OR REPLACE INTO stock_snapshots
+                    (snapshot_at, product_id, stock_qty, price, last_movement_id)
+                SELECT ?, product_id, stock_qty, price,
+                       (SELECT COALESCE(MAX(movement_id), 0) FROM stock_movements)
+                FROM products
+                WHERE is_service = 0
+            """, (now,))
+        return now
+
+    def snapshot_stock_if_due(self):
+        """Take a snapshot if the latest is older than STOCK_SNAPSHOT_EVERY_HOURS."""
+        cursor = self._conn.cursor()
+        cursor.execute("SELECT MAX(snapshot_at) FROM stock_snapshots")
+        latest = cursor.fetchone()[0]
+        due = (datetime.now()
+               - timedelta(hours=self.STOCK_SNAPSHOT_EVERY_HOURS)).strftime("%Y-%m-%d %H:%M:%S")
+        if latest is not None and latest > due:
+            return None
+        return self.take_stock_snapshot()
+
+    def stock_at(self, as_of):
+        """
+        Stock and price of each stocked product as it stood at as_of
+        ('YYYY-MM-DD HH:MM:SS' or a date). Starts from the latest snapshot
+        taken by then and adds only the movements between it and the next
+        snapshot, rather than replaying all history. Products with no
+        history by then are left out.
+        """
+        if len(as_of) == 10:  # a whole day: include everything on it
+            as_of += " 23:59:59"
+        cursor = self._conn.cursor()
+        cursor.execute("""
+            SELECT snapshot_at, last_movement_id FROM stock_snapshots
+            WHERE snapshot_at <= ?
+            ORDER BY snapshot_at DESC LIMIT 1
+        """, (as_of,))
+        before = cursor.fetchone()
+        snapshot_at, first_id = (before[0], before[1]) if before else (None, 0)
+        # Every movement up to as_of is covered by the next snapshot after it
+        cursor.execute("""
+            SELECT last_movement_id FROM stock_snapshots
+            WHERE snapshot_at > ?
+            ORDER BY snapshot_at LIMIT 1
+        """, (as_of,))
+        after = cursor.fetchone()
+        if after is None:
+            cursor.execute("SELECT COALESCE(MAX(movement_id), 0) FROM stock_movements")
+            after = cursor.fetchone()
+        last_id = after[0]
+
+        cursor.execute("""
+            SELECT p.product_id, p.name, p.category,
+                   COALESCE(s.stock_qty, 0) + COALESCE(m.moved, 0) AS stock_qty,
+                   COALESCE(m.price, s.price) AS price
+            FROM products p
+            LEFT JOIN stock_snapshots s
+                ON s.snapshot_at = ? AND s.product_id = p.product_id
+            LEFT JOIN (
+                -- with a single MAX(), SQLite takes price from that row,
+                -- i.e. the price at the product's latest movement
+                SELECT product_id, SUM(quantity) AS moved, price, MAX(movement_id)
+                FROM stock_movements
+                WHERE movement_id > ? AND movement_id <= ? AND created_at <= ?
+                GROUP BY product_id
+            ) m ON m.product_id = p.product_id
+            WHERE p.is_service = 0
+              AND (s.product_id IS NOT NULL OR m.product_id IS NOT NULL)
+            ORDER BY p.name
+        """, (snapshot_at, first_id, last_id, as_of))
+        return cursor.fetchall()
+
+    def stock_valuation(self, as_of=None):
+        """(units, value at the selling price then) of stocked products, now or at as_of."""
+        if as_of is not None:
+            rows = self.stock_at(as_of)
+            return (sum(r["stock_qty"] for r in rows),
+                    round(sum(r["stock_qty"] * r["price"] for r in rows), 2))
+        cursor = self._conn.cursor()
+        cursor.execute("""
+            SELECT COALESCE(SUM(stock_qty), 0), COALESCE(SUM(stock_qty * price), 0)
+            FROM products
+            WHERE is_service = 0
+        """)
+        units, value = cursor.fetchone()
+        return units, round(value, 2)
+
+    def stock_movement_history(self, product_id, limit=None):
+        cursor = self._conn.cursor()
+        query = """
+            SELECT movement_id, movement_type, quantity, order_id, price, created_at
+            FROM stock_movements
+            WHERE product_id = ?
+            ORDER BY movement_id DESC
+        """
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        cursor.execute(query, (product_id,))
+        return cursor.fetchall()
+
+    # ---------------- Orders / Sales ----------------
+
+    # Membership discounts (%) applied automatically at the till
+    MEMBERSHIP_DISCOUNTS = {"VIP": 10.0, "Student": 5.0, "Member": 2.0}
+    # Loyalty balance at which a customer is promoted to VIP
+    VIP_PROMOTION_POINTS = 500
+
+    @staticmethod
+    def _order_totals(items, discount_percent, fixed_discount_value=0.0):
+        """
+        (total, total_discount_value, final_total) for a cart. The final
+        total is what the customer is charged, so it is rounded to cents.
+        """
+        total = sum(i["price"] * i["qty"] for i in items)
+        percent_discount_value = total * (discount_percent / 100.0)
+        total_discount_value = percent_discount_value + float(fixed_discount_value or 0.0)
+        final_total = round(max(0.0, total - total_discount_value), 2)
+        return total, total_discount_value, final_total
+
+    def _insert_order(self, cursor, customer_id, items, totals,
+                      payment_method, processed_by_user_id):
+        """
+        Write an order, its items and the stock decrement using the cursor of
+        an open write transaction. Returns (order_id, order_datetime).
+        """
+        total, total_discount_value, final_total = totals
+        dt = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        # Stock needed per product (the same product may appear on several lines)
+        needed = {}
+        names = {}
+        for i in items:
+            if not i.get("is_service", 0):
+                needed[i["product_id"]] = needed.get(i["product_id"], 0) + i["qty"]
+                names[i["product_id"]] = i["name"]
+
+        # We hold the write lock, so stock read here is what we decrement
+        if needed:
+            placeholders = ",".join("?" * len(needed))
+            cursor.execute(
+                f"SELECT product_id, stock_qty FROM products WHERE product_id IN ({placeholders})",
+                list(needed)
+            )
+            available = {r["product_id"]: r["stock_qty"] for r in cursor.fetchall()}
+            failed = [
+                {"product_id": pid, "name": names[pid], "requested": qty,
+                 "available": max(0, available.get(pid, 0))}
+                for pid, qty in needed.items() if available.get(pid, 0) < qty
+            ]
+            if failed:
+                raise InsufficientStockError(failed)
+
+        cursor.execute("""
+            INSERT INTO orders (
+                customer_id, order_datetime, total, discount,
+                final_total, payment_method, processed_by_user_id
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (customer_id, dt, total, total_discount_value,
+              final_total, payment_method, processed_by_user_id))
+        order_id = cursor.lastrowid
+
+        cursor.executemany("""
+            INSERT INTO order_items (
+                order_id, product_id, quantity, unit_price, line_total
+            ) VALUES (?, ?, ?, ?, ?)
+        """, [(order_id, i["product_id"], i["qty"], i["price"], i["price"] * i["qty"])
+              for i in items])
+
+        # The guard keeps stock from going negative even if the check above
+        # is ever bypassed; a short product is simply not updated
+        cursor.executemany("""
+            UPDATE products
+            SET stock_qty = stock_qty - ?
+            WHERE product_id = ? AND stock_qty >= ?
+        """, [(qty, pid, qty) for pid, qty in needed.items()])
+        if cursor.rowcount != len(needed):
+            raise ValueError("Stock changed while saving the order. Please try again.")
+        self._record_stock_movements(
+            cursor, [(pid, "sale", -qty, order_id) for pid, qty in needed.items()], dt
+        )
+        self._check_stock_levels(cursor, list(needed), "sale")
+        if customer_id:
+            self._record_customer_sale(cursor, customer_id, items, final_total, dt)
+
+        return order_id, dt
+
+    def create_order(self, customer_id, items, discount_percent,
+                     payment_method, processed_by_user_id, fixed_discount_value=0.0):
+        """
+        Create an order with percentage and optional fixed discount.
+        Runs as a single transaction: if any stocked line is short the whole
+        order is rolled back and InsufficientStockError lists the failed lines.
+        """
+        totals = self._order_totals(items, discount_percent, fixed_discount_value)
+        with self._write_transaction(
+            "orders", "order_items", "products", "stock_alerts", "customer_stats",
+            "stock_movements"
+        ) as cursor:
+            order_id, dt = self._insert_order(
+                cursor, customer_id, items, totals, payment_method, processed_by_user_id
+            )
+        total, total_discount_value, final_total = totals
+        return order_id, dt, total, total_discount_value, final_total
+
+    def _sale_customer(self, cursor, customer_id, redeem_points):
+        """(customer row or None, membership discount %) for a sale."""
+        if not customer_id:
+            return None, 0.0
+        cursor.execute(
+            "SELECT customer_type, loyalty_points FROM customers WHERE customer_id = ?",
+            (customer_id,)
+        )
+        customer = cursor.fetchone()
+        if customer is None:
+            raise ValueError("Customer not found.")
+        if redeem_points > customer["loyalty_points"]:
+            raise ValueError("Customer does not have enough points to redeem.")
+        return customer, self.MEMBERSHIP_DISCOUNTS.get(customer["customer_type"], 0.0)
+
+    def quote_order(self, customer_id, items, extra_discount_percent,
+                    redeem_points=0, redeem_percent_discount=0.0, redeem_fixed_discount=0.0):
+        """
+        Price a cart exactly as finalize_sale would, without writing anything.
+        Returns a dict with total, discount, final_total and auto_discount.
+        """
+        customer, auto_discount = self._sale_customer(
+            self._conn.cursor(), customer_id, redeem_points
+        )
+        discount_percent = auto_discount + extra_discount_percent + redeem_percent_discount
+        total, total_discount_value, final_total = self._order_totals(
+            items, discount_percent, redeem_fixed_discount
+        )
+        return {
+            "total": total,
+            "discount": total_discount_value,
+            "final_total": final_total,
+            "auto_discount": auto_discount,
+        }
+
+    def finalize_sale(self, customer_id, items, extra_discount_percent,
+                      payment_method, processed_by_user_id, redeem_points=0,
+                      redeem_percent_discount=0.0, redeem_fixed_discount=0.0,
+                      amount_received=None):
+        """
+        Complete a sale in one transaction (one commit):
+        membership discount lookup, order + items + stock, loyalty points
+        earned (1 per $1) minus points redeemed, and VIP promotion.
+        extra_discount_percent covers manual and promo discounts.
+        If amount_received is given (cash) and does not cover the total,
+        ValueError is raised before anything is written.
+        Returns a dict describing the saved order.
+        """
+        with self._write_transaction(
+            "orders", "order_items", "products", "customers", "stock_alerts",
+            "loyalty_ledger", "customer_stats", "stock_movements"
+        ) as cursor:
+            customer, auto_discount = self._sale_customer(cursor, customer_id, redeem_points)
+
+            discount_percent = auto_discount + extra_discount_percent + redeem_percent_discount
+            totals = self._order_totals(items, discount_percent, redeem_fixed_discount)
+            if amount_received is not None and amount_received < totals[2]:
+                raise ValueError(
+                    f"Amount received (${amount_received:.2f}) is less than "
+                    f"the total (${totals[2]:.2f})."
+                )
+            order_id, dt = self._insert_order(
+                cursor, customer_id, items, totals, payment_method, processed_by_user_id
+            )
+            total, total_discount_value, final_total = totals
+
+            points_earned = 0
+            points_balance = None
+            customer_type = None
+            if customer is not None:
+                points_earned = int(final_total)
+                net_points = points_earned - redeem_points
+                self._post_loyalty(cursor, [
+                    (customer_id, order_id, "redeem", -redeem_points),
+                    (customer_id, order_id, "earn", points_earned),
+                ], when=dt)
+                points_balance = customer["loyalty_points"] + net_points
+                if points_balance >= self.VIP_PROMOTION_POINTS:
+                    cursor.execute(
+                        "UPDATE customers SET customer_type = 'VIP' WHERE customer_id = ?",
+                        (customer_id,)
+                    )
+                customer_type = ("VIP" if points_balance >= self.VIP_PROMOTION_POINTS
+                                 else customer["customer_type"])
+
+        return {
+            "order_id": order_id,
+            "order_datetime": dt,
+            "total": total,
+            "discount": total_discount_value,
+            "final_total": final_total,
+            "auto_discount": auto_discount,
+            "points_earned": points_earned,
+            "points_redeemed": redeem_points if customer is not None else 0,
+            "points_balance": points_balance,
+            "customer_type": customer_type,
+        }
+
+    def get_order_with_items(self, order_id):
+        cursor = self._conn.cursor()
+        cursor.execute("SELECT * FROM orders WHERE order_id = ?", (order_id,))
+        order = cursor.fetchone()
+        if not order:
+            return None, []
+
+        cursor.execute("""
+            SELECT oi.*, p.name AS product_name, p.is_service
+            FROM order_items oi
+            JOIN products p ON oi.product_id = p.product_id
+            WHERE oi.order_id = ?
+        """, (order_id,))
+        items = cursor.fetchall()
+        return order, items
+
+    def receipt_orders(self, order_ids=None, start_date=None, end_date=None):
+        """
+        Orders with their items and staff name, ready for receipt printing.
+        Select by order_ids, or by an inclusive YYYY-MM-DD date range.
+        Two queries in total, however many orders match.
+        Returns a list of (order, items) in date order.
+        """
+        if order_ids is not None:
+            marks = ",".join("?" * len(order_ids))
+            where, params = f"o.order_id IN ({marks})", list(order_ids)
+        else:
+            where, params = self._date_range_clause(start_date, end_date)
+
+        cursor = self._conn.cursor()
+        cursor.execute(f"""
+            SELECT o.*, COALESCE(u.username, 'Unknown') AS staff_name
+            FROM orders o
+            LEFT JOIN users u ON u.user_id = o.processed_by_user_id
+            WHERE {where}
+            ORDER BY o.order_datetime, o.order_id
+        """, params)
+        orders = cursor.fetchall()
+
+        cursor.execute(f"""
+            SELECT oi.*, p.name AS product_name, p.is_service
+            FROM order_items oi
+            JOIN orders o ON o.order_id = oi.order_id
+            JOIN products p ON oi.product_id = p.product_id
+            WHERE {where}
+            ORDER BY oi.order_id, oi.item_id
+        """, params)
+        items_by_order = {}
+        for item in cursor.fetchall():
+            items_by_order.setdefault(item["order_id"], []).append(item)
+
+        return [(o, items_by_order.get(o["order_id"], [])) for o in orders]
+
+    @staticmethod
+    def _plan_refund(order, items, lines=None):
+        """
+        Refund rows (order_id, item_id, product_id, qty, amount, is_service)
+        for one order. lines maps item_id -> quantity; None refunds whatever
+        is left on every line. Amounts are the line's share of what the
+        customer actually paid (after order discounts); a refund that
+        completes the order takes the rounding remainder so the order's
+        refunds add up to its final total exactly.
+        """
+        if order["is_refunded"] == 1:
+            raise ValueError(f"Order {order['order_id']} already refunded.")
+
+        by_id = {i["item_id"]: i for i in items}
+        if lines is None:
+            lines = {i["item_id"]: i["quantity"] - i["refunded_qty"] for i in items}
+        paid_ratio = order["final_total"] / order["total"] if order["total"] else 0.0
+
+        rows = []
+        for item_id, qty in lines.items():
+            item = by_id.get(item_id)
+            if item is None:
+                raise ValueError(f"Line {item_id} is not on order {order['order_id']}.")
+            remaining = item["quantity"] - item["refunded_qty"]
+            if qty < 0 or qty > remaining:
+                raise ValueError(
+                    f"Cannot refund {qty} x {item['product_name']} "
+                    f"({remaining} left to refund)."
+                )
+            if qty:
+                amount = round(item["unit_price"] * qty * paid_ratio, 2)
+                rows.append([order["order_id"], item_id, item["product_id"],
+                             qty, amount, item["is_service"]])
+        if not rows:
+            raise ValueError(f"Nothing left to refund on order {order['order_id']}.")
+
+        refunded_now = {r[1]: r[3] for r in rows}
+        completes = all(
+            i["quantity"] - i["refunded_qty"] == refunded_now.get(i["item_id"], 0)
+            for i in items
+        )
+        if completes:
+            # Orders saved before totals were rounded may hold half cents
+            already = order["refunded_amount"] + sum(r[4] for r in rows[:-1])
+            rows[-1][4] = round(round(order["final_total"], 2) - already, 2)
+        return rows
+
+    def _apply_refunds(self, cursor, rows, processed_by_user_id=None):
+        """
+        Write planned refund rows inside an open write transaction:
+        refund records, line counters, one executemany for stock, order
+        totals/flags, then low-stock alert upkeep. Returns the amount refunded.
+        """
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cursor.executemany("""
+            INSERT INTO refunds (
+                order_id, item_id, product_id, quantity, amount,
+                refunded_at, processed_by_user_id
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [(o, i, p, q, a, now, processed_by_user_id) for o, i, p, q, a, _ in rows])
+
+        # Guarded so a concurrent refund can never take a line below zero
+        cursor.executemany("""
+            UPDATE order_items
+            SET refunded_qty = refunded_qty + ?
+            WHERE item_id = ? AND quantity - refunded_qty >= ?
+        """, [(q, i, q) for _, i, _, q, _, _ in rows])
+        if cursor.rowcount != len(rows):
+            raise ValueError("Order changed while refunding. Please try again.")
+
+        # restore stock only for non-service items, one row per product,
+        # and one movement per product and order
+        restock = {}
+        returned = {}
+        for order_id, _, pid, qty, _, is_service in rows:
+            if not is_service:
+                restock[pid] = restock.get(pid, 0) + qty
+                returned[(order_id, pid)] = returned.get((order_id, pid), 0) + qty
+        cursor.executemany("""
+            UPDATE products
+            SET stock_qty = stock_qty + ?
+            WHERE product_id = ?
+        """, [(qty, pid) for pid, qty in restock.items()])
+        self._record_stock_movements(
+            cursor,
+            [(pid, "refund", qty, order_id) for (order_id, pid), qty in returned.items()],
+            now
+        )
+
+        per_order = {}
+        for order_id, _, _, _, amount, _ in rows:
+            per_order[order_id] = per_order.get(order_id, 0.0) + amount
+        cursor.executemany("""
+            UPDATE orders
+            SET refunded_amount = ROUND(refunded_amount + ?, 2),
+                is_refunded = NOT EXISTS (
+                    SELECT 1 FROM order_items oi
+                    WHERE oi.order_id = orders.order_id
+                      AND oi.refunded_qty < oi.quantity
+                )
+            WHERE order_id = ?
+        """, [(amount, order_id) for order_id, amount in per_order.items()])
+
+        self._check_stock_levels(cursor, list(restock), "refund")
+        self._record_customer_refund(cursor, rows)
+        return round(sum(per_order.values()), 2)
+
+    def refund_order(self, order_id, lines=None, processed_by_user_id=None):
+        """
+        Refund a whole order, or only some of it: lines maps item_id to the
+        quantity to give back. Runs as one transaction and returns the
+        amount refunded.
+        """
+        with self._write_transaction(
+            "orders", "order_items", "products", "refunds", "stock_alerts", "customer_stats",
+            "stock_movements"
+        ) as cursor:
+            order, items = self.get_order_with_items(order_id)
+            if not order:
+                raise ValueError("Order not found.")
+            rows = self._plan_refund(order, items, lines)
+            return self._apply_refunds(cursor, rows, processed_by_user_id)
+
+    def refund_orders(self, order_ids, processed_by_user_id=None):
+        """
+        Fully refund many orders in one transaction: all of them or none.
+        Orders and lines are read in two queries. Returns the total refunded.
+        """
+        order_ids = list(dict.fromkeys(order_ids))
+        if not order_ids:
+            return 0.0
+        marks = ",".join("?" * len(order_ids))
+        with self._write_transaction(
+            "orders", "order_items", "products", "refunds", "stock_alerts", "customer_stats",
+            "stock_movements"
+        ) as cursor:
+            cursor.execute(f"SELECT * FROM orders WHERE order_id IN ({marks})", order_ids)
+            orders = {o["order_id"]: o for o in cursor.fetchall()}
+            missing = [oid for oid in order_ids if oid not in orders]
+            if missing:
+                raise ValueError(f"Order(s) not found: {', '.join(map(str, missing))}")
+
+            cursor.execute(f"""
+                SELECT oi.*, p.name AS product_name, p.is_service
+                FROM order_items oi
+                JOIN products p ON oi.product_id = p.product_id
+                WHERE oi.order_id IN ({marks})
+            """, order_ids)
+            items_by_order = {}
+            for item in cursor.fetchall():
+                items_by_order.setdefault(item["order_id"], []).append(item)
+
+            rows = []
+            for oid in order_ids:
+                rows.extend(self._plan_refund(orders[oid], items_by_order.get(oid, [])))
+            return self._apply_refunds(cursor, rows, processed_by_user_id)
+
+    # ---------------- Reports / Aggregates ----------------
+
+    # Rows pulled per fetchmany() when streaming large result sets
+    EXPORT_BATCH_SIZE = 500
+
+    @staticmethod
+    def _date_range_clause(start_date=None, end_date=None, column="o.order_datetime"):
+        """
+        WHERE fragment and params for an inclusive YYYY-MM-DD range on a
+        datetime column. Either end may be None (open-ended).
+        """
+        clauses, params = [], []
+        if start_date:
+            clauses.append(f"{column} >= ?")
+            params.append(start_date)
+        if end_date:
+            day_after = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
+            clauses.append(f"{column} < ?")
+            params.append(day_after.strftime("%Y-%m-%d"))
+        return " AND ".join(clauses) or "1 = 1", params
+
+    def iter_rows(self, query, params=(), batch_size=None):
+        """Yield the rows of a query in fetchmany() batches instead of all at once."""
+        cursor = self._conn.cursor()
+        cursor.execute(query, params)
+        batch_size = batch_size or self.EXPORT_BATCH_SIZE
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+
+    def revenue_by_customer_type(self, start_date=None, end_date=None):
+        """Net revenue per customer type, optionally for a YYYY-MM-DD range."""
+        where, params = self._date_range_clause(start_date, end_date)
+        cursor = self._conn.cursor()
+        cursor.execute(f"""
+            SELECT
+                COALESCE(c.customer_type, 'Unknown') AS customer_type,
+                SUM(o.final_total - o.refunded_amount) AS revenue
+            FROM orders o
+            LEFT JOIN customers c ON o.customer_id = c.customer_id
+            WHERE o.is_refunded = 0 AND {where}
+            GROUP BY customer_type
+        """, params)
+        return cursor.fetchall()
+
+    def inventory_status(self):
+        cursor = self._conn.cursor()
+        cursor.execute("""
+            SELECT name, category, price, stock_qty
+            FROM products
+            WHERE is_active = 1
+            ORDER BY name
+        """)
+        return cursor.fetchall()
+
+    def get_all_orders_with_customers(self, start_date=None, end_date=None):
+        return list(self.iter_orders_with_customers(start_date, end_date))
+
+    def iter_orders_with_customers(self, start_date=None, end_date=None):
+        """Stream orders (newest first), optionally limited to a date range."""
+        where, params = self._date_range_clause(start_date, end_date)
+        return self.iter_rows(f"""
+            SELECT
+                o.order_id,
+                o.order_datetime,
+                o.total,
+                o.discount,
+                o.final_total,
+                o.payment_method,
+                o.is_refunded,
+                COALESCE(c.name, 'Walk-in') AS customer_name,
+                COALESCE(c.customer_type, 'Unknown') AS customer_type,
+                u.username AS staff_username
+            FROM orders o
+            LEFT JOIN customers c ON o.customer_id = c.customer_id
+            JOIN users u ON o.processed_by_user_id = u.user_id
+            WHERE {where}
+            ORDER BY o.order_datetime DESC
+        """, params)
+
+    def iter_customers(self):
+        return self.iter_rows("SELECT * FROM customers ORDER BY customer_id")
+
+    def loyalty_summary(self):
+        cursor = self._conn.cursor()
+        cursor.execute("""
+            SELECT
+                c.customer_id,
+                c.name,
+                c.customer_type,
+                c.loyalty_points,
+                COALESCE(s.order_count, 0) AS num_orders,
+                COALESCE(s.lifetime_spend, 0) AS total_spent
+            FROM customers c
+            LEFT JOIN customer_stats s ON s.customer_id = c.customer_id
+            ORDER BY total_spent DESC
+        """)
+        return cursor.fetchall()
+
+
+# ============================================================
+# Report cache
+# ============================================================
+
+class ReportCache:
+    """
+    Report results keyed by report name and arguments, each stamped with
+    table_versions() of the tables the report reads. Orders and refunds
+    move the stamp, so the next lookup misses and the report is run again.
+    Lookups happen on the Tk thread; run() can be called from a worker
+    thread with that thread's own DatabaseManager.
+    """
+    # report (a DatabaseManager method) -> tables it reads
+    REPORTS = {
+        "revenue_by_customer_type": ("orders", "customers"),
+        "inventory_status": ("products",),
+    }
+
+    def __init__(self, db):
+        self._db = db
+        self._results = {}
+
+    def stamp(self, report):
+        return self._db.table_versions(*self.REPORTS[report])
+
+    def get(self, report, args, stamp):
+        """Cached rows for report(*args) if still current at stamp, else None."""
+        cached = self._results.get((report, args))
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        return None
+
+    def put(self, report, args, stamp, rows):
+        self._results[(report, args)] = (stamp, rows)
+
+    @classmethod
+    def run(cls, db, report, args):
+        if report not in cls.REPORTS:
+            raise KeyError(report)
+        return getattr(db, report)(*args)
+
+
+# ============================================================
+# Record cache (identity map for page lookups)
+# ============================================================
+
+class RecordCache:
+    """
+    Identity map in front of DatabaseManager lookups by id, so a page
+    reads each customer or product once per refresh no matter how many
+    widgets ask for it. MainApp clears it before every page refresh, and
+    an entry is also dropped as soon as the tables it came from change.
+    """
+    # kind -> (DatabaseManager method, tables the result depends on)
+    LOOKUPS = {
+        "customer": ("get_customer", ("customers",)),
+        "customer_summary": ("customer_summary", ("customers", "customer_stats")),
+        "points_balance": ("loyalty_balance", ("customers",)),
+        "product": ("get_product", ("products",)),
+    }
+
+    def __init__(self, db):
+        self._db = db
+        self._rows = {}
+
+    def clear(self):
+        self._rows.clear()
+
+    def _get(self, kind, key):
+        method, tables = self.LOOKUPS[kind]
+        stamp = self._db.table_versions(*tables)
+        cached = self._rows.get((kind, key))
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        value = getattr(self._db, method)(key)
+        self._rows[(kind, key)] = (stamp, value)
+        return value
+
+    def customer(self, customer_id):
+        return self._get("customer", customer_id)
+
+    def customer_summary(self, customer_id):
+        return self._get("customer_summary", customer_id)
+
+    def points_balance(self, customer_id):
+        return self._get("points_balance", customer_id)
+
+    def product(self, product_id):
+        return self._get("product", product_id)
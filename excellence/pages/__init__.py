@@ -0,0 +1,24 @@
+"""
+Pages of the main window. Each page lives in its own module, imported the
+first time the page is needed, so the login screen comes up without
+loading the sales, report or PDF code.
+"""
+
+from importlib import import_module
+
+# page name -> "module:Class" within this package
+PAGES = {
+    "Dashboard": "dashboard:DashboardPage",
+    "New Order": "sales:SalesPage",
+    "Customers": "customers:CustomersPage",
+    "Customer Profile": "customers:CustomerProfilePage",
+    "Products": "products:ProductsPage",
+    "Reports": "reports:ReportsPage",
+    "Users": "users:UsersPage",
+}
+
+
+def page_class(name):
+    """Import the module for page name and return its class."""
+    module, cls = PAGES[name].split(":")
+    return getattr(import_module("." + module, __name__), cls)
@@ -0,0 +1,46 @@
+"""Base class for the pages shown in the main window."""
+
+from tkinter import ttk
+
+from ..db import RecordCache
+
+
+class BasePage(ttk.Frame):
+    # Tables refresh() reads from; MainApp skips refresh() when none of
+    # them changed since the last one. None means always refresh.
+    TABLES = None
+
+    def __init__(self, parent, app, *args, db=None, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.app = app
+        # The page's own DatabaseManager if it was given one (a floating
+        # POS window), otherwise the app's shared one
+        self.db = db if db is not None else app.db
+        self._records = None
+
+    @property
+    def records(self):
+        """This page's RecordCache, for lookups by id."""
+        if self._records is None:
+            self._records = RecordCache(self.db)
+        return self._records
+
+    @staticmethod
+    def _order_line(o):
+        """One line of order history text."""
+        if o["is_refunded"] == 1:
+            status = "REFUNDED"
+        elif o["refunded_amount"]:
+            status = f"PART REFUNDED ${o['refunded_amount']:.2f}"
+        else:
+            status = "Completed"
+        return (f"Order {o['order_id']} | {o['order_datetime']} | "
+                f"${o['final_total']:.2f} | {o['payment_method']} | {status}\n")
+
+    def refresh(self):
+        """Polymorphic: called when page is shown."""
+        pass
+
+    def can_evict(self):
+        """False while destroying the hidden page would lose work in progress."""
+        return True
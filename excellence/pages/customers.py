@@ -0,0 +1,311 @@
+"""Customer list and customer profile pages."""
+
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from .base import BasePage
+
+
+class CustomersPage(BasePage):
+    TABLES = ("customers",)
+    HISTORY_PAGE_SIZE = 25
+
+    def __init__(self, parent, app, db=None):
+        super().__init__(parent, app, db=db)
+        self.selected_customer_id = None
+        self._history_cursor = None
+        self._build_ui()
+
+    def _build_ui(self):
+        main = ttk.Frame(self)
+        main.pack(fill="both", expand=True, padx=10, pady=10)
+        main.columnconfigure(0, weight=3)
+        main.columnconfigure(1, weight=1)
+
+
+        left = ttk.Frame(main)
+        left.grid(row=0, column=0, sticky="nsew", padx=(0,8))
+
+        right = ttk.Frame(main)
+        right.grid(row=0, column=1, sticky="n", padx=(8,0))
+
+        # Customer list
+        list_frame = ttk.LabelFrame(left, text="Customers")
+        list_frame.pack(fill="both", expand=True, pady=5)
+
+        columns = ("id", "name", "phone", "address", "type", "points")
+        self.cust_tree = ttk.Treeview(list_frame, columns=columns,
+                                      show="headings", height=15)
+        for c in columns:
+            self.cust_tree.heading(c, text=c.title())
+        self.cust_tree.pack(fill="both", expand=True, padx=5, pady=5)
+        self.cust_tree.bind("<<TreeviewSelect>>", self._on_select)
+
+        ttk.Button(list_frame, text="Open Profile", command=self._open_profile)\
+            .pack(pady=5)
+
+        # Add / edit customer
+        form = ttk.LabelFrame(left, text="Add / Edit Customer")
+        form.pack(fill="x", pady=5)
+
+        ttk.Label(form, text="Name:").grid(row=0, column=0, padx=5, pady=3, sticky="w")
+        self.name_e = ttk.Entry(form, width=20)
+        self.name_e.grid(row=0, column=1, padx=5, pady=3)
+
+        ttk.Label(form, text="Phone:").grid(row=1, column=0, padx=5, pady=3, sticky="w")
+        self.phone_e = ttk.Entry(form, width=20)
+        self.phone_e.grid(row=1, column=1, padx=5, pady=3)
+
+        ttk.Label(form, text="Address:").grid(row=2, column=0, padx=5, pady=3, sticky="w")
+        self.addr_e = ttk.Entry(form, width=20)
+        self.addr_e.grid(row=2, column=1, padx=5, pady=3)
+
+        ttk.Label(form, text="Type:").grid(row=3, column=0, padx=5, pady=3, sticky="w")
+        self.type_box = ttk.Combobox(form, values=["New", "Member", "VIP", "Student"],
+                                     state="readonly", width=18)
+        self.type_box.set("New")
+        self.type_box.grid(row=3, column=1, padx=5, pady=3)
+
+        ttk.Button(form, text="Add", command=self._add_customer)\
+            .grid(row=4, column=0, pady=5, padx=5, sticky="ew")
+        ttk.Button(form, text="Update Selected", command=self._update_customer)\
+            .grid(row=4, column=1, pady=5, padx=5, sticky="ew")
+
+        # History
+        hist_frame = ttk.LabelFrame(right, text="Customer Transaction & Loyalty History")
+        hist_frame.pack(fill="both", expand=True, pady=5)
+
+        self.history_text = tk.Text(hist_frame, height=25)
+        self.history_text.pack(fill="both", expand=True, padx=5, pady=5)
+
+        self.more_history_btn = ttk.Button(hist_frame, text="Load Older Orders",
+                                           command=self._load_more_history,
+                                           state="disabled")
+        self.more_history_btn.pack(pady=(0, 5))
+
+    def refresh(self):
+        self._load_customers()
+
+    def _load_customers(self):
+        for r in self.cust_tree.get_children():
+            self.cust_tree.delete(r)
+        customers = self.db.get_all_customers()
+        for c in customers:
+            self.cust_tree.insert("", "end",
+                                  values=(c["customer_id"], c["name"], c["phone"],
+                                          c["address"], c["customer_type"],
+                                          c["loyalty_points"]))
+
+    def _add_customer(self):
+        name = self.name_e.get().strip()
+        phone = self.phone_e.get().strip()
+        addr = self.addr_e.get().strip()
+        ctype = self.type_box.get()
+        if not name:
+            messagebox.showwarning("Customer", "Name is required.")
+            return
+        self.db.add_customer(name, phone, ctype, addr)
+        self._load_customers()
+        self._clear_form()
+
+    def _update_customer(self):
+        if not self.selected_customer_id:
+            messagebox.showwarning("Customer", "Select a customer first.")
+            return
+
+        name = self.name_e.get().strip()
+        phone = self.phone_e.get().strip()
+        addr = self.addr_e.get().strip()
+        ctype = self.type_box.get()
+
+        self.db.update_customer(self.selected_customer_id, name, phone, addr, ctype)
+        self._load_customers()
+        messagebox.showinfo("Customer", "Customer updated successfully.")
+
+    def _clear_form(self):
+        self.selected_customer_id = None
+        self.name_e.delete(0, "end")
+        self.phone_e.delete(0, "end")
+        self.addr_e.delete(0, "end")
+        self.type_box.set("New")
+
+    def _on_select(self, event):
+        sel = self.cust_tree.selection()
+        if not sel:
+            return
+        vals = self.cust_tree.item(sel[0], "values")
+        self.selected_customer_id = int(vals[0])
+        self.name_e.delete(0, "end")
+        self.name_e.insert(0, vals[1])
+        self.phone_e.delete(0, "end")
+        self.phone_e.insert(0, vals[2])
+        self.addr_e.delete(0, "end")
+        self.addr_e.insert(0, vals[3])
+        self.type_box.set(vals[4])
+        self._load_history()
+
+    def _load_history(self):
+        self.history_text.delete("1.0", "end")
+        self._history_cursor = None
+        self.more_history_btn.config(state="disabled")
+        if not self.selected_customer_id:
+            return
+
+        s = self.records.customer_summary(self.selected_customer_id)
+        if s:
+            self.history_text.insert(
+                "end",
+                f"Orders: {s['order_count']} | Spent: ${s['lifetime_spend']:.2f} | "
+                f"Last visit: {s['last_visit'] or 'never'} | "
+                f"Favourite: {s['favourite_product'] or '-'}\n\n"
+            )
+        self.history_text.insert("end", "Transaction History\n")
+        self.history_text.insert("end", "-------------------------------\n")
+        self._load_more_history()
+
+    def _load_more_history(self):
+        if not self.selected_customer_id:
+            return
+        orders, self._history_cursor = self.db.customer_order_page(
+            self.selected_customer_id, self.HISTORY_PAGE_SIZE, before=self._history_cursor
+        )
+        for o in orders:
+            self.history_text.insert("end", self._order_line(o))
+        self.more_history_btn.config(state="normal" if self._history_cursor else "disabled")
+
+    def _open_profile(self):
+        if not self.selected_customer_id:
+            messagebox.showwarning("Profile", "Select a customer first.")
+            return
+        page = self.app.main_app.get_page("Customer Profile")
+        if page:
+            page.load_customer(self.selected_customer_id)
+            self.app.main_app.show_page("Customer Profile")
+
+
+# ============================================================
+# Customer Profile Page
+# ============================================================
+
+class CustomerProfilePage(BasePage):
+    TABLES = ("customers", "orders", "loyalty_ledger", "customer_stats")
+    HISTORY_PAGE_SIZE = 10
+
+    def __init__(self, parent, app, db=None):
+        super().__init__(parent, app, db=db)
+        self.current_customer_id = None
+        self._orders = []
+        self._orders_cursor = None
+        self._points_log = []
+        self._build_ui()
+
+    def _build_ui(self):
+        main = ttk.Frame(self)
+        main.pack(fill="both", expand=True, padx=20, pady=20)
+
+        left = ttk.Frame(main)
+        left.grid(row=0, column=0, sticky="nsew", padx=(0,8))
+
+        self.avatar = ttk.Label(left, text="👤", font=("Segoe UI Emoji", 80))
+        self.avatar.pack(pady=10)
+
+        self.name_lbl = ttk.Label(left, text="Name: -", font=("Segoe UI", 14, "bold"))
+        self.name_lbl.pack(pady=5)
+
+        self.badge_lbl = ttk.Label(left, text="[No Level]", font=("Segoe UI", 12))
+        self.badge_lbl.pack(pady=5)
+
+        ttk.Label(left, text="Loyalty Progress:", font=("Segoe UI", 11)).pack(pady=(20, 5))
+        self.progress = ttk.Progressbar(left, orient="horizontal", length=220, mode="determinate")
+        self.progress.pack()
+
+        self.points_lbl = ttk.Label(left, text="Points: 0", font=("Segoe UI", 10))
+        self.points_lbl.pack(pady=5)
+
+        self.stats_lbl = ttk.Label(left, text="", font=("Segoe UI", 10), justify="center")
+        self.stats_lbl.pack(pady=5)
+
+        right = ttk.Frame(main)
+        right.grid(row=0, column=1, sticky="n", padx=(8,0))
+
+        title = ttk.Label(right, text="Transaction History", font=("Segoe UI", 14, "bold"))
+        title.pack(pady=10)
+
+        self.trans_text = tk.Text(right, height=20)
+        self.trans_text.pack(fill="both", expand=True)
+
+        self.more_btn = ttk.Button(right, text="Load Older Orders",
+                                   command=self._load_older_orders, state="disabled")
+        self.more_btn.pack(pady=5)
+
+    def refresh(self):
+        if not self.current_customer_id:
+            self.name_lbl.config(text="No customer selected")
+            return
+
+        db = self.db
+        c = self.records.customer_summary(self.current_customer_id)
+
+        if not c:
+            self.name_lbl.config(text="Customer not found")
+            return
+
+        self.name_lbl.config(text=f"Name: {c['name']}")
+        self.points_lbl.config(text=f"Points: {c['loyalty_points']}")
+        self.stats_lbl.config(
+            text=f"Orders: {c['order_count']}  |  Spent: ${c['lifetime_spend']:.2f}\n"
+                 f"Last visit: {c['last_visit'] or 'never'}\n"
+                 f"Favourite: {c['favourite_product'] or '-'}"
+        )
+
+        color_map = {
+            "VIP": "gold",
+            "Student": "#4ca3ff",
+            "Member": "#74c476",
+            "New": "gray"
+        }
+        color = color_map.get(c["customer_type"], "gray")
+
+        self.badge_lbl.config(
+            text=f"{c['customer_type']}",
+            foreground=color,
+            font=("Segoe UI", 12, "bold")
+        )
+
+        pct = min(100, int((c["loyalty_points"] / 500) * 100))
+        self.progress["value"] = pct
+
+        self._orders, self._orders_cursor = db.customer_order_page(
+            self.current_customer_id, self.HISTORY_PAGE_SIZE
+        )
+        self._points_log = db.loyalty_history(self.current_customer_id, limit=10)
+        self._render_history()
+
+    def _load_older_orders(self):
+        if not self._orders_cursor:
+            return
+        orders, self._orders_cursor = self.db.customer_order_page(
+            self.current_customer_id, self.HISTORY_PAGE_SIZE, before=self._orders_cursor
+        )
+        self._orders.extend(orders)
+        self._render_history()
+
+    def _render_history(self):
+        self.trans_text.delete("1.0", "end")
+        for o in self._orders:
+            self.trans_text.insert("end", self._order_line(o))
+        self.more_btn.config(state="normal" if self._orders_cursor else "disabled")
+
+        if self._points_log:
+            self.trans_text.insert("end", "\nPoints History (Last 10)\n")
+            for entry in self._points_log:
+                order_ref = f" | Order {entry['order_id']}" if entry["order_id"] else ""
+                self.trans_text.insert(
+                    "end",
+                    f"{entry['created_at']} | {entry['entry_type']} | "
+                    f"{entry['points']:+d}{order_ref}\n"
+                )
+
+    def load_customer(self, cid):
+        self.current_customer_id = cid
+        self.refresh()
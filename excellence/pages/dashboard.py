@@ -0,0 +1,42 @@
+"""Dashboard page (the only page with the logo)."""
+
+from tkinter import ttk
+
+from .base import BasePage
+
+
+class DashboardPage(BasePage):
+    TABLES = ()
+
+    def __init__(self, parent, app, db=None):
+        super().__init__(parent, app, db=db)
+        self._build_ui()
+
+    def _build_ui(self):
+        center = ttk.Frame(self)
+        center.place(relx=0.5, rely=0.5, anchor="center")
+
+        if self.app.logo_image is not None:
+            ttk.Label(center, image=self.app.logo_image).pack(pady=10)
+        else:
+            ttk.Label(center, text="Excellence Coffee",
+                      font=("Segoe UI", 20, "bold")).pack(pady=10)
+
+        ttk.Label(
+            center,
+            text="Coffee Shop Management System",
+            font=("Segoe UI", 14)
+        ).pack(pady=5)
+
+        ttk.Label(
+            center,
+            text="Welcome, " + self.app.current_user.username,
+            font=("Segoe UI", 11)
+        ).pack(pady=10)
+
+        ttk.Label(
+            center,
+            text="Use the menu on the left to access New Order, Customers, Products, Reports, and User Management.",
+            wraplength=500,
+            justify="center"
+        ).pack(pady=5)
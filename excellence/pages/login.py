@@ -0,0 +1,78 @@
+"""Staff login screen."""
+
+from tkinter import ttk, messagebox
+
+from ..users import user_from_row
+
+
+class LoginScreen(ttk.Frame):
+    # Layout knobs, so a till can subclass the screen instead of copying it
+    TITLE = "Staff Login"
+    LABEL_WIDTH = 12
+    ENTRY_WIDTH = 25
+
+    def __init__(self, parent, app):
+        super().__init__(parent)
+        self.app = app
+        self._build_ui()
+
+    def _build_ui(self):
+        self.app.title("Excellence Coffee - Login")
+
+        container = ttk.Frame(self)
+        container.place(relx=0.5, rely=0.5, anchor="center")
+
+        # Logo
+        if self.app.logo_image is not None:
+            logo_label = ttk.Label(container, image=self.app.logo_image)
+            logo_label.pack(pady=10)
+        else:
+            ttk.Label(
+                container,
+                text="Excellence Coffee",
+                font=("Segoe UI", 18, "bold")
+            ).pack(pady=10)
+
+        ttk.Label(
+            container,
+            text=self.TITLE,
+            font=("Segoe UI", 14, "bold")
+        ).pack(pady=5)
+
+        # Username row
+        username_row = ttk.Frame(container)
+        username_row.pack(fill="x", pady=5)
+
+        ttk.Label(username_row, text="Username:", width=self.LABEL_WIDTH, anchor="e")\
+            .grid(row=0, column=0, padx=5)
+
+        self.username_entry = ttk.Entry(username_row, width=self.ENTRY_WIDTH)
+        self.username_entry.grid(row=0, column=1, padx=5)
+
+        # Password row
+        password_row = ttk.Frame(container)
+        password_row.pack(fill="x", pady=5)
+
+        ttk.Label(password_row, text="Password:", width=self.LABEL_WIDTH, anchor="e")\
+            .grid(row=0, column=0, padx=5)
+
+        self.password_entry = ttk.Entry(password_row, width=self.ENTRY_WIDTH, show="*")
+        self.password_entry.grid(row=0, column=1, padx=5)
+
+        # Login button
+        ttk.Button(container, text="Login", command=self._login).pack(pady=15)
+
+    def _login(self):
+        username = self.username_entry.get().strip()
+        password = self.password_entry.get().strip()
+
+        if not username or not password:
+            messagebox.showwarning("Login", "Please enter username and password.")
+            return
+
+        row = self.app.db.authenticate_user(username, password)
+        if row:
+            self.app.current_user = user_from_row(row)
+            self.app.show_main_app()
+        else:
+            messagebox.showerror("Login failed", "Invalid username or password.")
@@ -0,0 +1,330 @@
+"""Product and stock management page."""
+
+import tkinter as tk
+from tkinter import ttk, messagebox
+from datetime import datetime
+
+from .base import BasePage
+
+
+class ProductsPage(BasePage):
+    TABLES = ("products", "stock_alerts")
+
+    def __init__(self, parent, app, db=None):
+        super().__init__(parent, app, db=db)
+        self.selected_product_id = None
+        self._build_ui()
+
+    def _build_ui(self):
+        main = ttk.Frame(self)
+        main.pack(fill="both", expand=True, padx=10, pady=10)
+        main.columnconfigure(0, weight=3)
+        main.columnconfigure(1, weight=1)
+
+
+        left = ttk.Frame(main)
+        left.grid(row=0, column=0, sticky="nsew", padx=(0,8))
+
+        right = ttk.Frame(main)
+        right.grid(row=0, column=1, sticky="n", padx=(8,0))
+
+        list_frame = ttk.LabelFrame(left, text="Products & Services")
+        list_frame.pack(fill="both", expand=True, pady=5)
+
+        columns = ("id", "name", "category", "price", "stock", "desc")
+        self.prod_tree = ttk.Treeview(list_frame, columns=columns,
+                                      show="headings", height=15)
+        for c in columns:
+            self.prod_tree.heading(c, text=c.title())
+        self.prod_tree.pack(fill="both", expand=True, padx=5, pady=5)
+        self.prod_tree.bind("<<TreeviewSelect>>", self._on_select)
+
+        # Stock and value as they stood at the end of a past day
+        history_frame = ttk.LabelFrame(left, text="Stock on Date")
+        history_frame.pack(fill="both", expand=True, pady=5)
+
+        history_row = ttk.Frame(history_frame)
+        history_row.pack(fill="x", padx=5, pady=5)
+        ttk.Label(history_row, text="Date (YYYY-MM-DD):").pack(side="left")
+        self.stock_date_entry = ttk.Entry(history_row, width=12)
+        self.stock_date_entry.insert(0, datetime.now().strftime("%Y-%m-%d"))
+        self.stock_date_entry.pack(side="left", padx=5)
+        ttk.Button(history_row, text="Show", command=self._show_stock_on_date)\
+            .pack(side="left", padx=5)
+        ttk.Button(history_row, text="Selected Item Movements",
+                   command=self._open_movements_window).pack(side="left", padx=5)
+        self.stock_value_lbl = ttk.Label(history_row, text="")
+        self.stock_value_lbl.pack(side="left", padx=10)
+
+        stock_cols = ("name", "stock", "price", "value")
+        self.stock_tree = ttk.Treeview(history_frame, columns=stock_cols,
+                                       show="headings", height=6)
+        for c in stock_cols:
+            self.stock_tree.heading(c, text=c.title())
+        self.stock_tree.pack(fill="both", expand=True, padx=5, pady=5)
+
+        form = ttk.LabelFrame(right, text="Add / Edit Product or Service")
+        form.pack(fill="x", pady=5)
+
+        ttk.Label(form, text="Name:").grid(row=0, column=0, padx=5, pady=3, sticky="w")
+        self.p_name = ttk.Entry(form, width=25)
+        self.p_name.grid(row=0, column=1, padx=5, pady=3)
+
+        ttk.Label(form, text="Category:").grid(row=1, column=0, padx=5, pady=3, sticky="w")
+        self.p_cat = ttk.Entry(form, width=25)
+        self.p_cat.grid(row=1, column=1, padx=5, pady=3)
+
+        ttk.Label(form, text="Price:").grid(row=2, column=0, padx=5, pady=3, sticky="w")
+        self.p_price = ttk.Entry(form, width=25)
+        self.p_price.grid(row=2, column=1, padx=5, pady=3)
+
+        ttk.Label(form, text="Stock Qty:").grid(row=3, column=0, padx=5, pady=3, sticky="w")
+        self.p_stock = ttk.Entry(form, width=25)
+        self.p_stock.grid(row=3, column=1, padx=5, pady=3)
+
+        ttk.Label(form, text="Description:").grid(row=4, column=0, padx=5, pady=3, sticky="nw")
+        self.p_desc = tk.Text(form, width=30, height=4)
+        self.p_desc.grid(row=4, column=1, padx=5, pady=3, sticky="w")
+
+        self.is_service_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(form, text="Service item (has duration)",
+                        variable=self.is_service_var)\
+            .grid(row=5, column=0, columnspan=2, padx=5, pady=3, sticky="w")
+
+        ttk.Label(form, text="Duration (mins):").grid(row=6, column=0, padx=5, pady=3, sticky="w")
+        self.p_duration = ttk.Entry(form, width=25)
+        self.p_duration.grid(row=6, column=1, padx=5, pady=3)
+
+        ttk.Label(form, text="Low Stock At:").grid(row=7, column=0, padx=5, pady=3, sticky="w")
+        self.p_threshold = ttk.Entry(form, width=25)
+        self.p_threshold.grid(row=7, column=1, padx=5, pady=3)
+
+        ttk.Button(form, text="Add New", command=self._add_product)\
+            .grid(row=8, column=0, pady=5, padx=5)
+        ttk.Button(form, text="Update Selected", command=self._update_product)\
+            .grid(row=8, column=1, pady=5, padx=5)
+        ttk.Button(form, text="Delete Selected", command=self._delete_product)\
+            .grid(row=9, column=0, columnspan=2, pady=5, padx=5)
+
+        # Low-stock alerts raised by sales, refunds and stock edits
+        alert_frame = ttk.LabelFrame(right, text="Low Stock Alerts")
+        alert_frame.pack(fill="both", expand=True, pady=5)
+
+        alert_cols = ("name", "stock", "threshold", "when")
+        self.alert_tree = ttk.Treeview(alert_frame, columns=alert_cols,
+                                       show="headings", height=6)
+        for c, text, width in (("name", "Item", 130), ("stock", "Stock", 50),
+                               ("threshold", "Low At", 50), ("when", "Since", 120)):
+            self.alert_tree.heading(c, text=text)
+            self.alert_tree.column(c, width=width)
+        self.alert_tree.pack(fill="both", expand=True, padx=5, pady=5)
+
+        ttk.Button(alert_frame, text="Dismiss Selected", command=self._dismiss_alerts)\
+            .pack(side="left", padx=5, pady=5)
+        ttk.Button(alert_frame, text="Dismiss All",
+                   command=lambda: self._dismiss_alerts(all_alerts=True))\
+            .pack(side="left", padx=5, pady=5)
+
+    def refresh(self):
+        self._load_products()
+
+    def _load_products(self):
+        for r in self.prod_tree.get_children():
+            self.prod_tree.delete(r)
+        products = self.db.get_all_products()
+        for p in products:
+            desc = p["description"] if p["description"] else ""
+            self.prod_tree.insert(
+                "", "end",
+                values=(
+                    p["product_id"], p["name"], p["category"],
+                    f"${p['price']:.2f}", p["stock_qty"], desc
+                )
+            )
+
+        self._load_alerts()
+
+    def _load_alerts(self):
+        for r in self.alert_tree.get_children():
+            self.alert_tree.delete(r)
+        for a in self.db.open_stock_alerts():
+            self.alert_tree.insert(
+                "", "end", iid=str(a["alert_id"]),
+                values=(a["name"], a["stock_qty"], a["threshold"], a["created_at"])
+            )
+
+    def _show_stock_on_date(self):
+        day = self.stock_date_entry.get().strip()
+        try:
+            datetime.strptime(day, "%Y-%m-%d")
+        except ValueError:
+            messagebox.showwarning("Stock on Date", "Dates must use the YYYY-MM-DD format.")
+            return
+
+        self.stock_tree.delete(*self.stock_tree.get_children())
+        units, value = 0, 0.0
+        for r in self.db.stock_at(day):
+            line_value = r["stock_qty"] * r["price"]
+            units += r["stock_qty"]
+            value += line_value
+            self.stock_tree.insert("", "end", values=(
+                r["name"], r["stock_qty"], f"${r['price']:.2f}", f"${line_value:.2f}"
+            ))
+        self.stock_value_lbl.config(text=f"{units} units, ${value:.2f} at selling price")
+
+    def _open_movements_window(self):
+        if not self.selected_product_id:
+            messagebox.showwarning("Stock Movements", "Select a product first.")
+            return
+        p = self.records.product(self.selected_product_id)
+
+        top = tk.Toplevel(self)
+        top.title(f"Stock Movements - {p['name']}")
+
+        cols = ("when", "type", "qty", "order", "price")
+        tree = ttk.Treeview(top, columns=cols, show="headings", height=15)
+        for c, text, width in (("when", "When", 140), ("type", "Type", 70),
+                               ("qty", "Qty", 50), ("order", "Order", 60),
+                               ("price", "Price", 70)):
+            tree.heading(c, text=text)
+            tree.column(c, width=width)
+        tree.pack(fill="both", expand=True, padx=5, pady=5)
+
+        for m in self.db.stock_movement_history(self.selected_product_id, limit=100):
+            tree.insert("", "end", values=(
+                m["created_at"], m["movement_type"], f"{m['quantity']:+d}",
+                m["order_id"] or "", f"${m['price']:.2f}"
+            ))
+
+    def _dismiss_alerts(self, all_alerts=False):
+        ids = self.alert_tree.get_children() if all_alerts else self.alert_tree.selection()
+        if not ids:
+            return
+        self.db.acknowledge_stock_alerts([int(i) for i in ids])
+        self._load_alerts()
+
+    def _on_select(self, event):
+        sel = self.prod_tree.selection()
+        if not sel:
+            return
+        vals = self.prod_tree.item(sel[0], "values")
+        self.selected_product_id = int(vals[0])
+
+        p = self.records.product(self.selected_product_id)
+        if not p:
+            return
+
+        self.p_name.delete(0, "end")
+        self.p_name.insert(0, p["name"])
+
+        self.p_cat.delete(0, "end")
+        self.p_cat.insert(0, p["category"] if p["category"] else "")
+
+        self.p_price.delete(0, "end")
+        self.p_price.insert(0, str(p["price"]))
+
+        self.p_stock.delete(0, "end")
+        self.p_stock.insert(0, str(p["stock_qty"]))
+
+        self.p_desc.delete("1.0", "end")
+        if p["description"]:
+            self.p_desc.insert("end", p["description"])
+
+        self.is_service_var.set(bool(p["is_service"]))
+        self.p_duration.delete(0, "end")
+        if p["duration_minutes"]:
+            self.p_duration.insert(0, str(p["duration_minutes"]))
+
+        self.p_threshold.delete(0, "end")
+        self.p_threshold.insert(0, str(p["low_stock_threshold"]))
+
+    def _add_product(self):
+        name = self.p_name.get().strip()
+        cat = self.p_cat.get().strip()
+        desc = self.p_desc.get("1.0", "end").strip()
+
+        try:
+            price = float(self.p_price.get())
+            stock = int(self.p_stock.get())
+        except ValueError:
+            messagebox.showwarning("Product", "Invalid price or stock.")
+            return
+
+        if not name:
+            messagebox.showwarning("Product", "Name is required.")
+            return
+
+        is_service = 1 if self.is_service_var.get() else 0
+
+        try:
+            duration = int(self.p_duration.get()) if is_service and self.p_duration.get().strip() else 0
+        except ValueError:
+            messagebox.showwarning("Product", "Invalid duration (minutes).")
+            return
+
+        try:
+            threshold = int(self.p_threshold.get()) if self.p_threshold.get().strip() else 5
+        except ValueError:
+            messagebox.showwarning("Product", "Invalid low stock level.")
+            return
+
+        self.db.add_product_full(name, cat, price, stock, desc, is_service, duration, threshold)
+        self._load_products()
+        self._clear_form()
+
+    def _update_product(self):
+        if not self.selected_product_id:
+            messagebox.showwarning("Product", "No product selected.")
+            return
+
+        name = self.p_name.get().strip()
+        cat = self.p_cat.get().strip()
+        desc = self.p_desc.get("1.0", "end").strip()
+
+        try:
+            price = float(self.p_price.get())
+            stock = int(self.p_stock.get())
+        except ValueError:
+            messagebox.showwarning("Product", "Invalid price or stock.")
+            return
+
+        is_service = 1 if self.is_service_var.get() else 0
+
+        try:
+            duration = int(self.p_duration.get()) if is_service and self.p_duration.get().strip() else 0
+        except ValueError:
+            messagebox.showwarning("Product", "Invalid duration (minutes).")
+            return
+
+        try:
+            threshold = int(self.p_threshold.get()) if self.p_threshold.get().strip() else 5
+        except ValueError:
+            messagebox.showwarning("Product", "Invalid low stock level.")
+            return
+
+        self.db.update_product_full(
+            self.selected_product_id, name, cat, price, stock, desc, is_service, duration, threshold
+        )
+        self._load_products()
+
+    
+    def _delete_product(self):
+        if not self.selected_product_id:
+            messagebox.showwarning("Product", "No product selected.")
+            return
+        if not messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this product?"):
+            return
+        self.db.delete_product(self.selected_product_id)
+        self._clear_form()
+        self._load_products()
+
+    def _clear_form(self):
+        self.selected_product_id = None
+        self.p_name.delete(0, "end")
+        self.p_cat.delete(0, "end")
+        self.p_price.delete(0, "end")
+        self.p_stock.delete(0, "end")
+        self.p_desc.delete("1.0", "end")
+        self.is_service_var.set(False)
+        self.p_duration.delete(0, "end")
+        self.p_threshold.delete(0, "end")
@@ -0,0 +1,446 @@
+"""Reports and exports page."""
+
+import tkinter as tk
+from tkinter import ttk, messagebox
+from datetime import datetime, timedelta
+import os
+import gzip
+import threading
+import queue
+
+from ..db import ReportCache
+from ..receipts import REPORTLAB_AVAILABLE
+from .base import BasePage
+
+
+class ReportsPage(BasePage):
+    TABLES = ("orders", "customers", "products")
+    # Progress is reported every this many rows written
+    EXPORT_PROGRESS_EVERY = 1000
+    # Revenue view period -> days back including today (None = all orders)
+    REVENUE_PERIODS = {
+        "Today": 1,
+        "Last 7 days": 7,
+        "Last 30 days": 30,
+        "Last 90 days": 90,
+        "All time": None,
+    }
+    DEFAULT_REVENUE_PERIOD = "Last 30 days"
+
+    def __init__(self, parent, app, db=None):
+        super().__init__(parent, app, db=db)
+        self.export_start_var = tk.StringVar()
+        self.export_end_var = tk.StringVar()
+        self.export_gzip_var = tk.BooleanVar(value=False)
+        self.revenue_period_var = tk.StringVar(value=self.DEFAULT_REVENUE_PERIOD)
+        self._export_thread = None
+        self._export_queue = queue.Queue()
+        self._report_thread = None
+        self._report_queue = queue.Queue()
+        # Another load was asked for while the worker was busy
+        self._reports_stale = False
+        self._build_ui()
+
+    def _build_ui(self):
+        main = ttk.Frame(self)
+        main.pack(fill="both", expand=True, padx=10, pady=10)
+        main.columnconfigure(0, weight=3)
+        main.columnconfigure(1, weight=1)
+
+
+        rev_frame = ttk.LabelFrame(main, text="Revenue by Customer Type")
+        rev_frame.pack(fill="x", pady=5)
+
+        period_row = ttk.Frame(rev_frame)
+        period_row.pack(fill="x", padx=5, pady=(5, 0))
+        ttk.Label(period_row, text="Period:").pack(side="left")
+        period_cb = ttk.Combobox(period_row, textvariable=self.revenue_period_var,
+                                 values=list(self.REVENUE_PERIODS), state="readonly", width=14)
+        period_cb.pack(side="left", padx=5)
+        period_cb.bind("<<ComboboxSelected>>", lambda e: self._load_reports())
+        self.report_status = ttk.Label(period_row, text="")
+        self.report_status.pack(side="left", padx=10)
+
+        self.rev_tree = ttk.Treeview(rev_frame, columns=("type", "revenue"),
+                                     show="headings", height=5)
+        self.rev_tree.heading("type", text="Customer Type")
+        self.rev_tree.heading("revenue", text="Revenue")
+        self.rev_tree.pack(fill="x", padx=5, pady=5)
+
+        inv_frame = ttk.LabelFrame(main, text="Current Inventory Levels")
+        inv_frame.pack(fill="both", expand=True, pady=5)
+
+        cols = ("name", "category", "price", "stock")
+        self.inv_tree = ttk.Treeview(inv_frame, columns=cols,
+                                     show="headings", height=10)
+        for c in cols:
+            self.inv_tree.heading(c, text=c.title())
+        self.inv_tree.pack(fill="both", expand=True, padx=5, pady=5)
+
+        ttk.Button(main, text="Refresh Reports",
+                   command=self._load_reports).pack(pady=5)
+
+        # CSV export options: date range applies to the orders and revenue exports
+        opts = ttk.Frame(main)
+        opts.pack(pady=3)
+        ttk.Label(opts, text="Export from:").pack(side="left")
+        ttk.Entry(opts, textvariable=self.export_start_var, width=11).pack(side="left", padx=3)
+        ttk.Label(opts, text="to:").pack(side="left")
+        ttk.Entry(opts, textvariable=self.export_end_var, width=11).pack(side="left", padx=3)
+        ttk.Label(opts, text="(YYYY-MM-DD, blank = all)").pack(side="left", padx=3)
+        ttk.Checkbutton(opts, text="gzip", variable=self.export_gzip_var)\
+            .pack(side="left", padx=6)
+
+        self.export_status = ttk.Label(main, text="")
+        self.export_status.pack(pady=2)
+
+        # CSV export buttons
+        ttk.Button(main, text="Export Revenue CSV",
+                   command=self._export_revenue_csv).pack(pady=3)
+
+        ttk.Button(main, text="Export Inventory CSV",
+                   command=self._export_inventory_csv).pack(pady=3)
+
+        ttk.Button(main, text="Export Customers CSV",
+                   command=self._export_customers_csv).pack(pady=3)
+
+        ttk.Button(main, text="Export Orders CSV",
+                   command=self._export_orders_csv).pack(pady=3)
+
+        ttk.Button(main, text="Export Loyalty Summary CSV",
+                   command=self._export_loyalty_csv).pack(pady=3)
+
+        ttk.Button(main, text="Receipts PDF for Date Range",
+                   command=self._open_receipts_range_window).pack(pady=3)
+
+    def refresh(self):
+        self._load_reports()
+
+    def can_evict(self):
+        return (self._export_thread is None and self._report_thread is None
+                and not self.app.receipts.pending)
+
+    # ---------- Report views (computed on a worker thread) ----------
+
+    def _report_requests(self):
+        """(report, args) for each view at the current settings."""
+        days = self.REVENUE_PERIODS[self.revenue_period_var.get()]
+        start = None
+        if days is not None:
+            start = (datetime.now() - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+        return [
+            ("revenue_by_customer_type", (start, None)),
+            ("inventory_status", ()),
+        ]
+
+    def _load_reports(self):
+        """
+        Show whatever app.report_cache still holds and run the rest on a
+        worker thread with its own connection; _poll_reports shows those
+        as they finish.
+        """
+        if self._report_thread is not None:
+            self._reports_stale = True
+            return
+        cache = self.app.report_cache
+        jobs = []
+        for report, args in self._report_requests():
+            stamp = cache.stamp(report)
+            rows = cache.get(report, args, stamp)
+            if rows is None:
+                jobs.append((report, args, stamp))
+            else:
+                self._show_report(report, rows)
+        if not jobs:
+            return
+
+        self._report_thread = threading.Thread(
+            target=self._run_reports, args=(jobs,), name="reports", daemon=True
+        )
+        self._report_thread.start()
+        self.report_status.config(text="Calculating...")
+        self.after(100, self._poll_reports)
+
+    def _run_reports(self, jobs):
+        db = self.db.clone()
+        try:
+            for report, args, stamp in jobs:
+                try:
+                    rows = ReportCache.run(db, report, args)
+                except Exception as e:
+                    self._report_queue.put((report, args, stamp, None, e))
+                else:
+                    self._report_queue.put((report, args, stamp, rows, None))
+        finally:
+            db.close()
+            self._report_queue.put(None)
+
+    def _poll_reports(self):
+        current = self._report_requests()
+        while True:
+            try:
+                result = self._report_queue.get_nowait()
+            except queue.Empty:
+                self.after(100, self._poll_reports)
+                return
+            if result is None:
+                break
+            report, args, stamp, rows, error = result
+            if error is not None:
+                self.report_status.config(text=f"Report failed: {error}")
+                continue
+            self.app.report_cache.put(report, args, stamp, rows)
+            if (report, args) in current:
+                self._show_report(report, rows)
+
+        self._report_thread = None
+        if self.report_status.cget("text") == "Calculating...":
+            self.report_status.config(text="")
+        if self._reports_stale:
+            self._reports_stale = False
+            self._load_reports()
+
+    def _show_report(self, report, rows):
+        if report == "revenue_by_customer_type":
+            tree = self.rev_tree
+            values = [(row["customer_type"], f"${row['revenue']:.2f}") for row in rows]
+        else:
+            tree = self.inv_tree
+            values = [(row["name"], row["category"], f"${row['price']:.2f}", row["stock_qty"])
+                      for row in rows]
+        tree.delete(*tree.get_children())
+        for v in values:
+            tree.insert("", "end", values=v)
+
+    # ---------- CSV Export helpers ----------
+
+    def _ensure_reports_folder(self):
+        os.makedirs("reports", exist_ok=True)
+
+    def _start_export(self, title, name, header, fetch_rows, format_row):
+        """
+        Stream fetch_rows(db) through csv.writer on a worker thread, using
+        its own connection. Progress and the result come back through
+        _export_queue, which _poll_export drains on the Tk thread.
+        """
+        if self._export_thread is not None:
+            messagebox.showwarning("Export CSV", "An export is already running.")
+            return
+        self._ensure_reports_folder()
+        filename = os.path.join("reports", name + ".csv")
+        if self.export_gzip_var.get():
+            filename += ".gz"
+
+        self._export_thread = threading.Thread(
+            target=self._run_export,
+            args=(title, filename, header, fetch_rows, format_row),
+            name="csv-export",
+            daemon=True
+        )
+        self._export_thread.start()
+        self.export_status.config(text=f"{title}: exporting...")
+        self.after(100, self._poll_export)
+
+    def _run_export(self, title, filename, header, fetch_rows, format_row):
+        import csv  # loaded on the first export, not at start-up
+
+        db = self.db.clone()
+        partial = filename + ".part"
+        count = 0
+        try:
+            if filename.endswith(".gz"):
+                f = gzip.open(partial, "wt", newline="", encoding="utf-8")
+            else:
+                f = open(partial, "w", newline="", encoding="utf-8")
+            with f:
+                writer = csv.writer(f)
+                writer.writerow(header)
+                for row in fetch_rows(db):
+                    writer.writerow(format_row(row))
+                    count += 1
+                    if count % self.EXPORT_PROGRESS_EVERY == 0:
+                        self._export_queue.put(("progress", title, count))
+            os.replace(partial, filename)
+            self._export_queue.put(("done", title, (filename, count)))
+        except Exception as e:
+            if os.path.exists(partial):
+                os.remove(partial)
+            self._export_queue.put(("error", title, e))
+        finally:
+            db.close()
+
+    def _poll_export(self):
+        finished = False
+        while True:
+            try:
+                kind, title, payload = self._export_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                self.export_status.config(text=f"{title}: {payload:,} rows written...")
+            elif kind == "done":
+                filename, count = payload
+                finished = True
+                self.export_status.config(text=f"{title}: {count:,} rows")
+                messagebox.showinfo("Export CSV", f"{title} exported ({count:,} rows):\n{filename}")
+            else:
+                finished = True
+                self.export_status.config(text=f"{title}: failed")
+                messagebox.showerror("Export CSV", f"{title} export failed: {payload}")
+        if finished:
+            self._export_thread = None
+        else:
+            self.after(100, self._poll_export)
+
+    def _export_date_range(self):
+        """(start, end) from the option fields; blank means open-ended."""
+        start = self.export_start_var.get().strip() or None
+        end = self.export_end_var.get().strip() or None
+        for value in (start, end):
+            if value:
+                datetime.strptime(value, "%Y-%m-%d")
+        return start, end
+
+    def _export_revenue_csv(self):
+        try:
+            start, end = self._export_date_range()
+        except ValueError:
+            messagebox.showwarning("Export CSV", "Dates must use the YYYY-MM-DD format.")
+            return
+        name = "revenue_report"
+        if start or end:
+            name += f"_{start or 'start'}_to_{end or 'now'}"
+
+        self._start_export(
+            "Revenue report", name,
+            ["Customer Type", "Revenue"],
+            lambda db: db.revenue_by_customer_type(start, end),
+            lambda row: [row["customer_type"], f"{row['revenue']:.2f}"]
+        )
+
+    def _export_inventory_csv(self):
+        self._start_export(
+            "Inventory report", "inventory_report",
+            ["Name", "Category", "Price", "Stock Qty"],
+            lambda db: db.inventory_status(),
+            lambda row: [
+                row["name"],
+                row["category"],
+                f"{row['price']:.2f}",
+                row["stock_qty"]
+            ]
+        )
+
+    def _export_customers_csv(self):
+        self._start_export(
+            "Customers report", "customers_report",
+            [
+                "Customer ID", "Name", "Phone", "Address",
+                "Customer Type", "Loyalty Points"
+            ],
+            lambda db: db.iter_customers(),
+            lambda c: [
+                c["customer_id"],
+                c["name"],
+                c["phone"],
+                c["address"],
+                c["customer_type"],
+                c["loyalty_points"]
+            ]
+        )
+
+    def _export_orders_csv(self):
+        try:
+            start, end = self._export_date_range()
+        except ValueError:
+            messagebox.showwarning("Export CSV", "Dates must use the YYYY-MM-DD format.")
+            return
+        name = "orders_report"
+        if start or end:
+            name += f"_{start or 'start'}_to_{end or 'now'}"
+
+        self._start_export(
+            "Orders report", name,
+            [
+                "Order ID", "DateTime", "Customer Name", "Customer Type",
+                "Total", "Discount", "Final Total",
+                "Payment Method", "Is Refunded", "Processed By"
+            ],
+            lambda db: db.iter_orders_with_customers(start, end),
+            lambda o: [
+                o["order_id"],
+                o["order_datetime"],
+                o["customer_name"],
+                o["customer_type"],
+                f"{o['total']:.2f}",
+                f"{o['discount']:.2f}",
+                f"{o['final_total']:.2f}",
+                o["payment_method"],
+                "Yes" if o["is_refunded"] else "No",
+                o["staff_username"]
+            ]
+        )
+
+    def _export_loyalty_csv(self):
+        self._start_export(
+            "Loyalty summary", "loyalty_summary",
+            [
+                "Customer ID", "Name", "Customer Type",
+                "Loyalty Points", "Number of Orders", "Total Spent"
+            ],
+            lambda db: db.loyalty_summary(),
+            lambda s: [
+                s["customer_id"],
+                s["name"],
+                s["customer_type"],
+                s["loyalty_points"],
+                s["num_orders"],
+                f"{s['total_spent']:.2f}"
+            ]
+        )
+
+    # ---------- Bulk receipts ----------
+
+    def _open_receipts_range_window(self):
+        if not REPORTLAB_AVAILABLE:
+            messagebox.showerror(
+                "PDF",
+                "ReportLab library is not installed.\n\nPlease run:\n  pip install reportlab"
+            )
+            return
+
+        top = tk.Toplevel(self)
+        top.title("Receipts for Date Range")
+        top.grab_set()
+
+        today = datetime.now().strftime("%Y-%m-%d")
+        ttk.Label(top, text="From (YYYY-MM-DD):").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        start_e = ttk.Entry(top, width=15)
+        start_e.insert(0, today)
+        start_e.grid(row=0, column=1, padx=5, pady=5)
+
+        ttk.Label(top, text="To (YYYY-MM-DD):").grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        end_e = ttk.Entry(top, width=15)
+        end_e.insert(0, today)
+        end_e.grid(row=1, column=1, padx=5, pady=5)
+
+        def done(path, error):
+            if error:
+                messagebox.showerror("PDF", str(error))
+            else:
+                messagebox.showinfo("PDF", f"Receipts saved:\n{path}")
+
+        def generate():
+            start, end = start_e.get().strip(), end_e.get().strip()
+            try:
+                if datetime.strptime(start, "%Y-%m-%d") > datetime.strptime(end, "%Y-%m-%d"):
+                    messagebox.showwarning("Dates", "From date is after To date.")
+                    return
+            except ValueError:
+                messagebox.showwarning("Dates", "Use the YYYY-MM-DD format.")
+                return
+            self.app.receipts.submit_range(start, end, done)
+            top.destroy()
+
+        ttk.Button(top, text="Generate", command=generate)\
+            .grid(row=2, column=0, columnspan=2, pady=10)
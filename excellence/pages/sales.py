@@ -0,0 +1,778 @@
+"""New Order (POS) page."""
+
+import tkinter as tk
+from tkinter import ttk, messagebox
+import os
+import sys
+
+from ..config import GST_RATE
+from ..db import InsufficientStockError
+from ..receipts import REPORTLAB_AVAILABLE
+from .base import BasePage
+
+
+class SalesPage(BasePage):
+    TABLES = ("products", "customers")
+    PROMO_CODES = {
+        "None": 0.0,
+        "10OFF": 10.0,      # 10% off
+        "WELCOME5": 5.0     # 5% off
+    }
+    # Typing pauses shorter than this are coalesced into one menu filter
+    SEARCH_DEBOUNCE_MS = 150
+
+    def __init__(self, parent, app, db=None):
+        super().__init__(parent, app, db=db)
+        # Cart lines keyed by product id (insertion order = cart order)
+        self.current_items = {}
+        self.customer_map = {}
+        self.all_products = []
+        self.products_by_id = {}
+        self.last_order_id = None
+        self.amount_received_var = tk.StringVar()
+        self.promo_var = tk.StringVar(value="None")
+        self.category_var = tk.StringVar(value="All")
+        self.search_var = tk.StringVar()
+        # Menu filter state: (iid, name lower, category lower, is_service)
+        self._menu_index = []
+        self._menu_shown = []
+        self._search_after_id = None
+        # Loyalty redemption state
+        self.redeem_choice = None
+        self.redeem_points_used = 0
+        self.redeem_fixed_discount = 0.0
+        self.redeem_percent_discount = 0.0
+        self._build_ui()
+
+    def _build_ui(self):
+        main = ttk.Frame(self)
+        main.pack(fill="both", expand=True, padx=10, pady=10)
+        main.columnconfigure(0, weight=3)
+        main.columnconfigure(1, weight=1)
+
+
+        # LEFT: Vertical Menu
+        left_menu = ttk.Frame(main)
+        left_menu.pack(side="left", fill="y", padx=(0, 8), pady=5)
+
+        menu_frame = ttk.LabelFrame(left_menu, text="Menu")
+        menu_frame.pack(fill="y", expand=False)
+
+        # Category filter
+        ttk.Label(menu_frame, text="Category:").grid(row=0, column=0, padx=5, pady=3, sticky="w")
+        self.category_box = ttk.Combobox(
+            menu_frame,
+            textvariable=self.category_var,
+            values=["All", "Coffee", "Pastry", "Drink", "Service"],
+            state="readonly",
+            width=12
+        )
+        self.category_box.grid(row=0, column=1, padx=5, pady=3, sticky="w")
+        self.category_box.bind("<<ComboboxSelected>>", lambda e: self._refresh_menu())
+
+        # Search
+        ttk.Label(menu_frame, text="Search:").grid(row=1, column=0, padx=5, pady=3, sticky="w")
+        self.search_entry = ttk.Entry(menu_frame, textvariable=self.search_var, width=15)
+        self.search_entry.grid(row=1, column=1, padx=5, pady=3, sticky="w")
+        self.search_entry.bind("<KeyRelease>", lambda e: self._schedule_menu_refresh())
+
+        # Menu Tree
+        columns = ("id", "name", "category", "price", "stock")
+        self.menu_tree = ttk.Treeview(menu_frame, columns=columns, show="headings", height=18)
+        self.menu_tree.grid(row=2, column=0, columnspan=2, padx=5, pady=5)
+
+        self.menu_tree.heading("id", text="ID")
+        self.menu_tree.heading("name", text="Item")
+        self.menu_tree.heading("category", text="Cat")
+        self.menu_tree.heading("price", text="Price")
+        self.menu_tree.heading("stock", text="Stock")
+
+        # Hide ID column visually
+        self.menu_tree.column("id", width=0, stretch=False)
+        self.menu_tree.column("name", width=150)
+        self.menu_tree.column("category", width=70)
+        self.menu_tree.column("price", width=70)
+        self.menu_tree.column("stock", width=60)
+
+        # Qty + Add
+        controls_frame = ttk.Frame(menu_frame)
+        controls_frame.grid(row=3, column=0, columnspan=2, pady=5)
+
+        ttk.Label(controls_frame, text="Qty:").grid(row=0, column=0, padx=5, pady=3)
+        self.qty_spin = ttk.Spinbox(controls_frame, from_=1, to=20, width=5)
+        self.qty_spin.set(1)
+        self.qty_spin.grid(row=0, column=1, padx=5, pady=3)
+
+        ttk.Button(controls_frame, text="Add", command=self._add_from_menu)\
+            .grid(row=0, column=2, padx=5, pady=3)
+
+        # RIGHT: Order + Payment + Receipt
+        right_area = ttk.Frame(main)
+        right_area.pack(side="left", fill="both", expand=True, padx=(8, 0), pady=5)
+
+        top = ttk.Frame(right_area)
+        top.pack(fill="both", expand=True)
+
+        order_side = ttk.Frame(top)
+        order_side.pack(side="left", fill="both", expand=True, padx=(0, 8))
+
+        receipt_side = ttk.Frame(top)
+        receipt_side.pack(side="right", fill="both", expand=True, padx=(8, 0))
+
+        # Customer selection
+        cust_frame = ttk.LabelFrame(order_side, text="Customer")
+        cust_frame.pack(fill="x", pady=5)
+
+        self.customer_combo = ttk.Combobox(cust_frame, state="readonly", width=40)
+        self.customer_combo.grid(row=0, column=0, padx=5, pady=5)
+        ttk.Button(cust_frame, text="New Customer",
+                   command=self._add_new_customer).grid(row=0, column=1, padx=5, pady=5)
+
+        # Cart
+        cart_frame = ttk.LabelFrame(order_side, text="Order Items")
+        cart_frame.pack(fill="both", expand=True, pady=5)
+
+        cart_cols = ("name", "qty", "price", "total")
+        self.cart_tree = ttk.Treeview(cart_frame, columns=cart_cols, show="headings", height=10)
+        for c in cart_cols:
+            self.cart_tree.heading(c, text=c.title())
+        self.cart_tree.pack(fill="both", expand=True, padx=5, pady=5)
+
+        ttk.Button(cart_frame, text="Remove Selected",
+                   command=self._remove_selected).pack(pady=5)
+
+        # Payment & discounts
+        pay_frame = ttk.LabelFrame(order_side, text="Payment, Discounts & Tax")
+        pay_frame.pack(fill="x", pady=5)
+
+        # Extra discount (manual)
+        ttk.Label(pay_frame, text="Extra Discount (%):").grid(row=0, column=0, padx=5, pady=3, sticky="w")
+        self.discount_spin = ttk.Spinbox(pay_frame, from_=0, to=100, width=5)
+        self.discount_spin.set(0)
+        self.discount_spin.grid(row=0, column=1, padx=5, pady=3, sticky="w")
+
+        # Promotion codes
+        ttk.Label(pay_frame, text="Promotion:").grid(row=1, column=0, padx=5, pady=3, sticky="w")
+        self.promo_box = ttk.Combobox(
+            pay_frame, textvariable=self.promo_var,
+            values=list(self.PROMO_CODES.keys()), state="readonly", width=10
+        )
+        self.promo_box.grid(row=1, column=1, padx=5, pady=3, sticky="w")
+
+        # Payment method
+        ttk.Label(pay_frame, text="Payment:").grid(row=2, column=0, padx=5, pady=3, sticky="w")
+        self.payment_var = tk.StringVar(value="Cash")
+        ttk.Radiobutton(pay_frame, text="Cash", variable=self.payment_var, value="Cash")\
+            .grid(row=2, column=1, padx=5, sticky="w")
+        ttk.Radiobutton(pay_frame, text="Card", variable=self.payment_var, value="Card")\
+            .grid(row=2, column=2, padx=5, sticky="w")
+        ttk.Radiobutton(pay_frame, text="Mobile/EFTPOS", variable=self.payment_var, value="Mobile")\
+            .grid(row=2, column=3, padx=5, sticky="w")
+
+        # Loyalty redemption
+        ttk.Button(pay_frame, text="Redeem Points", command=self._open_redeem_window)\
+            .grid(row=3, column=0, columnspan=4, padx=5, pady=3, sticky="w")
+
+        # Cash amount received (for change)
+        ttk.Label(pay_frame, text="Amount Received (Cash):").grid(row=4, column=0, padx=5, pady=3, sticky="w")
+        self.amount_received_entry = ttk.Entry(pay_frame, width=10, textvariable=self.amount_received_var)
+        self.amount_received_entry.grid(row=4, column=1, padx=5, pady=3, sticky="w")
+
+        ttk.Button(pay_frame, text="Complete Sale",
+                   command=self._complete_sale).grid(row=5, column=0, columnspan=4, pady=5)
+
+        ttk.Button(pay_frame, text="Refund Order",
+                   command=self._open_refund_window).grid(row=6, column=0, columnspan=4, pady=5)
+
+        ttk.Button(pay_frame, text="Save Receipt as PDF",
+                   command=self._save_pdf).grid(row=7, column=0, columnspan=4, pady=3)
+
+        ttk.Button(pay_frame, text="Open Last Receipt (Print)",
+                   command=self._open_last_pdf).grid(row=8, column=0, columnspan=4, pady=3)
+
+        # Receipt
+        receipt_frame = ttk.LabelFrame(receipt_side, text="Receipt Preview")
+        receipt_frame.pack(fill="both", expand=True)
+
+        self.receipt_text = tk.Text(receipt_frame, height=25)
+        self.receipt_text.pack(fill="both", expand=True, padx=5, pady=5)
+
+    # --------- Menu & Customers loading ---------
+
+    def refresh(self):
+        self._load_products()
+        self._load_customers()
+        self._refresh_menu()
+
+    def can_evict(self):
+        # Keep an open cart, and keep receipt callbacks pointing at live widgets
+        return not self.current_items and not self.app.receipts.pending
+
+    def _load_products(self):
+        """
+        Reload products and sync the menu rows in place. Each product keeps
+        one Treeview row (iid = product id) whose values are updated rather
+        than recreated; filtering then only detaches/reattaches rows.
+        """
+        self.all_products = list(self.db.get_all_products())
+        self.products_by_id = {p["product_id"]: p for p in self.all_products}
+
+        # Hidden rows are detached, so track rows through the previous index
+        existing = {entry[0] for entry in self._menu_index}
+        self._menu_index = []
+        for p in self.all_products:
+            iid = str(p["product_id"])
+            values = (
+                p["product_id"],
+                p["name"],
+                p["category"],
+                f"${p['price']:.2f}",
+                p["stock_qty"]
+            )
+            if iid in existing:
+                self.menu_tree.item(iid, values=values)
+                existing.discard(iid)
+            else:
+                self.menu_tree.insert("", "end", iid=iid, values=values)
+                self.menu_tree.detach(iid)
+            self._menu_index.append(
+                (iid, p["name"].lower(), (p["category"] or "").lower(), p["is_service"])
+            )
+
+        # Products that no longer exist
+        if existing:
+            self.menu_tree.delete(*existing)
+        # Force the next _refresh_menu to re-place every row
+        self.menu_tree.detach(*self.menu_tree.get_children())
+        self._menu_shown = []
+
+    def _schedule_menu_refresh(self):
+        """Debounce search typing: filter once the cashier pauses."""
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(self.SEARCH_DEBOUNCE_MS, self._refresh_menu)
+
+    def _refresh_menu(self):
+        self._search_after_id = None
+        cat_filter = self.category_var.get().lower()
+        search_term = self.search_var.get().strip().lower()
+
+        shown = []
+        for iid, name, category, is_service in self._menu_index:
+            # Category filter
+            if cat_filter != "all":
+                if cat_filter == "service":
+                    if not is_service:
+                        continue
+                elif category != cat_filter:
+                    continue
+
+            # Search filter
+            if search_term and search_term not in name:
+                continue
+
+            shown.append(iid)
+
+        if shown == self._menu_shown:
+            return
+
+        keep = set(shown)
+        hidden = [iid for iid in self._menu_shown if iid not in keep]
+        if hidden:
+            self.menu_tree.detach(*hidden)
+        for index, iid in enumerate(shown):
+            self.menu_tree.move(iid, "", index)
+        self._menu_shown = shown
+
+    def _load_customers(self):
+        customers = self.db.get_all_customers()
+        self.customer_map.clear()
+        names = []
+        for c in customers:
+            label = f"{c['name']} ({c['customer_type']})"
+            self.customer_map[label] = c["customer_id"]
+            names.append(label)
+        self.customer_combo["values"] = names
+
+    # --------- Menu actions ---------
+
+    def _get_selected_menu_product(self):
+        sel = self.menu_tree.selection()
+        if not sel:
+            return None
+        # Menu rows use the product id as their iid
+        return self.products_by_id.get(int(sel[0]))
+
+    def _add_from_menu(self):
+        product = self._get_selected_menu_product()
+        if not product:
+            messagebox.showwarning("Product", "Please select a product or service from the menu.")
+            return
+
+        try:
+            qty = int(self.qty_spin.get())
+        except ValueError:
+            messagebox.showwarning("Quantity", "Invalid quantity.")
+            return
+
+        if qty <= 0:
+            messagebox.showwarning("Quantity", "Quantity must be positive.")
+            return
+
+        # Adding a product already in the cart merges into its line, so stock
+        # is checked against the combined quantity
+        item = self.current_items.get(product["product_id"])
+        in_cart = item["qty"] if item else 0
+        if not product["is_service"]:
+            if product["stock_qty"] < in_cart + qty:
+                messagebox.showerror(
+                    "Stock",
+                    f"Not enough stock ({product['stock_qty']} available, {in_cart} already in cart)."
+                )
+                return
+
+        if item:
+            item["qty"] += qty
+        else:
+            self.current_items[product["product_id"]] = {
+                "product_id": product["product_id"],
+                "name": product["name"],
+                "price": product["price"],
+                "qty": qty,
+                "is_service": product["is_service"]
+            }
+        self._refresh_cart()
+
+    # --------- Customer dialog ---------
+
+    def _add_new_customer(self):
+        top = tk.Toplevel(self)
+        top.title("New Customer")
+        top.grab_set()
+
+        ttk.Label(top, text="Name:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        name_e = ttk.Entry(top, width=25)
+        name_e.grid(row=0, column=1, padx=5, pady=5)
+
+        ttk.Label(top, text="Phone:").grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        phone_e = ttk.Entry(top, width=25)
+        phone_e.grid(row=1, column=1, padx=5, pady=5)
+
+        ttk.Label(top, text="Address:").grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        addr_e = ttk.Entry(top, width=25)
+        addr_e.grid(row=2, column=1, padx=5, pady=5)
+
+        ttk.Label(top, text="Type:").grid(row=3, column=0, padx=5, pady=5, sticky="w")
+        type_var = tk.StringVar(value="New")
+        type_box = ttk.Combobox(
+            top, textvariable=type_var,
+            values=["New", "Member", "VIP", "Student"], state="readonly", width=23
+        )
+        type_box.grid(row=3, column=1, padx=5, pady=5, sticky="w")
+
+        def save_cust():
+            name = name_e.get().strip()
+            phone = phone_e.get().strip()
+            addr = addr_e.get().strip()
+            ctype = type_var.get()
+            if not name:
+                messagebox.showwarning("Customer", "Name is required.")
+                return
+            self.db.add_customer(name, phone, ctype, addr)
+            self._load_customers()
+            top.destroy()
+
+        ttk.Button(top, text="Save", command=save_cust)\
+            .grid(row=4, column=0, columnspan=2, pady=10)
+
+
+    def _open_redeem_window(self):
+        cust_label = self.customer_combo.get()
+        customer_id = self.customer_map.get(cust_label) if cust_label else None
+        if not customer_id:
+            messagebox.showwarning("Redeem", "Please select a customer to redeem loyalty points.")
+            return
+
+        points = self.records.points_balance(customer_id)
+        if points is None:
+            messagebox.showerror("Redeem", "Customer not found.")
+            return
+
+        top = tk.Toplevel(self)
+        top.title("Redeem Loyalty Points")
+        top.grab_set()
+
+        ttk.Label(top, text=f"Current points: {points}").grid(row=0, column=0, columnspan=2, padx=10, pady=5)
+
+        options = [("None", 0)]
+        if points >= 50:
+            options.append(("50 pts – 25% off", 50))
+        if points >= 100:
+            options.append(("100 pts – $10 off", 100))
+        if points >= 200:
+            options.append(("200 pts – $25 off", 200))
+
+        if len(options) == 1:
+            ttk.Label(top, text="Not enough points to redeem.").grid(row=1, column=0, columnspan=2, padx=10, pady=5)
+            self._redeem_var = None
+        else:
+            ttk.Label(top, text="Choose redemption:").grid(row=1, column=0, padx=10, pady=5, sticky="w")
+            self._redeem_var = tk.StringVar(value=options[0][0])
+            names = [o[0] for o in options]
+            box = ttk.Combobox(top, textvariable=self._redeem_var, values=names, state="readonly", width=30)
+            box.grid(row=1, column=1, padx=10, pady=5, sticky="w")
+
+        def apply_choice():
+            choice_var = self._redeem_var
+            choice = choice_var.get() if choice_var is not None else "None"
+            self.redeem_choice = choice
+            self.redeem_points_used = 0
+            self.redeem_percent_discount = 0.0
+            self.redeem_fixed_discount = 0.0
+
+            if "50 pts" in choice:
+                self.redeem_points_used = 50
+                self.redeem_percent_discount = 25.0
+            elif "100 pts" in choice:
+                self.redeem_points_used = 100
+                self.redeem_fixed_discount = 10.0
+            elif "200 pts" in choice:
+                self.redeem_points_used = 200
+                self.redeem_fixed_discount = 25.0
+
+            top.destroy()
+
+        ttk.Button(top, text="Apply", command=apply_choice).grid(row=2, column=0, columnspan=2, pady=10)
+
+    # --------- Cart & sale ---------
+
+    def _refresh_cart(self):
+        for row in self.cart_tree.get_children():
+            self.cart_tree.delete(row)
+        for product_id, item in self.current_items.items():
+            total = item["price"] * item["qty"]
+            self.cart_tree.insert("", "end", iid=str(product_id),
+                                  values=(item["name"], item["qty"],
+                                          f"${item['price']:.2f}",
+                                          f"${total:.2f}"))
+
+    def _remove_selected(self):
+        sel = self.cart_tree.selection()
+        if not sel:
+            return
+        self.current_items.pop(int(sel[0]), None)
+        self._refresh_cart()
+
+    def _complete_sale(self):
+        if not self.current_items:
+            messagebox.showwarning("Sale", "No items in the order.")
+            return
+
+        cust_label = self.customer_combo.get()
+        customer_id = self.customer_map.get(cust_label) if cust_label else None
+
+        # Extra manual discount
+        try:
+            extra_discount = float(self.discount_spin.get())
+        except ValueError:
+            messagebox.showwarning("Discount", "Invalid extra discount.")
+            return
+
+        # Promo discount
+        promo_name = self.promo_var.get()
+        promo_discount = self.PROMO_CODES.get(promo_name, 0.0)
+
+        # Loyalty redemption discount parts
+        fixed_discount_from_loyalty = 0.0
+        percent_discount_from_loyalty = 0.0
+        if self.redeem_points_used:
+            fixed_discount_from_loyalty = self.redeem_fixed_discount or 0.0
+            percent_discount_from_loyalty = self.redeem_percent_discount or 0.0
+
+        payment = self.payment_var.get()
+
+        # Check cash amount if payment is cash
+        amount_received = None
+        change = None
+        if payment == "Cash":
+            txt = self.amount_received_var.get().strip()
+            if not txt:
+                messagebox.showwarning("Cash", "Enter amount received for cash payment.")
+                return
+            try:
+                amount_received = float(txt)
+            except ValueError:
+                messagebox.showwarning("Cash", "Invalid cash amount.")
+                return
+
+        # Price the cart first so a short cash payment never writes an order
+        try:
+            quote = self.db.quote_order(
+                customer_id, list(self.current_items.values()), extra_discount + promo_discount,
+                redeem_points=self.redeem_points_used or 0,
+                redeem_percent_discount=percent_discount_from_loyalty,
+                redeem_fixed_discount=fixed_discount_from_loyalty
+            )
+        except ValueError as e:
+            messagebox.showerror("Sale", str(e))
+            return
+
+        if payment == "Cash" and amount_received < quote["final_total"]:
+            messagebox.showerror(
+                "Cash",
+                f"Amount received is less than total (${quote['final_total']:.2f})."
+            )
+            return
+
+        # Membership discount, order, stock and loyalty are saved in one transaction
+        try:
+            sale = self.db.finalize_sale(
+                customer_id, list(self.current_items.values()), extra_discount + promo_discount,
+                payment, self.app.current_user.user_id,
+                redeem_points=self.redeem_points_used or 0,
+                redeem_percent_discount=percent_discount_from_loyalty,
+                redeem_fixed_discount=fixed_discount_from_loyalty,
+                amount_received=amount_received
+            )
+        except InsufficientStockError as e:
+            # Nothing was saved; show fresh stock levels so the cart can be fixed
+            messagebox.showerror("Stock", str(e))
+            self._load_products()
+            self._refresh_menu()
+            return
+        except Exception as e:
+            messagebox.showerror("Sale", str(e))
+            return
+
+        order_id = sale["order_id"]
+        dt = sale["order_datetime"]
+        total = sale["total"]
+        disc = sale["discount"]
+        final_total = sale["final_total"]
+        auto_discount = sale["auto_discount"]
+
+        # Calculate change if cash (finalize_sale already checked it covers the total)
+        if payment == "Cash":
+            change = amount_received - final_total
+
+        self._print_receipt(
+            order_id, dt, total, disc, final_total, payment,
+            auto_discount, extra_discount, promo_name, promo_discount,
+            amount_received, change
+        )
+        self.last_order_id = order_id  # used for PDF
+        # Pre-render the PDF in the background so Save/Print PDF is instant
+        if REPORTLAB_AVAILABLE:
+            self.app.receipts.submit(order_id)
+        self.current_items.clear()
+        self._refresh_cart()
+        self._load_products()
+        self._refresh_menu()
+
+        # Reset redemption state
+        self.redeem_choice = None
+        self.redeem_points_used = 0
+        self.redeem_fixed_discount = 0.0
+        self.redeem_percent_discount = 0.0
+
+        messagebox.showinfo("Sale", f"Sale completed.\nOrder ID: {order_id}")
+
+    def _print_receipt(self, order_id, dt, total, disc, final_total, payment,
+                       auto_discount, extra_discount, promo_name, promo_discount,
+                       amount_received, change):
+        """
+        Receipt Model 1 (احترافي) + GST included.
+        All prices are GST-inclusive. We show GST component only.
+        """
+        gst_amount = final_total * (GST_RATE / (1 + GST_RATE))
+        net_total = final_total - gst_amount
+
+        self.receipt_text.delete("1.0", "end")
+        self.receipt_text.insert("end", "========= EXCELLENCE COFFEE =========\n")
+        self.receipt_text.insert("end", "Artisan Coffee • Fresh Pastries\n")
+        self.receipt_text.insert("end", "Auckland, New Zealand\n")
+        self.receipt_text.insert("end", "-------------------------------------\n")
+        self.receipt_text.insert("end", f"Order ID: {order_id}\n")
+        self.receipt_text.insert("end", f"Date/Time: {dt}\n")
+        self.receipt_text.insert("end", f"Processed by: {self.app.current_user.username}\n")
+        self.receipt_text.insert("end", "-------------------------------------\n")
+
+        for item in self.current_items.values():
+            line_total = item["price"] * item["qty"]
+            self.receipt_text.insert(
+                "end",
+                f"{item['name']} x{item['qty']} @ ${item['price']:.2f} = ${line_total:.2f}\n"
+            )
+
+        self.receipt_text.insert("end", "-------------------------------------\n")
+        self.receipt_text.insert("end", f"Subtotal (incl. GST): ${total:.2f}\n")
+        self.receipt_text.insert("end", f"Total Discount:        ${disc:.2f}\n")
+
+        if auto_discount > 0:
+            self.receipt_text.insert("end", f"- Membership discount: {auto_discount:.1f}%\n")
+        if extra_discount > 0:
+            self.receipt_text.insert("end", f"- Extra discount:      {extra_discount:.1f}%\n")
+        if promo_discount > 0 and promo_name != "None":
+            self.receipt_text.insert("end", f"- Promo ({promo_name}): {promo_discount:.1f}%\n")
+
+        self.receipt_text.insert("end", f"Net Amount (excl. GST): ${net_total:.2f}\n")
+        self.receipt_text.insert("end", f"GST Included (15%):     ${gst_amount:.2f}\n")
+        self.receipt_text.insert("end", f"TOTAL PAID:             ${final_total:.2f}\n")
+        self.receipt_text.insert("end", f"Payment Method:         {payment}\n")
+
+        if payment == "Cash":
+            if amount_received is not None:
+                self.receipt_text.insert("end", f"Amount Received:        ${amount_received:.2f}\n")
+            if change is not None:
+                self.receipt_text.insert("end", f"Change Returned:        ${change:.2f}\n")
+
+        self.receipt_text.insert("end", "-------------------------------------\n")
+        self.receipt_text.insert("end", "Thank you for choosing Excellence Coffee!\n")
+
+    # --------- Refund ---------
+
+    def _open_refund_window(self):
+        top = tk.Toplevel(self)
+        top.title("Refund Order")
+        top.grab_set()
+
+        ttk.Label(top, text="Order ID(s) to refund:").grid(row=0, column=0, padx=5, pady=5)
+        order_e = ttk.Entry(top, width=20)
+        order_e.grid(row=0, column=1, padx=5, pady=5)
+
+        # Lines of a single loaded order, for partial refunds
+        cols = ("item", "sold", "refunded")
+        lines_tree = ttk.Treeview(top, columns=cols, show="headings", height=6)
+        lines_tree.heading("item", text="Item")
+        lines_tree.heading("sold", text="Sold")
+        lines_tree.heading("refunded", text="Refunded")
+        lines_tree.column("item", width=160)
+        lines_tree.column("sold", width=50)
+        lines_tree.column("refunded", width=70)
+        lines_tree.grid(row=1, column=0, columnspan=3, padx=5, pady=5)
+
+        ttk.Label(top, text="Qty to refund:").grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        qty_spin = ttk.Spinbox(top, from_=1, to=100, width=5)
+        qty_spin.set(1)
+        qty_spin.grid(row=2, column=1, padx=5, pady=5, sticky="w")
+
+        def parse_ids():
+            try:
+                ids = [int(x) for x in order_e.get().replace(" ", "").split(",") if x]
+            except ValueError:
+                ids = []
+            if not ids:
+                messagebox.showwarning("Refund", "Invalid order ID.")
+            return ids
+
+        def load_lines():
+            for r in lines_tree.get_children():
+                lines_tree.delete(r)
+            ids = parse_ids()
+            if len(ids) != 1:
+                if ids:
+                    messagebox.showwarning("Refund", "Load one order to refund single lines.")
+                return
+            order, items = self.db.get_order_with_items(ids[0])
+            if not order:
+                messagebox.showerror("Refund", "Order not found.")
+                return
+            for it in items:
+                lines_tree.insert("", "end", iid=str(it["item_id"]),
+                                  values=(it["product_name"], it["quantity"], it["refunded_qty"]))
+
+        def finish(message):
+            messagebox.showinfo("Refund", message)
+            self._load_products()
+            self._refresh_menu()
+            top.destroy()
+
+        def refund_line():
+            ids = parse_ids()
+            sel = lines_tree.selection()
+            if len(ids) != 1 or not sel:
+                messagebox.showwarning("Refund", "Load an order and select a line first.")
+                return
+            try:
+                qty = int(qty_spin.get())
+                amount = self.db.refund_order(
+                    ids[0], lines={int(sel[0]): qty},
+                    processed_by_user_id=self.app.current_user.user_id
+                )
+            except Exception as e:
+                messagebox.showerror("Refund", str(e))
+                return
+            finish(f"Refunded ${amount:.2f} on order {ids[0]}.")
+
+        def refund_orders():
+            ids = parse_ids()
+            if not ids:
+                return
+            try:
+                amount = self.db.refund_orders(
+                    ids, processed_by_user_id=self.app.current_user.user_id
+                )
+            except Exception as e:
+                messagebox.showerror("Refund", str(e))
+                return
+            label = f"Order {ids[0]}" if len(ids) == 1 else f"{len(ids)} orders"
+            finish(f"{label} refunded (${amount:.2f}).")
+
+        ttk.Button(top, text="Load Lines", command=load_lines)\
+            .grid(row=0, column=2, padx=5, pady=5)
+        ttk.Button(top, text="Refund Selected Line", command=refund_line)\
+            .grid(row=3, column=0, padx=5, pady=10)
+        ttk.Button(top, text="Refund Whole Order(s)", command=refund_orders)\
+            .grid(row=3, column=1, columnspan=2, padx=5, pady=10)
+
+    # --------- PDF & Print ---------
+
+    def _save_pdf(self):
+        if self.last_order_id is None:
+            messagebox.showwarning("PDF", "No completed order to export. Complete a sale first.")
+            return
+        self._generate_pdf_for_order(self.last_order_id)
+
+    def _open_last_pdf(self):
+        if self.last_order_id is None:
+            messagebox.showwarning("Print", "No completed order to open. Complete a sale first.")
+            return
+        pdf_dir = "receipts"
+        filename = os.path.join(pdf_dir, f"receipt_{self.last_order_id}.pdf")
+        if os.path.exists(filename):
+            self._open_pdf(filename)
+        else:
+            self._generate_pdf_for_order(self.last_order_id, open_when_done=True)
+
+    def _open_pdf(self, filename):
+        # Open with default viewer (like print)
+        try:
+            if sys.platform.startswith("win"):
+                os.startfile(filename)
+            else:
+                import subprocess  # only needed off Windows, on first print
+                if sys.platform == "darwin":
+                    subprocess.call(["open", filename])
+                else:
+                    subprocess.call(["xdg-open", filename])
+        except Exception as e:
+            messagebox.showerror("Print", f"Could not open PDF: {e}")
+
+    def _generate_pdf_for_order(self, order_id, open_when_done=False):
+        """Queue the receipt on the background renderer; the page stays usable."""
+        if not REPORTLAB_AVAILABLE:
+            messagebox.showerror(
+                "PDF",
+                "ReportLab library is not installed.\n\nPlease run:\n  pip install reportlab"
+            )
+            return
+
+        def done(path, error):
+            if error:
+                messagebox.showerror("PDF", f"Could not create receipt: {error}")
+            elif open_when_done:
+                self._open_pdf(path)
+            else:
+                messagebox.showinfo("PDF", f"Receipt saved:\n{path}")
+
+        self.app.receipts.submit(order_id, done)
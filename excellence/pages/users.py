@@ -0,0 +1,112 @@
+"""User management page."""
+
+from tkinter import ttk, messagebox
+import sqlite3
+
+from .base import BasePage
+
+
+class UsersPage(BasePage):
+    TABLES = ("users",)
+
+    def __init__(self, parent, app, db=None):
+        super().__init__(parent, app, db=db)
+        self.selected_user_id = None
+        self._build_ui()
+
+    def _build_ui(self):
+        main = ttk.Frame(self)
+        main.pack(fill="both", expand=True, padx=10, pady=10)
+        main.columnconfigure(0, weight=3)
+        main.columnconfigure(1, weight=1)
+
+
+        left = ttk.Frame(main)
+        left.grid(row=0, column=0, sticky="nsew", padx=(0,8))
+
+        right = ttk.Frame(main)
+        right.grid(row=0, column=1, sticky="n", padx=(8,0))
+
+        list_frame = ttk.LabelFrame(left, text="Users")
+        list_frame.pack(fill="both", expand=True, pady=5)
+
+        columns = ("id", "username", "role")
+        self.user_tree = ttk.Treeview(list_frame, columns=columns,
+                                      show="headings", height=12)
+        for c in columns:
+            self.user_tree.heading(c, text=c.title())
+        self.user_tree.pack(fill="both", expand=True, padx=5, pady=5)
+        self.user_tree.bind("<<TreeviewSelect>>", self._on_select)
+
+        form = ttk.LabelFrame(right, text="Add User")
+        form.pack(fill="x", pady=5)
+
+        ttk.Label(form, text="Username:").grid(row=0, column=0, padx=5, pady=3, sticky="w")
+        self.u_name = ttk.Entry(form, width=20)
+        self.u_name.grid(row=0, column=1, padx=5, pady=3)
+
+        ttk.Label(form, text="Password:").grid(row=1, column=0, padx=5, pady=3, sticky="w")
+        self.u_pass = ttk.Entry(form, width=20, show="*")
+        self.u_pass.grid(row=1, column=1, padx=5, pady=3)
+
+        ttk.Label(form, text="Role:").grid(row=2, column=0, padx=5, pady=3, sticky="w")
+        self.u_role = ttk.Combobox(form, values=["admin", "manager", "staff"],
+                                   state="readonly", width=18)
+        self.u_role.set("staff")
+        self.u_role.grid(row=2, column=1, padx=5, pady=3)
+
+        ttk.Button(form, text="Add User", command=self._add_user)\
+            .grid(row=3, column=0, columnspan=2, pady=5)
+
+        ttk.Button(right, text="Delete Selected User",
+                   command=self._delete_user).pack(pady=10)
+
+    def refresh(self):
+        self._load_users()
+
+    def _load_users(self):
+        for r in self.user_tree.get_children():
+            self.user_tree.delete(r)
+        users = self.db.get_all_users()
+        for u in users:
+            self.user_tree.insert("", "end",
+                                  values=(u["user_id"], u["username"], u["role"]))
+
+    def _on_select(self, event):
+        sel = self.user_tree.selection()
+        if not sel:
+            return
+        vals = self.user_tree.item(sel[0], "values")
+        self.selected_user_id = int(vals[0])
+
+    def _add_user(self):
+        username = self.u_name.get().strip()
+        password = self.u_pass.get().strip()
+        role = self.u_role.get()
+        if not username or not password:
+            messagebox.showwarning("User", "Username and password are required.")
+            return
+        try:
+            self.db.add_user(username, password, role)
+            self._load_users()
+            self.u_name.delete(0, "end")
+            self.u_pass.delete(0, "end")
+            self.u_role.set("staff")
+        except sqlite3.IntegrityError:
+            messagebox.showerror("User", "Username already exists.")
+
+    def _delete_user(self):
+        if not self.selected_user_id:
+            return
+        if self.selected_user_id == self.app.current_user.user_id:
+            messagebox.showwarning("User", "You cannot delete your own account.")
+            return
+        if messagebox.askyesno("Confirm", "Delete selected user?"):
+            try:
+                self.db.delete_user(self.selected_user_id)
+            except sqlite3.IntegrityError:
+                # foreign_keys is on: orders still reference this user
+                messagebox.showerror("User", "This user has processed orders and cannot be deleted.")
+                return
+            self._load_users()
+            self.selected_user_id = None
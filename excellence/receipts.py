@@ -0,0 +1,255 @@
+"""
+PDF receipts, rendered on a background thread.
+
+ReportLab is imported by the worker thread on the first job, so start-up
+and the login screen never pay for it.
+"""
+
+from importlib.util import find_spec
+import os
+import threading
+import queue
+
+from .config import GST_RATE
+
+# Checked without importing reportlab itself
+REPORTLAB_AVAILABLE = find_spec("reportlab") is not None
+
+
+class ReceiptRenderer:
+    """
+    Queues PDF receipt jobs for a single worker thread so the till keeps
+    selling while ReportLab runs. Callbacks are called back on the Tk
+    thread as callback(path, error).
+
+    The logo is decoded once per renderer, and the static header (logo,
+    shop name, address) is drawn once per PDF as a form XObject that every
+    receipt in that file reuses.
+    """
+    HEADER_FORM = "receipt_header"
+    POLL_MS = 100
+
+    def __init__(self, root, db, out_dir="receipts", logo_path="logo_excellence.png"):
+        self._root = root
+        self._db = db
+        self.out_dir = out_dir
+        self._logo_path = logo_path
+        self._logo = None
+        self._jobs = queue.Queue()
+        self._done = queue.Queue()
+        self._pending = 0
+        self._worker = None
+
+    # ---------- Tk thread ----------
+
+    def submit(self, order_id, callback=None):
+        """Render receipts/receipt_<order_id>.pdf."""
+        self._enqueue(("order", order_id), callback)
+
+    def submit_range(self, start_date, end_date, callback=None):
+        """Render every order between two YYYY-MM-DD dates into one PDF."""
+        self._enqueue(("range", (start_date, end_date)), callback)
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def _enqueue(self, job, callback):
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._run, name="receipt-renderer", daemon=True
+            )
+            self._worker.start()
+        self._jobs.put((job, callback))
+        self._pending += 1
+        if self._pending == 1:
+            self._root.after(self.POLL_MS, self._poll)
+
+    def _poll(self):
+        while True:
+            try:
+                callback, path, error = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if callback:
+                callback(path, error)
+        if self._pending:
+            self._root.after(self.POLL_MS, self._poll)
+
+    # ---------- Worker thread ----------
+
+    def _run(self):
+        db = None
+        while True:
+            (kind, arg), callback = self._jobs.get()
+            try:
+                # Set up with the first job, and again after a failed setup,
+                # so a missing ReportLab or locked database fails each job
+                # instead of the thread
+                if db is None:
+                    db = self._setup()
+                if kind == "order":
+                    path = self._render_order(db, arg)
+                else:
+                    path = self._render_range(db, *arg)
+                error = None
+            except Exception as e:
+                path, error = None, e
+            self._done.put((callback, path, error))
+
+    def _setup(self):
+        """Import ReportLab, open this thread's connection and decode the logo."""
+        from reportlab.lib.utils import ImageReader
+
+        db = self._db.clone()
+        if os.path.exists(self._logo_path):
+            try:
+                self._logo = ImageReader(self._logo_path)
+            except Exception:
+                self._logo = None
+        return db
+
+    def _render_order(self, db, order_id):
+        receipts = db.receipt_orders(order_ids=[order_id])
+        if not receipts:
+            raise ValueError("Order not found.")
+        filename = os.path.join(self.out_dir, f"receipt_{order_id}.pdf")
+        self._write_pdf(filename, receipts)
+        return filename
+
+    def _render_range(self, db, start_date, end_date):
+        receipts = db.receipt_orders(start_date=start_date, end_date=end_date)
+        if not receipts:
+            raise ValueError(f"No orders between {start_date} and {end_date}.")
+        filename = os.path.join(self.out_dir, f"receipts_{start_date}_to_{end_date}.pdf")
+        self._write_pdf(filename, receipts)
+        return filename
+
+    def _write_pdf(self, filename, receipts):
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import A4
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        # Write beside the target and swap in, so a half-written file is never opened
+        partial = filename + ".part"
+        c = canvas.Canvas(partial, pagesize=A4)
+        body_top = self._define_header(c)
+        for order, items in receipts:
+            self._draw_receipt(c, order, items, body_top)
+        c.save()
+        os.replace(partial, filename)
+
+    def _define_header(self, c):
+        """Draw the static header into a reusable form; returns the y below it."""
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import mm
+
+        width, height = A4
+        y = height - 30 * mm
+
+        c.beginForm(self.HEADER_FORM)
+        if self._logo is not None:
+            img_width = 40 * mm
+            img_height = 40 * mm
+            c.drawImage(
+                self._logo,
+                (width - img_width) / 2,
+                y - img_height,
+                width=img_width,
+                height=img_height,
+                preserveAspectRatio=True,
+                mask='auto'
+            )
+            y -= (img_height + 5 * mm)
+
+        c.setFont("Helvetica-Bold", 14)
+        c.drawCentredString(width / 2, y, "EXCELLENCE COFFEE")
+        y -= 6 * mm
+
+        c.setFont("Helvetica", 10)
+        c.drawCentredString(width / 2, y, "Artisan Coffee • Fresh Pastries")
+        y -= 5 * mm
+        c.drawCentredString(width / 2, y, "Auckland, New Zealand")
+        y -= 10 * mm
+        c.endForm()
+        return y
+
+    def _draw_receipt(self, c, order, items, y):
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import mm
+
+        width, height = A4
+        c.doForm(self.HEADER_FORM)
+
+        # Order info
+        c.setFont("Helvetica", 9)
+        c.drawString(20 * mm, y, f"Order ID: {order['order_id']}")
+        y -= 5 * mm
+        c.drawString(20 * mm, y, f"Date/Time: {order['order_datetime']}")
+        y -= 5 * mm
+        c.drawString(20 * mm, y, f"Processed by: {order['staff_name']}")
+        y -= 8 * mm
+
+        # Line
+        c.line(20 * mm, y, width - 20 * mm, y)
+        y -= 6 * mm
+
+        # Items header
+        c.setFont("Helvetica-Bold", 9)
+        c.drawString(20 * mm, y, "Item")
+        c.drawString(90 * mm, y, "Qty")
+        c.drawRightString(width - 40 * mm, y, "Price")
+        c.drawRightString(width - 20 * mm, y, "Total")
+        y -= 4 * mm
+        c.line(20 * mm, y, width - 20 * mm, y)
+        y -= 6 * mm
+
+        # Items
+        c.setFont("Helvetica", 9)
+        for it in items:
+            c.drawString(20 * mm, y, it["product_name"][:30])
+            c.drawString(90 * mm, y, str(it["quantity"]))
+            c.drawRightString(width - 40 * mm, y, f"${it['unit_price']:.2f}")
+            c.drawRightString(width - 20 * mm, y, f"${it['line_total']:.2f}")
+            y -= 5 * mm
+            if y < 40 * mm:
+                c.showPage()
+                c.setFont("Helvetica", 9)
+                y = height - 30 * mm
+
+        y -= 3 * mm
+        c.line(20 * mm, y, width - 20 * mm, y)
+        y -= 6 * mm
+
+        total = order["total"]
+        disc = order["discount"]
+        final_total = order["final_total"]
+        gst_amount = final_total * (GST_RATE / (1 + GST_RATE))
+        net_total = final_total - gst_amount
+
+        # Totals
+        c.setFont("Helvetica", 9)
+        c.drawRightString(width - 20 * mm, y, f"Subtotal (incl. GST): ${total:.2f}")
+        y -= 5 * mm
+        c.drawRightString(width - 20 * mm, y, f"Discount:            -${disc:.2f}")
+        y -= 5 * mm
+        c.drawRightString(width - 20 * mm, y, f"Net (excl. GST):      ${net_total:.2f}")
+        y -= 5 * mm
+        c.drawRightString(width - 20 * mm, y, f"GST Included (15%):   ${gst_amount:.2f}")
+        y -= 5 * mm
+
+        c.setFont("Helvetica-Bold", 10)
+        c.drawRightString(width - 20 * mm, y, f"TOTAL PAID:           ${final_total:.2f}")
+        y -= 8 * mm
+
+        c.setFont("Helvetica", 9)
+        c.drawString(20 * mm, y, f"Payment Method: {order['payment_method']}")
+        y -= 10 * mm
+
+        c.setFont("Helvetica-Oblique", 9)
+        c.drawCentredString(width / 2, y, "Thank you for choosing Excellence Coffee!")
+        y -= 5 * mm
+        c.drawCentredString(width / 2, y, "www.excellencecoffee.example")
+
+        c.showPage()
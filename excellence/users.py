@@ -0,0 +1,50 @@
+"""Logged-in user roles and their permissions."""
+
+
+class User:
+    def __init__(self, user_id, username, role):
+        self._user_id = user_id
+        self._username = username
+        self._role = role
+
+    @property
+    def user_id(self):
+        return self._user_id
+
+    @property
+    def username(self):
+        return self._username
+
+    @property
+    def role(self):
+        return self._role
+
+    def can_manage_users(self):
+        return False
+
+    def can_view_reports(self):
+        return self._role in ("admin", "manager")
+
+
+class AdminUser(User):
+    def can_manage_users(self):
+        return True
+
+
+class ManagerUser(User):
+    def can_manage_users(self):
+        return False
+
+
+class StaffUser(User):
+    pass
+
+
+def user_from_row(row):
+    role = row["role"]
+    if role == "admin":
+        return AdminUser(row["user_id"], row["username"], role)
+    elif role == "manager":
+        return ManagerUser(row["user_id"], row["username"], role)
+    else:
+        return StaffUser(row["user_id"], row["username"], role)
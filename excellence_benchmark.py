@@ -0,0 +1,443 @@
+"""
+Benchmarks for the Excellence Coffee SQLite store.
+Each run works on a fresh database in a temporary folder, so the real
+excellence_coffee.db is never touched.
+
+Run: python excellence_benchmark.py --orders 2000
+Query plan check only: python excellence_benchmark.py --check-plans
+Refund rounding check only: python excellence_benchmark.py --check-refunds
+Cold start to the login screen only: python excellence_benchmark.py --startup
+Login to usable, and memory per page: python excellence_benchmark.py --pages
+Concurrent tills only: python excellence_benchmark.py --tills 4 --orders 500
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import re
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from excellence import DatabaseManager, STORAGE_PROFILES
+
+
+def _open_bench_db(folder, profile):
+    db = DatabaseManager(os.path.join(folder, "bench.db"), storage_profile=profile)
+    # Deep stock so no order is ever short
+    db._conn.execute("UPDATE products SET stock_qty = 1000000")
+    db._conn.commit()
+    return db
+
+
+def _random_items(products, rng, lines=3):
+    return [
+        {
+            "product_id": p["product_id"],
+            "name": p["name"],
+            "price": p["price"],
+            "qty": rng.randint(1, 3),
+            "is_service": p["is_service"],
+        }
+        for p in rng.sample(products, lines)
+    ]
+
+
+def bench_orders(profile, orders, seed=42):
+    """Orders per second for back-to-back create_order calls."""
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as folder:
+        db = _open_bench_db(folder, profile)
+        products = list(db.get_all_products())
+        customers = [c["customer_id"] for c in db.get_all_customers()]
+        admin_id = db.authenticate_user("Excellence", "Excellence")["user_id"]
+
+        started = time.perf_counter()
+        for _ in range(orders):
+            customer_id = rng.choice(customers) if rng.random() < 0.5 else None
+            db.create_order(customer_id, _random_items(products, rng), 0.0, "Card", admin_id)
+        elapsed = time.perf_counter() - started
+        db._conn.close()
+    return orders / elapsed
+
+
+def _till(args):
+    """One till process: back-to-back orders on its own DatabaseManager."""
+    path, orders, seed = args
+    rng = random.Random(seed)
+    db = DatabaseManager(path)
+    products = list(db.get_all_products())
+    admin_id = db.authenticate_user("Excellence", "Excellence")["user_id"]
+    failed = 0
+    for _ in range(orders):
+        try:
+            db.create_order(None, _random_items(products, rng), 0.0, "Card", admin_id)
+        except sqlite3.OperationalError:
+            failed += 1
+    db.close()
+    return failed, db._writes.retries
+
+
+def bench_tills(tills, orders, seed=42):
+    """
+    Several till processes each write orders to one database file while
+    this process keeps running a report. Returns (orders per second,
+    failed writes, write retries, reports completed meanwhile).
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        db = _open_bench_db(folder, "tuned")
+        path = os.path.join(folder, "bench.db")
+        with multiprocessing.Pool(tills) as pool:
+            started = time.perf_counter()
+            result = pool.map_async(_till, [(path, orders, seed + i) for i in range(tills)])
+            reads = 0
+            while not result.ready():
+                db.revenue_by_customer_type()
+                reads += 1
+            elapsed = time.perf_counter() - started
+            outcomes = result.get()
+        db.close()
+    failed = sum(o[0] for o in outcomes)
+    retries = sum(o[1] for o in outcomes)
+    return tills * orders / elapsed, failed, retries, reads
+
+
+# (label, call, forbidden plan patterns). The SQL is captured from the real
+# DatabaseManager methods, so the check follows any change to the queries.
+PLAN_CHECKS = [
+    ("customer_orders",
+     lambda db, cid, oid: db.customer_orders(cid, limit=10),
+     [r"^SCAN (orders|o)\b", r"TEMP B-TREE FOR ORDER BY"]),
+    ("customer_order_page",
+     lambda db, cid, oid: db.customer_order_page(cid, page_size=10),
+     [r"^SCAN (orders|o)\b", r"TEMP B-TREE FOR ORDER BY"]),
+    ("get_order_with_items",
+     lambda db, cid, oid: db.get_order_with_items(oid),
+     [r"^SCAN (orders|order_items|oi)\b"]),
+    ("loyalty_summary",
+     lambda db, cid, oid: db.loyalty_summary(),
+     [r"^SCAN (orders|o)\b"]),
+    ("revenue_by_customer_type",
+     lambda db, cid, oid: db.revenue_by_customer_type(),
+     [r"^SCAN (customers|c)\b"]),
+    ("stock_at",
+     lambda db, cid, oid: db.stock_at(datetime.now().strftime("%Y-%m-%d")),
+     [r"^SCAN (stock_movements|stock_snapshots)\b"]),
+    ("revenue_by_customer_type (last 30 days)",
+     lambda db, cid, oid: db.revenue_by_customer_type(
+         (datetime.now() - timedelta(days=29)).strftime("%Y-%m-%d")),
+     [r"^SCAN (orders|o)\b", r"^SCAN (customers|c)\b"]),
+]
+
+
+def capture_plans(db, call):
+    """Run call() and return (sql, plan lines) for every SELECT it issued."""
+    statements = []
+    db._conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        db._conn.set_trace_callback(None)
+
+    plans = []
+    for sql in statements:
+        if sql.lstrip().upper().startswith("SELECT"):
+            detail = [row[3] for row in db._conn.execute("EXPLAIN QUERY PLAN " + sql)]
+            plans.append((sql, detail))
+    return plans
+
+
+def check_query_plans(orders=500, seed=42):
+    """
+    Fill a scratch database, then make sure the indexed queries never fall
+    back to full scans. Returns True when every plan is clean.
+    """
+    rng = random.Random(seed)
+    ok = True
+    with tempfile.TemporaryDirectory() as folder:
+        db = _open_bench_db(folder, "tuned")
+        products = list(db.get_all_products())
+        customers = [c["customer_id"] for c in db.get_all_customers()]
+        admin_id = db.authenticate_user("Excellence", "Excellence")["user_id"]
+        order_id = None
+        for _ in range(orders):
+            order_id = db.create_order(rng.choice(customers), _random_items(products, rng),
+                                       0.0, "Card", admin_id)[0]
+            if order_id % 100 == 0:
+                db.take_stock_snapshot()
+        db._conn.execute("ANALYZE")
+
+        for label, call, forbidden in PLAN_CHECKS:
+            for sql, detail in capture_plans(db, lambda: call(db, customers[0], order_id)):
+                bad = [line for line in detail
+                       if any(re.search(p, line) for p in forbidden)]
+                status = "FAIL" if bad else "ok"
+                ok = ok and not bad
+                print(f"[{status}] {label}: {' | '.join(detail)}")
+        db._conn.close()
+    return ok
+
+
+# (label, cart as (price, qty) lines, discount %, refunds in order, final
+# total stored unrounded as older versions did, or None). Each refund maps
+# a line index to a quantity, or is None for "the rest".
+REFUND_CHECKS = [
+    ("half-cent total, partial then full", [(10.45, 3)], 50.0, [{0: 1}, None], None),
+    ("half-cent total, two lines", [(3.15, 1), (2.25, 3)], 37.5, [{1: 2}, {0: 1}, None], None),
+    ("half-cent total, full only", [(10.45, 3)], 50.0, [None], None),
+    ("unrounded legacy total, partial then full", [(4.44, 1), (20.25, 1)], 50.0,
+     [{0: 1}, None], 12.345),
+]
+
+
+def check_refunds():
+    """
+    Refund half-cent totals piece by piece, then make sure the refunds add
+    up to exactly what was charged, the customer's lifetime spend is back
+    to 0.00, and a rebuild of the customer stats agrees. Returns True when
+    every case is clean.
+    """
+    ok = True
+    with tempfile.TemporaryDirectory() as folder:
+        db = _open_bench_db(folder, "tuned")
+        products = list(db.get_all_products())
+        customers = [c["customer_id"] for c in db.get_all_customers()]
+        admin_id = db.authenticate_user("Excellence", "Excellence")["user_id"]
+        stats_sql = """
+            SELECT customer_id, order_count, lifetime_spend
+            FROM customer_stats ORDER BY customer_id
+        """
+
+        for customer_id, (label, cart, discount, refunds, legacy_total) in zip(
+                customers, REFUND_CHECKS):
+            items = [
+                {"product_id": p["product_id"], "name": p["name"], "price": price,
+                 "qty": qty, "is_service": p["is_service"]}
+                for p, (price, qty) in zip(products, cart)
+            ]
+            order_id = db.create_order(customer_id, items, discount, "Card", admin_id)[0]
+            if legacy_total is not None:
+                db._conn.execute("UPDATE orders SET final_total = ? WHERE order_id = ?",
+                                 (legacy_total, order_id))
+                db._conn.commit()
+                db.rebuild_customer_stats()
+            order, lines = db.get_order_with_items(order_id)
+            charged = order["final_total"]
+            refunded = 0.0
+            for refund in refunds:
+                if refund is not None:
+                    refund = {lines[i]["item_id"]: qty for i, qty in refund.items()}
+                refunded += db.refund_order(order_id, refund)
+
+            problems = []
+            if legacy_total is None and charged != round(charged, 2):
+                problems.append(f"charged {charged!r} is not whole cents")
+            if round(refunded, 2) != round(charged, 2):
+                problems.append(f"refunded {refunded:.2f} of {charged:.2f}")
+            stats = db._conn.execute(
+                "SELECT order_count, lifetime_spend FROM customer_stats WHERE customer_id = ?",
+                (customer_id,)).fetchone()
+            if tuple(stats) != (0, 0.0):
+                problems.append(f"customer left with {stats[0]} orders, "
+                                f"lifetime spend {stats[1]!r}")
+            ok = ok and not problems
+            print(f"[{'FAIL' if problems else 'ok'}] {label}: "
+                  f"{'; '.join(problems) or f'{charged:.2f} charged and refunded'}")
+
+        incremental = [tuple(r) for r in db._conn.execute(stats_sql)]
+        db.rebuild_customer_stats()
+        rebuilt = [tuple(r) for r in db._conn.execute(stats_sql)]
+        ok = ok and incremental == rebuilt
+        print(f"[{'ok' if incremental == rebuilt else 'FAIL'}] customer stats match a rebuild")
+        db._conn.close()
+    return ok
+
+
+# Runs in a fresh interpreter: time from the first import to the login
+# screen being drawn, and which of the lazily loaded modules came along.
+STARTUP_SCRIPT = r"""
+import sys, time
+started = time.perf_counter()
+import tkinter
+from excellence.app import ExcellenceCoffeeApp
+imported = time.perf_counter() - started
+try:
+    app = ExcellenceCoffeeApp()
+    app.update()
+    shown = time.perf_counter() - started
+    app.destroy()
+except tkinter.TclError:  # no display
+    shown = -1
+lazy = [m for m in ("reportlab", "csv", "subprocess") if m in sys.modules]
+print(imported, shown, ",".join(lazy))
+"""
+
+
+# Logs in as the default admin and times MainApp until the first page is
+# drawn, then opens every other page (what login used to build up front).
+# Memory is resident set size in KiB, read from /proc where there is one.
+PAGES_SCRIPT = r"""
+import sys, time, tkinter
+from excellence.app import ExcellenceCoffeeApp
+from excellence.users import user_from_row
+
+def rss_kib():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+try:
+    app = ExcellenceCoffeeApp()
+except tkinter.TclError:  # no display
+    print(-1, -1, -1, -1)
+    sys.exit()
+app.update()
+app.current_user = user_from_row(app.db.authenticate_user("Excellence", "Excellence"))
+base = rss_kib()
+started = time.perf_counter()
+app.show_main_app()
+app.update()
+usable = time.perf_counter() - started
+usable_rss = rss_kib() - base
+started = time.perf_counter()
+for name in app.main_app.page_names:
+    app.main_app.show_page(name)
+app.update()
+print(usable, usable_rss, time.perf_counter() - started, rss_kib() - base)
+app.destroy()
+"""
+
+
+def _run_fresh(script, runs):
+    """Run script in new interpreters; returns each run's output fields."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=here)
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        # Start in a scratch folder so the app creates its own database there
+        for _ in range(runs):
+            out = subprocess.run([sys.executable, "-c", script], cwd=folder,
+                                 env=env, capture_output=True, text=True, check=True)
+            results.append(out.stdout.split())
+    return results
+
+
+def measure_startup(runs=5):
+    """
+    Median cold-start times in seconds as (import, login screen shown,
+    eagerly loaded modules). Login screen time is None without a display.
+    """
+    results = _run_fresh(STARTUP_SCRIPT, runs)
+    imported = [float(fields[0]) for fields in results]
+    shown = [float(fields[1]) for fields in results]
+    lazy = results[-1][2] if len(results[-1]) > 2 else ""
+    login = statistics.median(shown) if min(shown) >= 0 else None
+    return statistics.median(imported), login, lazy
+
+
+def measure_pages(runs=3):
+    """
+    Medians of (login to usable s, its RSS growth KiB, opening the other
+    pages s, total RSS growth KiB), or None without a display.
+    """
+    results = [[float(x) for x in fields] for fields in _run_fresh(PAGES_SCRIPT, runs)]
+    if results[0][0] < 0:
+        return None
+    return tuple(statistics.median(column) for column in zip(*results))
+
+
+def report_pages():
+    print("Login to usable (pages built on first show)")
+    print("--------------------------------------------")
+    pages = measure_pages()
+    if pages is None:
+        print("(no display, not measured)")
+        return
+    usable, usable_rss, rest, total_rss = pages
+    print(f"first page {usable * 1000:>8.1f} ms  {usable_rss / 1024:>6.1f} MiB")
+    print(f"all pages  {(usable + rest) * 1000:>8.1f} ms  {total_rss / 1024:>6.1f} MiB")
+
+
+def report_tills(tills, orders, seed):
+    print(f"{tills} tills writing to one database")
+    print("------------------------------")
+    rate, failed, retries, reads = bench_tills(tills, orders, seed)
+    print(f"orders     {rate:>10.1f} orders/s")
+    print(f"failed     {failed:>10d} (database is locked)")
+    print(f"retries    {retries:>10d}")
+    print(f"reports    {reads:>10d} run alongside")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Excellence Coffee storage benchmarks")
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--check-plans", action="store_true",
+                        help="Only run the EXPLAIN QUERY PLAN regression check")
+    parser.add_argument("--check-refunds", action="store_true",
+                        help="Only run the refund rounding check")
+    parser.add_argument("--startup", action="store_true",
+                        help="Only measure cold start to the login screen")
+    parser.add_argument("--pages", action="store_true",
+                        help="Only measure login to usable and page memory")
+    parser.add_argument("--tills", type=int, default=0,
+                        help="Only run N till processes writing at once")
+    args = parser.parse_args()
+
+    if args.pages:
+        report_pages()
+        return
+    if args.check_refunds:
+        sys.exit(0 if check_refunds() else 1)
+    if args.tills:
+        report_tills(args.tills, args.orders, args.seed)
+        return
+
+    if not args.startup:
+        print("Query plan check")
+        print("----------------")
+        plans_ok = check_query_plans(seed=args.seed)
+        if args.check_plans:
+            sys.exit(0 if plans_ok else 1)
+        print()
+
+        print("Refund rounding check")
+        print("---------------------")
+        check_refunds()
+        print()
+
+    print("Cold start")
+    print("----------")
+    imported, login, lazy = measure_startup()
+    print(f"imports    {imported * 1000:>8.1f} ms")
+    if login is None:
+        print("login      (no display, screen not drawn)")
+    else:
+        print(f"login      {login * 1000:>8.1f} ms")
+    print(f"loaded     {lazy or 'no reportlab, csv or subprocess'}")
+    if args.startup:
+        return
+    print()
+
+    print("Orders per second by storage profile")
+    print("-------------------------------------")
+    for profile in STORAGE_PROFILES:
+        rate = bench_orders(profile, args.orders, args.seed)
+        print(f"{profile:<10} {rate:>10.1f} orders/s")
+    print()
+
+    report_tills(4, args.orders // 4, args.seed)
+
+
+if __name__ == "__main__":
+    main()